@@ -13,12 +13,16 @@ Description:
 		program. 
 
 List of functions:
-	No functions are used in this script.
+	No functions are defined in this script. The counts are calculated by the
+		cluster_counts() & clean_counts() functions of orthobench/stats.py.
 
 List of standard and non-standard modules used:
 	sys
+	os
 	datetime.datetime
-	pandas
+	orthobench.database
+	orthobench.stats
+	orthobench.profiling
 
 Procedure:
 	1. Importing modules & assigning command-line arguments. 
@@ -40,6 +44,9 @@ Usage:
 	
 	Where input_db must be a larger protein cluster assignment database generated by
 		the create_ortho_db.py program. 
+	The optional --profile (or --profile=cprofile) flag, or the ORTHOBENCH_PROFILE
+		environment variable, writes a JSON trace of the time & memory used by each
+		Part of the script; see orthobench/profiling.py.
 
 This script was written for Python 3.9.18, in Spyder 5.4.3. 
 
@@ -49,8 +56,16 @@ This script was written for Python 3.9.18, in Spyder 5.4.3.
 
 # import necessary modules
 import sys # allows execution of script from command line
+import os # allows access to the file system
+# make the shared orthobench package importable from the repository root
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from orthobench import profiling # opt-in time & memory instrumentation
+# start the optional stage-level profiling, enabled with --profile or ORTHOBENCH_PROFILE
+prof = profiling.start("og_clust_counts", profiling.pop_flag(sys.argv))
+prof.part("Part 1: Import necessary modules & assign command-line arguments")
 from datetime import datetime # access data from system regarding date & time
-import pandas as pd # allows manipulation of dataframes in Python
+from orthobench.database import read_pivot # loading of the orthology database
+from orthobench.stats import cluster_counts, clean_counts # cluster membership counts
 
 
 # assign command line arguments
@@ -67,44 +82,26 @@ output_db_clean = "Ortho_Comparison_CountsClean__" + time_now + ".txt"
 
 
 # Part 2: Import input database into Pandas dataframe
+prof.part("Part 2: Import input database into Pandas dataframe")
 
 # import data into pandas dataframe
-input_df = pd.read_csv(input_db, sep='\t', header=0, low_memory=False)
+input_df = read_pivot(input_db)
+# record the number of proteins loaded
+prof.add_rows(len(input_df))
 
 
 # Part 3: Calculate counts
+prof.part("Part 3: Calculate counts")
 
-for column in input_df: 
-	# loop over the columns in the dataframe
-	# ref: https://www.geeksforgeeks.org/loop-or-iterate-over-all-or-certain-columns-of-a-dataframe-in-python-pandas/
-	if not column == "Query": 
-		# skip over the first column with the query prot names
-		# get the basename of the column
-		# ref: https://note.nkmk.me/en/python-str-remove-strip/
-		col_basename = column.replace('_parsed_pivot', '')
-		count_col_name = col_basename + "_counts"
-		# get counts of all columns & save results to a temporary dataframe
-		# ref: https://www.geeksforgeeks.org/how-to-count-occurrences-of-specific-value-in-pandas-column/
-		# ref: https://stackoverflow.com/questions/47136436/python-pandas-convert-value-counts-output-to-dataframe
-		tmp_counts = input_df[column].value_counts(ascending=False).rename_axis(column).reset_index(name=count_col_name)
-		# now add the new dataframe to the larger counts dataframe
-		if 'counts_df' in globals():
-			# first check if the dataframe already exists
-			# if so, add the temporary counts dataframe onto the larger dataframe
-			# join the contents of the input dataframe into the larger dataframe
-			# ref: https://stackoverflow.com/questions/60341348/merge-multiple-dataframes-without-common-columns
-			counts_df = pd.concat([counts_df, tmp_counts], axis=1)
-		else: 
-			# if the counts dataframe does not already exist
-			# create it from the temporary counts dataframe
-			counts_df = tmp_counts.copy()
+# count the number of proteins assigned to each cluster, for each program column
+counts_df = cluster_counts(input_df)
 
 
 # Part 4: Clean up dataframe & write out results
+prof.part("Part 4: Clean up dataframe & write out results")
 
 # Create cleaned up dataframe without cluster IDs
-# ref: https://stackoverflow.com/questions/19071199/drop-columns-whose-name-contains-a-specific-string-from-pandas-dataframe
-clean_counts_df = counts_df[counts_df.columns.drop(list(counts_df.filter(regex = '_parsed_pivot')))]
+clean_counts_df = clean_counts(counts_df)
 
 
 # write out results to tab-separated text files
@@ -0,0 +1,186 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: og_db_query.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This program runs canned benchmark queries on the DuckDB or Parquet store of the
+		orthology database written by the create_ortho_db.py program (with its --store
+		flag), without loading the whole database into Pandas. The queries filter on
+		the precomputed cluster size columns of the store, so that DuckDB can push the
+		filters down into multithreaded scans; see orthobench/store.py.
+	The queries available are:
+		- summary: the number of proteins, clusters & singletons, & the largest cluster
+			size of each program & threshold
+		- sizes: the proteins whose clusters are within size limits in several columns
+			(ie. singletons in CD-HIT_Pa_90, but in clusters of more than 10 proteins in
+			MMseqs2_Pa_90)
+		- co-membership: the numbers of protein pairs clustered together by two columns,
+			by each of them & by both, with the precision, recall & Jaccard index of the
+			first column relative to the second
+		- protein: the cluster assignments of a protein in every column
+		- cluster: the cluster assignments in every column of the members of a cluster
+
+List of functions:
+	No functions are defined in this script. The queries are run by the OrthoStore
+		class of orthobench/store.py.
+
+List of standard and non-standard modules used:
+	argparse
+	sys
+	os
+	orthobench.store
+	orthobench.profiling
+
+Procedure:
+	1. Assignment of command-line arguments & importing modules.
+	2. Running the query on the store.
+	3. Printing out (or writing out) the results as a tab-separated table.
+
+Known bugs and limitations:
+	- The duckdb Python module is required.
+	- Columns can be named in full (ie. CD-HIT_Pa_90_parsed_pivot) or without the
+		_parsed_pivot suffix (ie. CD-HIT_Pa_90).
+
+Usage:
+	./og_db_query.py [-h] -s STORE [-o OUT_FILE] [-t THREADS] [--profile [{json,cprofile}]] QUERY ...
+	OR
+	python og_db_query.py [-h] -s STORE [-o OUT_FILE] [-t THREADS] [--profile [{json,cprofile}]] QUERY ...
+
+	Where STORE is a *.duckdb or *.parquet store written by create_ortho_db.py, & QUERY
+		is one of:
+		summary
+		sizes [--min COLUMN SIZE] [--max COLUMN SIZE] [--list]
+		co-membership COLUMN_A COLUMN_B
+		protein QUERY_ID
+		cluster COLUMN CLUSTER_ID
+	Ie. the number of proteins that are singletons in CD-HIT_Pa_90 but in clusters of
+		more than 10 proteins in MMseqs2_Pa_90:
+		python og_db_query.py -s Orthology_Comparison_DB__26-10-2023--174514.duckdb sizes --max CD-HIT_Pa_90 1 --min MMseqs2_Pa_90 11
+
+This script was written for Python 3.9.18.
+
+"""
+
+#################################   ARGPARSE   #######################################
+import argparse
+
+
+parser = argparse.ArgumentParser(description =
+								 'This program runs canned benchmark queries on the DuckDB or Parquet store \
+								 of the orthology database written by create_ortho_db.py --store.')
+
+parser.add_argument(
+	'-s', '--store',
+	dest='store',
+	metavar='STORE',
+	required=True,
+	help='The *.duckdb or *.parquet store of the orthology database.'
+	)
+parser.add_argument(
+	'-o', '--outfile',
+	dest='out_file',
+	metavar='OUT_FILE',
+	help='Write the results to this tab-separated text file (default: print them out).'
+	)
+parser.add_argument(
+	'-t', '--threads',
+	dest='threads',
+	metavar='THREADS',
+	type=int,
+	help='Number of threads used by the scans (default: all available cores, or ORTHOBENCH_THREADS).'
+	)
+parser.add_argument(
+	'--profile',
+	nargs='?',
+	const='json',
+	choices=['json', 'cprofile'],
+	help='Record the time & memory used by each step of the program to a JSON trace file.'
+	)
+
+queries = parser.add_subparsers(dest='query', metavar='QUERY', required=True)
+queries.add_parser('summary', help='Proteins, clusters, singletons & largest cluster of each column.')
+sizes_parser = queries.add_parser('sizes', help='Proteins whose clusters are within size limits in several columns.')
+sizes_parser.add_argument(
+	'--min',
+	dest='min_sizes',
+	nargs=2,
+	action='append',
+	metavar=('COLUMN', 'SIZE'),
+	default=[],
+	help='Smallest cluster size allowed in a column (can be repeated).'
+	)
+sizes_parser.add_argument(
+	'--max',
+	dest='max_sizes',
+	nargs=2,
+	action='append',
+	metavar=('COLUMN', 'SIZE'),
+	default=[],
+	help='Largest cluster size allowed in a column (can be repeated).'
+	)
+sizes_parser.add_argument(
+	'--list',
+	dest='list_proteins',
+	action='store_true',
+	help='List the proteins, instead of only counting them.'
+	)
+co_parser = queries.add_parser('co-membership', help='Protein pairs clustered together by two columns.')
+co_parser.add_argument('column_a', metavar='COLUMN_A', help='The column evaluated.')
+co_parser.add_argument('column_b', metavar='COLUMN_B', help='The column used as the reference.')
+protein_parser = queries.add_parser('protein', help='The cluster assignments of a protein in every column.')
+protein_parser.add_argument('query_id', metavar='QUERY_ID', help='The (encoded) protein ID.')
+cluster_parser = queries.add_parser('cluster', help='The cluster assignments of the members of a cluster.')
+cluster_parser.add_argument('column', metavar='COLUMN', help='The column of the cluster.')
+cluster_parser.add_argument('cluster_id', metavar='CLUSTER_ID', help='The cluster ID.')
+
+args = parser.parse_args()
+
+
+#################################   Main Program   ######################################
+
+
+# Part 1: Import necessary modules
+
+import sys # access the module search path
+import os # allows access to the file system
+# make the shared orthobench package importable from the repository root
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from orthobench import profiling # opt-in time & memory instrumentation
+# start the optional stage-level profiling, enabled with --profile or ORTHOBENCH_PROFILE
+prof = profiling.start("og_db_query", args.profile)
+prof.part("Part 1: Import necessary modules")
+from orthobench.store import OrthoStore # canned queries over the database store
+
+
+# Part 2: Run the query
+prof.part("Part 2: Run the query")
+
+with OrthoStore(args.store, args.threads) as store:
+	if args.query == "summary":
+		result_df = store.column_summary()
+	elif args.query == "sizes":
+		# the size limits given for each column
+		min_sizes = {column: int(size) for column, size in args.min_sizes}
+		max_sizes = {column: int(size) for column, size in args.max_sizes}
+		result_df = store.size_filter(min_sizes, max_sizes, args.list_proteins)
+	elif args.query == "co-membership":
+		result_df = store.co_membership(args.column_a, args.column_b)
+	elif args.query == "protein":
+		result_df = store.protein(args.query_id)
+	else:
+		result_df = store.cluster(args.column, args.cluster_id)
+# record the number of result rows
+prof.add_rows(len(result_df))
+
+
+# Part 3: Print out or write out the results
+prof.part("Part 3: Print out or write out the results")
+
+if args.out_file:
+	result_df.to_csv(args.out_file, index=False, header=True, sep='\t')
+else:
+	result_df.to_csv(sys.stdout, index=False, header=True, sep='\t')
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#!/bin/python
+"""
+
+Title: og_nesting.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This program measures how consistently the orthologous clusters of each program
+		nest across the percent identity thresholds used (ie. 99% -> 95% -> 90%): each
+		cluster at a higher threshold should be entirely contained in a single cluster
+		at the next lower threshold. The input file is expected to be the output file
+		from the create_ortho_db.py program, containing the columns of all thresholds
+		of each program.
+
+List of functions:
+	No functions are defined in this script. The comparisons are made by the functions
+		of orthobench/nesting.py.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	datetime.datetime
+	orthobench.database
+	orthobench.nesting
+	orthobench.profiling
+
+Procedure:
+	1. Importing modules & assigning command-line arguments.
+	2. Importing input database into Pandas dataframe.
+	3. Comparing the clusters of consecutive thresholds of each program: number of
+		proteins compared, number of clusters at the higher threshold, number of these
+		clusters that are nested in (or split over) the clusters of the lower threshold,
+		nesting score & purity.
+	4. Writing out the summary & the list of split clusters to tab-separated text files.
+
+Known bugs and limitations:
+	- The program & threshold of each column are determined from the column names,
+		which must end in the threshold (ie. MMseqs2_Pa_95_parsed_pivot). Columns
+		without a threshold are ignored.
+	- This program is designed only to accept an input file created by the
+		create_ortho_db.py script.
+
+Usage:
+	./og_nesting.py input_db [-NAME out_base]
+	OR
+	python og_nesting.py input_db [-NAME out_base]
+
+	Where input_db must be a larger protein cluster assignment database generated by
+		the create_ortho_db.py program.
+	Where the basename of the output files can be determined by the user with
+		-NAME out_base; the output files are then out_base__nesting.txt &
+		out_base__nesting_violations.txt. Otherwise, the output files are named
+		Ortho_Comparison_Nesting__<date>--<time>.txt &
+		Ortho_Comparison_NestingViolations__<date>--<time>.txt.
+	The optional --profile (or --profile=cprofile) flag, or the ORTHOBENCH_PROFILE
+		environment variable, writes a JSON trace of the time & memory used by each
+		Part of the script; see orthobench/profiling.py.
+
+This script was written for Python 3.9.18.
+
+"""
+
+# Part 1: Import necessary modules & assign command-line arguments
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the file system
+# make the shared orthobench package importable from the repository root
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from orthobench import profiling # opt-in time & memory instrumentation
+# start the optional stage-level profiling, enabled with --profile or ORTHOBENCH_PROFILE
+prof = profiling.start("og_nesting", profiling.pop_flag(sys.argv))
+prof.part("Part 1: Import necessary modules & assign command-line arguments")
+from datetime import datetime # access data from system regarding date & time
+from orthobench.database import read_pivot # loading of the orthology database
+from orthobench.nesting import nesting_tables # comparison of consecutive thresholds
+
+
+# assign command line arguments
+input_db = sys.argv[1]
+
+# designate the output file names
+if (len(sys.argv) == 4 and sys.argv[2] == "-NAME"):
+	# if the user has designated an output file basename
+	out_base = sys.argv[3]
+	output_summary = out_base + "__nesting.txt"
+	output_violations = out_base + "__nesting_violations.txt"
+else:
+	# otherwise, base the output file names on the date & time of query
+	now = datetime.now()
+	time_now = now.strftime("%d-%m-%Y--%H%M%S")
+	output_summary = "Ortho_Comparison_Nesting__" + time_now + ".txt"
+	output_violations = "Ortho_Comparison_NestingViolations__" + time_now + ".txt"
+
+
+# Part 2: Import input database into Pandas dataframe
+prof.part("Part 2: Import input database into Pandas dataframe")
+
+# import data into pandas dataframe
+input_df = read_pivot(input_db)
+# record the number of proteins loaded
+prof.add_rows(len(input_df))
+
+
+# Part 3: Compare the clusters of consecutive thresholds
+prof.part("Part 3: Compare the clusters of consecutive thresholds")
+
+# compare each threshold of each program to the next lower one
+summary_df, violations_df = nesting_tables(input_df)
+# record the number of split clusters found
+prof.add_rows(len(violations_df))
+
+
+# Part 4: Write out results
+prof.part("Part 4: Write out results")
+
+# write out results to tab-separated text files
+summary_df.to_csv(output_summary, index=False, header=True, sep = '\t')
+violations_df.to_csv(output_violations, index=False, header=True, sep = '\t')
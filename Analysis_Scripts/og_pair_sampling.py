@@ -0,0 +1,169 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: og_pair_sampling.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This program estimates how well the clusterings of each pair of programs & thresholds
+		in the orthology database agree, by sampling protein pairs instead of counting
+		every pair of co-clustered proteins. For each pair of columns, the precision
+		(the fraction of the pairs clustered together by the first column that are also
+		together in the second), the recall (the fraction of the pairs of the second
+		column that are together in the first), the Jaccard index of the pairs & the
+		Rand index are estimated, each with a confidence interval. The samples are drawn
+		with a seedable random number generator, so that runs can be reproduced.
+	The input file is expected to be the output file from the create_ortho_db.py
+		program, or its DuckDB or Parquet store (create_ortho_db.py --store).
+
+List of functions:
+	No functions are defined in this script. The estimates are made by the functions of
+		orthobench/sampling.py.
+
+List of standard and non-standard modules used:
+	argparse
+	sys
+	os
+	datetime.datetime
+	orthobench.database
+	orthobench.sampling
+	orthobench.store (only loaded for *.duckdb & *.parquet inputs)
+	orthobench.profiling
+
+Procedure:
+	1. Assignment of command-line arguments & importing modules.
+	2. Importing input database into Pandas dataframe.
+	3. Sampling protein pairs & estimating the agreement of each pair of columns.
+	4. Writing out the estimates to a tab-separated text file.
+
+Known bugs and limitations:
+	- The results are estimates; for exact pair counts of 2 columns, use the
+		co-membership query of og_db_query.py.
+	- The Jaccard interval is derived from the precision & recall intervals, and so is
+		conservative.
+
+Usage:
+	./og_pair_sampling.py [-h] -i INPUT_DB [-o OUT_FILE] [-n SAMPLES] [-s SEED] [-c CONFIDENCE] [--profile [{json,cprofile}]]
+	OR
+	python og_pair_sampling.py [-h] -i INPUT_DB [-o OUT_FILE] [-n SAMPLES] [-s SEED] [-c CONFIDENCE] [--profile [{json,cprofile}]]
+
+	Where INPUT_DB is an orthology database generated by the create_ortho_db.py program
+		(Orthology_Comparison_DB__*.txt, or its *.duckdb or *.parquet store).
+	Where the output file name is Ortho_Comparison_PairSampling__<date>--<time>.txt,
+		unless another name is given with -o.
+
+This script was written for Python 3.9.18.
+
+"""
+
+#################################   ARGPARSE   #######################################
+import argparse
+
+
+parser = argparse.ArgumentParser(description =
+								 'This program estimates the precision, recall, Jaccard & Rand indices of \
+								 every pair of columns of the orthology database by sampling protein pairs.')
+
+parser.add_argument(
+	'-i', '--input',
+	dest='input_db',
+	metavar='INPUT_DB',
+	required=True,
+	help='The orthology database from create_ortho_db.py (*.txt, *.duckdb or *.parquet).'
+	)
+parser.add_argument(
+	'-o', '--outfile',
+	dest='out_file',
+	metavar='OUT_FILE',
+	help='The output file name (default: Ortho_Comparison_PairSampling__<date>--<time>.txt).'
+	)
+parser.add_argument(
+	'-n', '--samples',
+	dest='samples',
+	metavar='SAMPLES',
+	type=int,
+	default=100000,
+	help='Number of pairs sampled within the clusters of each column, & of random protein pairs (default: 100000).'
+	)
+parser.add_argument(
+	'-s', '--seed',
+	dest='seed',
+	metavar='SEED',
+	type=int,
+	help='Seed of the random number generator, for reproducible estimates.'
+	)
+parser.add_argument(
+	'-c', '--confidence',
+	dest='confidence',
+	metavar='CONFIDENCE',
+	type=float,
+	default=0.95,
+	help='Confidence level of the intervals (default: 0.95).'
+	)
+parser.add_argument(
+	'--profile',
+	nargs='?',
+	const='json',
+	choices=['json', 'cprofile'],
+	help='Record the time & memory used by each step of the program to a JSON trace file.'
+	)
+
+args = parser.parse_args()
+if not 0 < args.confidence < 1:
+	parser.error("the confidence level must be between 0 & 1")
+
+
+#################################   Main Program   ######################################
+
+
+# Part 1: Import necessary modules
+
+import sys # access the module search path
+import os # allows access to the file system
+# make the shared orthobench package importable from the repository root
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from orthobench import profiling # opt-in time & memory instrumentation
+# start the optional stage-level profiling, enabled with --profile or ORTHOBENCH_PROFILE
+prof = profiling.start("og_pair_sampling", args.profile)
+prof.part("Part 1: Import necessary modules")
+from datetime import datetime # access data from system regarding date & time
+from orthobench.database import read_pivot # loading of the orthology database
+from orthobench.sampling import estimate_agreement # pair sampling estimates
+
+# designate the output file name
+if args.out_file:
+	output_file = args.out_file
+else:
+	# base the output file name on the date & time of query
+	time_now = datetime.now().strftime("%d-%m-%Y--%H%M%S")
+	output_file = "Ortho_Comparison_PairSampling__" + time_now + ".txt"
+
+
+# Part 2: Import input database into Pandas dataframe
+prof.part("Part 2: Import input database into Pandas dataframe")
+
+if os.path.splitext(args.input_db)[1].lower() in (".duckdb", ".parquet"):
+	# read the database back from its DuckDB or Parquet store
+	from orthobench.store import OrthoStore # DuckDB & Parquet stores of the database
+	with OrthoStore(args.input_db) as store:
+		input_df = store.database()
+else:
+	input_df = read_pivot(args.input_db)
+# record the number of proteins loaded
+prof.add_rows(len(input_df))
+
+
+# Part 3: Sample protein pairs & estimate the agreement of each pair of columns
+prof.part("Part 3: Sample protein pairs & estimate the agreement of each pair of columns")
+
+agreement_df = estimate_agreement(input_df, args.samples, args.seed, args.confidence)
+# record the number of column pairs compared
+prof.add_rows(len(agreement_df))
+
+
+# Part 4: Write out results
+prof.part("Part 4: Write out results")
+
+agreement_df.to_csv(output_file, index=False, header=True, sep='\t')
@@ -12,24 +12,26 @@ Description:
 		script.
 
 List of functions:
-	No functions are used in this script.
+	No functions are defined in this script. The statistics are calculated by the
+		functions of orthobench/stats.py.
 
 List of standard and non-standard modules used:
 	sys
 	datetime.datetime
-	pandas
 	os
-	json
-	statistics
+	orthobench.stats
+	orthobench.profiling
 
 Procedure:
 	1. Importing modules & assigning command-line arguments. 
-	2. Creating empty dataframe with Pandas to contain statistics.
+	2. Loading the cluster sizes from the input JSON dictionaries.
 	3. Calculating & compiling statistics: source file, number of clusters, minimum 
 		cluster size, maximum cluster size, average/mean cluster size, median cluster 
 		size, mode cluster size, standard deviation of cluster sizes, variance in 
 		size, presence of single-protein OGs. 
-	4. Writing out results to text file.
+		Optionally, the member sequence lengths of each OG: minimum, maximum & mean 
+		length, coefficient of variation of the lengths, and total residues.
+	4. Writing out results to text file(s).
 
 Known bugs and limitations:
 	- There is no quality-checking integrated into the code.
@@ -45,9 +47,9 @@ Version:
 		of different orthologous clustering programs and a new project. 
 
 Usage:
-	./og_stats_benchmark.py input_dict [input_dict2 input_dict3 ...] [-NAME out_base]
+	./og_stats_benchmark.py input_dict [input_dict2 input_dict3 ...] [--lengths=FASTA] [-NAME out_base]
 	OR
-	python og_stats_benchmark.py input_dict [input_dict2 input_dict3 ...] [-NAME out_base]
+	python og_stats_benchmark.py input_dict [input_dict2 input_dict3 ...] [--lengths=FASTA] [-NAME out_base]
 	
 	Where any number of input JSON dictionaries produced by the ortho_results_parser.py 
 		script can be accepted as input. This program will compute descriptive statistics
@@ -55,6 +57,18 @@ Usage:
 	Where the basename of the output database can be determined by the user if, after 
 		listing the input JSON dictionary files on the command line, the user writes
 		-NAME out_base (where out_base is the user-defined basename).
+	Instead of a *_parsed.json file, the *_parsed.jsonl.idx index of the sharded JSON
+		Lines output of ortho_results_parser.py (--jsonl flag) can be given; the cluster
+		sizes are then read from the index, without loading the clusters themselves.
+	The optional --lengths=FASTA flag adds sequence length statistics, using the
+		concatenated FASTA file that was clustered (or its *.fai index; the index is 
+		built by orthobench/faidx.py if it doesn't exist yet). The summary of the 
+		per-OG length spread is added to the statistics table, and the per-OG 
+		statistics are written to a second file (out_base__og_lengths.txt or 
+		Orthology_Comparison_Lengths__<date>--<time>.txt).
+	The optional --profile (or --profile=cprofile) flag, or the ORTHOBENCH_PROFILE
+		environment variable, writes a JSON trace of the time & memory used by each
+		Part of the script; see orthobench/profiling.py.
 
 This script was written for Python 3.9.18, in Spyder 5.4.3. 
 
@@ -64,15 +78,26 @@ This script was written for Python 3.9.18, in Spyder 5.4.3.
 
 # import necessary modules
 import sys # allows execution of script from command line
-from datetime import datetime # access data from system regarding date & time
-import json # allows import and export of data in JSON format
-import pandas as pd # allows manipulation of dataframes in Python
 import os # allows access to the file system
-import statistics # allows calculation of statistics in Python
+# make the shared orthobench package importable from the repository root
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from orthobench import profiling # opt-in time & memory instrumentation
+# start the optional stage-level profiling, enabled with --profile or ORTHOBENCH_PROFILE
+prof = profiling.start("og_stats_benchmark", profiling.pop_flag(sys.argv))
+prof.part("Part 1: Import necessary modules & assign command-line arguments")
+from datetime import datetime # access data from system regarding date & time
+from orthobench import stats # cluster size statistics
 
 
 # assign command line arguments
 
+# remove the optional sequence length flag from the arguments
+lengths_file = None
+for arg in list(sys.argv[1:]):
+	if arg.startswith("--lengths="):
+		lengths_file = arg.split("=", 1)[1]
+		sys.argv.remove(arg)
+
 # create empty list to contain command line arguments
 db_args = []
 
@@ -92,6 +117,7 @@ if (len(db_args) >= 3 and db_args[-2] == "-NAME"):
 	out_base = sys.argv[-1]
 	# designate the outfile name
 	output_db = out_base + "__og_stats.txt"
+	output_lengths = out_base + "__og_lengths.txt"
 	# then remove these elements from the input dictionary list
 	# ref: https://www.geeksforgeeks.org/python-remove-last-k-elements-of-list/
 	db_args = db_args[: len(db_args) - 2]
@@ -103,93 +129,51 @@ else:
 	time_now = now.strftime("%d-%m-%Y--%H%M%S")
 	#and create the resulting outfile name
 	output_db = "Orthology_Comparison_Stats__" + time_now + ".txt"
+	output_lengths = "Orthology_Comparison_Lengths__" + time_now + ".txt"
 
 
-# Part 2: Set up output Pandas dataframe
+# Part 2: Load OG sizes from the input dictionaries
+prof.part("Part 2: Load OG sizes from the input dictionaries")
 
-# create empty dataframe to contain statistics
-# ref: https://stackoverflow.com/questions/13784192/creating-an-empty-pandas-dataframe-and-then-filling-it
-col_names =  ['OG_Source', 'Cluster_Num', 'Min_Size', 'Max_Size', 'Avg_Mean_Size', 
-			  'Median_Size', 'Mode_Size', 'Std_Dev', 'Variance', 'Singletons', 'Singleton_Num']
-stats_df = pd.DataFrame(columns = col_names)
+# create empty dictionaries to contain the OG sizes (& member lengths) of each input file
+named_sizes = {}
+named_lengths = None
+if lengths_file: 
+	# load the sequence length of every protein from the FASTA index
+	seq_lengths = stats.sequence_lengths(lengths_file)
+	named_lengths = {}
+
+for input_db in db_args: 
+	# loop over the elements of the input dictionary list
+	# identify the OG source from the input file basename
+	# and save the size of each OG (number of proteins) under it
+	if named_lengths is not None: 
+		# the member lengths need the members of each OG
+		# so stream the clusters of the shards (or of the JSON dictionary)
+		# and compute the spread of the member sequence lengths of each OG
+		named_lengths[stats.source_name(input_db)] = stats.cluster_lengths(stats.iter_clusters(input_db), seq_lengths)
+		named_sizes[stats.source_name(input_db)] = named_lengths[stats.source_name(input_db)]['Size'].tolist()
+	else: 
+		# for sharded JSON Lines inputs, the sizes are read from the index only
+		named_sizes[stats.source_name(input_db)] = stats.load_sizes(input_db)
+	# record the number of clusters loaded
+	prof.add_rows(len(named_sizes[stats.source_name(input_db)]))
 
 
 # Part 3: Calculate OG statistics
+prof.part("Part 3: Calculate OG statistics")
 
-for db_idx, i in enumerate(db_args): 
-	# loop over the elements of the input dictionary list
-	# save the specific dictionary as a variable
-	input_db = db_args[db_idx]
-	# import the JSON file into a Python dictionary
-	# ref: https://www.geeksforgeeks.org/convert-json-to-dictionary-in-python/
-	with open(input_db, "r") as json_file:
-		# open the JSON file for reading
-		# and extract its contents to a dictionary
-		og_dict = json.load(json_file)
-	# create empty list to populate with information on OG sizes
-	size_list = []
-	for key in og_dict.keys(): 
-		# loop over the elements in the dictionary to extract size information
-		length_og = len(og_dict[key])
-		# save the length of each list of proteins (per OG) to variable length_og
-		# and append this value to the size list
-		size_list.append(length_og)
-	# from here, compile the basic statistics into variables in a list
-	
-	# identifying the OG source file
-	# then use the input file basename
-	base = os.path.basename(input_db)
-	out_base = os.path.splitext(base)[0]
-	# assume that the input file comes from ortho_results_parser.py
-	# and cut off the "_parsed" at the end of the base file name
-	out_base = out_base.replace("_parsed", "")
-	
-	# Number of clusters
-	clust_num = len(og_dict)
-	
-	# Minimum cluster size
-	min_size = min(size_list)
-	
-	# Maximum cluster size
-	max_size = max(size_list)
-	
-	# Avg/Mean cluster size
-	mean_size = statistics.mean(size_list)
-	
-	# Median cluster size
-	median_size = statistics.median(size_list)
-	
-	# Mode cluster size
-	mode_size = statistics.mode(size_list)
-	
-	# Standard Deviation of size distribution
-	# ref: https://www.geeksforgeeks.org/python-standard-deviation-of-list/
-	std_dev_size = statistics.pstdev(size_list)
-	
-	# Variance of size distribution
-	variance_size = statistics.pvariance(size_list)
-	
-	# Are there singletons? 
-	# ref: https://www.geeksforgeeks.org/check-if-element-exists-in-list-in-python/
-	if 1 in size_list: 
-		# see if the value 1 is in the list
-		singleton_yn = "Y"
-	else: 
-		# if there are no singletons
-		singleton_yn = "N"
-	
-	# Number of singletons
-	singleton_num = size_list.count(1)
-	
-	# compile the aboe information into a list
-	clust_type_list = [out_base, clust_num, min_size, max_size, mean_size, median_size, 
-					mode_size, std_dev_size, variance_size, singleton_yn, singleton_num]
-	# and add the list content as a row to the larger dataframe
-	# ref: https://stackoverflow.com/questions/13784192/creating-an-empty-pandas-dataframe-and-then-filling-it
-	stats_df.loc[len(stats_df)] = clust_type_list
+# compile the statistics of each OG source as a row of the larger dataframe
+stats_df = stats.stats_table(named_sizes, named_lengths)
 
 
 # Part 4: Write out results
+prof.part("Part 4: Write out results")
 
 # write out results to a tab-separated text file
 stats_df.to_csv(output_db, index=False, header=True, sep = '\t')
+
+if named_lengths is not None: 
+	# write out the per-OG sequence length statistics of all sources to a second file
+	lengths_df = stats.lengths_table(named_lengths)
+	lengths_df.to_csv(output_lengths, index=False, header=True, sep = '\t')
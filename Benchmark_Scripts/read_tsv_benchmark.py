@@ -0,0 +1,195 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: read_tsv_benchmark.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This program compares the engines available for reading the two-column
+		centroid<TAB>member results tables of Diamond & MMseqs2 (see
+		orthobench/chunked.py) against the single-threaded `pd.read_csv` call that was
+		used before: the pyarrow CSV reader (if installed), and byte ranges parsed in
+		parallel worker processes with different numbers of workers.
+	Each engine is also checked to give exactly the same result as `pd.read_csv`.
+
+List of functions:
+	write_table(path, n_rows, cluster_size): Write a random MMseqs2-style table.
+	time_engine(path, engine, workers, repeats): Read a table repeatedly & return the wall times.
+
+List of standard and non-standard modules used:
+	argparse
+	os
+	sys
+	time
+	random
+	tempfile
+	statistics
+	numpy
+	orthobench.chunked
+
+Procedure:
+	1. Assignment of command-line arguments.
+	2. Writing out a random table (unless an input table is given).
+	3. Timing each engine & checking its results.
+	4. Printing out (and optionally writing out) the results.
+
+Known bugs and limitations:
+	- The worker process timings include starting the processes, and so are only
+		representative for large tables.
+
+Usage:
+	./read_tsv_benchmark.py [-h] [-i INPUT_FILE] [-n ROWS] [-r REPEATS] [-w WORKERS [WORKERS ...]] [-o OUT_FILE]
+	OR
+	python read_tsv_benchmark.py [-h] [-i INPUT_FILE] [-n ROWS] [-r REPEATS] [-w WORKERS [WORKERS ...]] [-o OUT_FILE]
+
+	Where INPUT_FILE is an existing Diamond or MMseqs2 table to read (ie. Pa_DB_90_clu.tsv);
+		otherwise a random table with ROWS lines is written to a temporary directory.
+
+This script was written for Python 3.9.18.
+
+"""
+
+#################################   ARGPARSE   #######################################
+import argparse
+
+
+parser = argparse.ArgumentParser(description =
+								 'This program compares the engines for reading Diamond & MMseqs2 \
+								 centroid/member tables against a single pd.read_csv call.')
+
+parser.add_argument(
+	'-i', '--input',
+	dest='input_file',
+	metavar='INPUT_FILE',
+	help='An existing table to read (default: a random table is generated).'
+	)
+parser.add_argument(
+	'-n', '--rows',
+	dest='rows',
+	metavar='ROWS',
+	type=int,
+	default=5000000,
+	help='Number of lines of the random table (default: 5000000).'
+	)
+parser.add_argument(
+	'-r', '--repeats',
+	dest='repeats',
+	metavar='REPEATS',
+	type=int,
+	default=3,
+	help='Number of times each engine is run (default: 3).'
+	)
+parser.add_argument(
+	'-w', '--workers',
+	dest='workers',
+	metavar='WORKERS',
+	type=int,
+	nargs='+',
+	help='Numbers of worker processes to test (default: 2, 4 & all available cores).'
+	)
+parser.add_argument(
+	'-o', '--outfile',
+	dest='out_file',
+	metavar='OUT_FILE',
+	help='Optionally write the results to this tab-separated text file.'
+	)
+
+args = parser.parse_args()
+
+
+#################################   Main Program   ######################################
+
+
+# Part 1: Import necessary modules
+
+import os # allows access to the operating system
+import sys # access the module search path
+import time # wall clock timer
+import random # generation of random protein IDs
+import tempfile # creation of the temporary directory
+import statistics # summary statistics of the timings
+import numpy as np # comparison of the results
+# make the shared orthobench package importable from the repository root
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from orthobench import chunked # the table readers
+from orthobench.compression import thread_count # number of cores available
+
+
+def write_table(path, n_rows, cluster_size=4):
+	"""Write a random MMseqs2-style table of `n_rows` centroid<TAB>member lines to `path`."""
+	chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+	with open(path, "w") as outfile:
+		centroid = None
+		for row in range(n_rows):
+			member = "".join(random.choices(chars, k=16))
+			if row % cluster_size == 0:
+				# each centroid is the first member of its cluster
+				centroid = member
+			outfile.write(centroid + "\t" + member + "\n")
+
+
+def time_engine(path, engine, workers, repeats):
+	"""Read the table at `path` `repeats` times with an engine & return the wall times & the last result."""
+	times = []
+	for _ in range(repeats):
+		start = time.perf_counter()
+		result = chunked.read_pairs(path, engine, workers)
+		times.append(time.perf_counter() - start)
+	return times, result
+
+
+# Part 2: Write out a random table
+
+work_dir = None
+if args.input_file:
+	table_path = args.input_file
+else:
+	work_dir = tempfile.mkdtemp(prefix="orthobench_read_tsv_")
+	table_path = os.path.join(work_dir, "random_clu.tsv")
+	write_table(table_path, args.rows)
+
+
+# Part 3: Time the engines
+
+cores = thread_count()
+worker_counts = args.workers or sorted({n for n in (2, 4, cores) if n <= cores} | {2})
+runs = [("pandas (pd.read_csv)", "pandas", 1)]
+if chunked.has_pyarrow():
+	runs.append(("pyarrow (" + str(cores) + " threads)", "pyarrow", cores))
+runs += [("processes (" + str(n) + " workers)", "processes", n) for n in worker_counts]
+
+results = []
+try:
+	reference = None
+	for label, engine, workers in runs:
+		times, result = time_engine(table_path, engine, workers, args.repeats)
+		if reference is None:
+			reference = result
+		# check that the engine gives exactly the same arrays as pd.read_csv
+		same = all(np.array_equal(a, b) for a, b in zip(reference, result))
+		results.append((label, min(times), statistics.median(times), "yes" if same else "NO"))
+finally:
+	if work_dir is not None:
+		# remove the random table
+		os.remove(table_path)
+		os.rmdir(work_dir)
+
+
+# Part 4: Print out & write out the results
+
+baseline = results[0][1]
+header = ["Engine", "Min_s", "Median_s", "Speedup", "Same_Result"]
+rows = [[label, "%.3f" % best, "%.3f" % median, "%.2fx" % (baseline / best), same] for label, best, median, same in results]
+width = max(len(row[0]) for row in rows)
+print("Table: " + table_path + " (" + str(len(reference[0])) + " data lines, " + str(cores) + " cores available)")
+print(header[0].ljust(width) + "\t" + "\t".join(header[1:]))
+for row in rows:
+	print(row[0].ljust(width) + "\t" + "\t".join(row[1:]))
+
+if args.out_file:
+	with open(args.out_file, "w") as outfile:
+		outfile.write("\t".join(header) + "\n")
+		for row in rows:
+			outfile.write("\t".join(row) + "\n")
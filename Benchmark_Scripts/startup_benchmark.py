@@ -0,0 +1,168 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: startup_benchmark.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This program measures the per-invocation cost of the OrthoBenchmark command-line
+		scripts, by running each of them repeatedly on tiny input files, so that the
+		time measured is dominated by interpreter startup & module imports. The bare
+		interpreter startup (`python -c pass`) and the cost of importing Pandas alone
+		are measured as references.
+	This is relevant when scripts are run hundreds of times in loops (ie. the
+		per-genome encoding in run_encoding_v2.sh).
+
+List of functions:
+	write_inputs(work_dir): Write the tiny input files used for the benchmark.
+	time_command(cmd, work_dir, repeats): Run a command repeatedly & return the wall times.
+
+List of standard and non-standard modules used:
+	argparse
+	os
+	sys
+	time
+	shutil
+	tempfile
+	subprocess
+	statistics
+
+Procedure:
+	1. Assignment of command-line arguments.
+	2. Writing out tiny input files to a temporary directory.
+	3. Running each script repeatedly & timing the runs.
+	4. Printing out (and optionally writing out) the results.
+
+Known bugs and limitations:
+	- Timings include the operating system's process creation overhead, and so are
+		only comparable between runs on the same machine.
+
+Usage:
+	./startup_benchmark.py [-h] [-n REPEATS] [-o OUT_FILE]
+	OR
+	python startup_benchmark.py [-h] [-n REPEATS] [-o OUT_FILE]
+
+This script was written for Python 3.9.18.
+
+"""
+
+#################################   ARGPARSE   #######################################
+import argparse
+
+
+parser = argparse.ArgumentParser(description =
+								 'This program measures the per-invocation startup cost of the \
+								 OrthoBenchmark command-line scripts on tiny input files.')
+
+parser.add_argument(
+	'-n', '--repeats',
+	dest='repeats',
+	metavar='REPEATS',
+	type=int,
+	default=10,
+	help='Number of times each command is run (default: 10).'
+	)
+parser.add_argument(
+	'-o', '--outfile',
+	dest='out_file',
+	metavar='OUT_FILE',
+	help='Optionally write the results to this tab-separated text file.'
+	)
+
+args = parser.parse_args()
+
+
+#################################   Main Program   ######################################
+
+
+# Part 1: Import necessary modules
+
+import os # allows access to the operating system
+import sys # access the running interpreter
+import time # wall clock timer
+import shutil # removal of the temporary directory
+import tempfile # creation of the temporary directory
+import subprocess # running the scripts as separate processes
+import statistics # summary statistics of the timings
+
+
+# location of the scripts to benchmark
+repo_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+data_dir = os.path.join(repo_dir, "Data_Mgmt")
+analysis_dir = os.path.join(repo_dir, "Analysis_Scripts")
+
+
+def write_inputs(work_dir):
+	"""Write the tiny input files used for the benchmark into `work_dir`."""
+	inputs = {
+		"tiny.faa": ">prot_1 first\nMKVLA\n>prot_2 second\nMKVLL\n>prot_1 first\nMKVLA\n",
+		"tiny.clstr": ">Cluster 0\n0\t5aa, >AAAA... *\n1\t5aa, >BBBB... at 95.00%\n>Cluster 1\n0\t5aa, >CCCC... *\n",
+		"tiny.uc": "S\t0\t5\t*\t*\t*\t*\t*\tAAAA\t*\nH\t0\t5\t95.0\t+\t0\t0\t5M\tBBBB\tAAAA\nS\t1\t5\t*\t*\t*\t*\t*\tCCCC\t*\n",
+		"tiny.tsv": "AAAA\tAAAA\nAAAA\tBBBB\nCCCC\tCCCC\n",
+	}
+	for file_name, content in inputs.items():
+		with open(os.path.join(work_dir, file_name), "w") as outfile:
+			outfile.write(content)
+
+
+def time_command(cmd, work_dir, repeats):
+	"""Run `cmd` in `work_dir` `repeats` times & return the list of wall times in seconds."""
+	times = []
+	for _ in range(repeats):
+		start = time.perf_counter()
+		subprocess.run(cmd, cwd=work_dir, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+		times.append(time.perf_counter() - start)
+	return times
+
+
+# Part 2: Write out the tiny input files
+
+work_dir = tempfile.mkdtemp(prefix="orthobench_startup_")
+write_inputs(work_dir)
+# the database & statistics inputs are created by the parser itself
+subprocess.run([sys.executable, os.path.join(data_dir, "ortho_results_parser.py"), "-i", "tiny.clstr", "-c", "-o", "tiny"],
+			   cwd=work_dir, check=True)
+
+
+# Part 3: Time the commands
+
+python = sys.executable
+commands = [
+	("python -c pass", [python, "-c", "pass"]),
+	("python -c 'import pandas'", [python, "-c", "import pandas"]),
+	("ortho_results_parser.py -v", [python, os.path.join(data_dir, "ortho_results_parser.py"), "-v"]),
+	("ortho_results_parser.py -c", [python, os.path.join(data_dir, "ortho_results_parser.py"), "-i", "tiny.clstr", "-c", "-o", "bench_c"]),
+	("ortho_results_parser.py -u", [python, os.path.join(data_dir, "ortho_results_parser.py"), "-i", "tiny.uc", "-u", "-o", "bench_u"]),
+	("ortho_results_parser.py -m", [python, os.path.join(data_dir, "ortho_results_parser.py"), "-i", "tiny.tsv", "-m", "-o", "bench_m"]),
+	("labelFASTA_dupes.py", [python, os.path.join(data_dir, "labelFASTA_dupes.py"), "tiny.faa"]),
+	("assignFASTAheaders_v3.py", [python, os.path.join(data_dir, "assignFASTAheaders_v3.py"), "tiny.faa", "tiny_encoding.txt"]),
+	("create_ortho_db.py", [python, os.path.join(data_dir, "create_ortho_db.py"), "tiny_parsed_pivot.txt"]),
+	("og_stats_benchmark.py", [python, os.path.join(analysis_dir, "og_stats_benchmark.py"), "tiny_parsed.json", "-NAME", "bench"]),
+]
+
+results = []
+try:
+	for label, cmd in commands:
+		times = time_command(cmd, work_dir, args.repeats)
+		results.append((label, min(times), statistics.median(times), statistics.mean(times)))
+finally:
+	# remove the temporary files, including the outputs of the scripts
+	shutil.rmtree(work_dir)
+
+
+# Part 4: Print out & write out the results
+
+header = ["Command", "Min_ms", "Median_ms", "Mean_ms"]
+rows = [[label] + ["%.1f" % (value * 1000) for value in values] for label, *values in results]
+width = max(len(row[0]) for row in rows)
+print(header[0].ljust(width) + "\t" + "\t".join(header[1:]))
+for row in rows:
+	print(row[0].ljust(width) + "\t" + "\t".join(row[1:]))
+
+if args.out_file:
+	with open(args.out_file, "w") as outfile:
+		outfile.write("\t".join(header) + "\n")
+		for row in rows:
+			outfile.write("\t".join(row) + "\n")
@@ -14,15 +14,15 @@ Description:
 		header is repeated.
 
 List of functions:
-	No functions are defined in this script.
+	No functions are defined in this script. The encoding is done by the
+		encode_headers() function of orthobench/fasta.py.
 
 List of standard and non-standard modules used:
 	sys
 	os
-	re
-	random
-	string
-	pandas
+	orthobench.fasta
+	orthobench.compression
+	orthobench.profiling
 
 Procedure:
 	1. Loading required modules & assigning command line argument.
@@ -58,6 +58,12 @@ Usage
 	./assignFASTAheaders_v3.py input_fasta ref_file
 	OR
 	python assignFASTAheaders_v3.py input_fasta ref_file
+	
+	The input FASTA file can be gzip, bzip2 or Zstandard-compressed. The optional
+		--compress=FORMAT flag (FORMAT is gz, bz2 or zst) compresses the output FASTA file.
+	The optional --profile (or --profile=cprofile) flag, or the ORTHOBENCH_PROFILE
+		environment variable, writes a JSON trace of the time & memory used by each
+		Part of the script; see orthobench/profiling.py.
 
 This script was written for Python 3.9.16, in Spyder 5.4.3. 
 
@@ -69,63 +75,36 @@ This script was written for Python 3.9.16, in Spyder 5.4.3.
 #import necessary modules
 import sys #allows execution of script from command line
 import os #allow access to computer files
-import re #enables regex pattern matching
-import random #enables random number & variable generation
-import string #imports a collection of string constants
-import pandas as pd #allows manipulation of dataframes
-
-
+#make the shared orthobench package importable from the repository root
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from orthobench import profiling #opt-in time & memory instrumentation
+#start the optional stage-level profiling, enabled with --profile or ORTHOBENCH_PROFILE
+prof = profiling.start("assignFASTAheaders_v3", profiling.pop_flag(sys.argv))
+prof.part("Part 1: Import modules & assign command line arguments")
+from orthobench.fasta import encode_headers #FASTA header encoding
+from orthobench.compression import pop_compress_flag, strip_extension, add_extension #compressed files
+
+
+#check whether the output FASTA file should be compressed
+compress = pop_compress_flag(sys.argv)
 #load input and output files
 input_fasta = sys.argv[1]
 #input_fasta = "Pseudomonas_aeruginosa_12-4-4_59_3618__EXTRACT.faa"
 #assign the reference file to a variable
 ref_db_file = sys.argv[2]
 #ref_db_file = "PA_EncodingSummary.txt"
-base = os.path.basename(input_fasta)
+#the output names ignore any compression file extension of the input (ie. "*.faa.gz")
+input_name = strip_extension(input_fasta)
+base = os.path.basename(input_name)
 out_full = os.path.splitext(base)[0]
-output_fasta = ".".join(input_fasta.split('.')[:-1]) + '_edit.fasta'
+output_fasta = add_extension(".".join(input_name.split('.')[:-1]) + '_edit.fasta', compress)
 
 
 # Part 2: Assign the alphanumeric headers and write out results files
+prof.part("Part 2: Assign the alphanumeric headers and write out results files")
 
-with open(input_fasta, "r") as infile, open(output_fasta, "w") as outfile:
-	#open the input and output files
-	#then determine if the reference file already exists
-	if os.path.isfile(ref_db_file) == True:
-		#if the reference file exists, open it to read and append
-		ref_db = open(ref_db_file, "r+")
-		#importing the large reference database into a Pandas dataframe
-		ref_df = pd.read_csv(ref_db, sep="\t", header=None)
-		encoding_list = ref_df[0].tolist()
-	else: 
-		#if the file doesn't already exist, create it
-		ref_db = open(ref_db_file, "w")
-		#create an empty list for the the new sequence IDs
-		encoding_list = []
-	#and now parse the files
-	for line in infile:
-		#iterate through the input file line by line
-		if line.startswith(">"):
-			#identify the header lines and remove the end-line character
-			header = line.strip()
-			#remove the ">" character at the start of the line
-			#this enables easier manipulation of the FASTA header
-			header = re.sub(">", "", header)
-			while True:
-				#generate a random 16-character alphanumeric string to replace the original header
-				assigned_header = ''.join(random.choices(string.ascii_letters + string.digits, k=16))
-				if len(encoding_list) >= 0:
-					#check if the reference database-derived encoding list exists
-					#if it does, check that the same alphanumeric code hasn't already been used somewhere
-					if assigned_header not in encoding_list:
-						break
-			#now print the new header to the outfile
-			outfile.write(">" + assigned_header + "\n")
-			#add the header to the large reference dataframe, along with the file basename
-			ref_db.write(assigned_header + "\t" + header + "\t" + out_full + "\n")
-		else:
-			#sequence lines are copied to the outfile without changes
-			outfile.write(line)
-
-#close the opened reference file
-ref_db.close()
+#replace the FASTA headers with unique alphanumeric codes
+#the reference file is created if it doesn't exist yet, and appended to otherwise
+encoded_num = encode_headers(input_fasta, output_fasta, ref_db_file, out_full)
+#record the number of sequences encoded
+prof.add_rows(encoded_num)
@@ -12,33 +12,70 @@ Description:
 		IDs with their assigned orthologous clusters. 
 
 List of functions:
-	No functions are defined in this script.
+	No functions are defined in this script. The database is built by the functions
+		of orthobench/database.py.
 
 List of standard and non-standard modules used:
 	sys
 	os
-	datetime.datetime
-	pandas
+	json
+	hashlib.blake2b
+	orthobench.database
+	orthobench.compression
+	orthobench.profiling
+	orthobench.validation
+	orthobench.store (only loaded with the --store flag)
+	orthobench.checkpoint (only loaded with the --resume flag)
 
 Procedure:
 	1. Loading required modules & assigning command line arguments.
 	2. Load dataframe into Pandas
-	3. Merge dataframes into larger ortholog database
-	4. Print results to tab-separated text file 
+	3. Merge dataframes into larger ortholog database (saving the progress after every
+		N inputs, with --resume[=N])
+	4. Print results to tab-separated text file (& optionally to a DuckDB or Parquet store)
 
 Known bugs and limitations:
-	- There is no quality-checking integrated into the code.
+	- The cluster assignments are only quality-checked when the --check flag is used.
 	- The output file names are not user-defined, but are instead based on the 
 		program command line submission time. 
 
 Usage
-	./create_ortho_db.py input_db1 [input_db2 input_db3...]
+	./create_ortho_db.py input_db1 [input_db2 input_db3...] [--check[=REFERENCE]] [--store[=STORE]] [--resume[=N]]
 	OR
-	python create_ortho_db.py input_db1 [input_db2 input_db3...]
+	python create_ortho_db.py input_db1 [input_db2 input_db3...] [--check[=REFERENCE]] [--store[=STORE]] [--resume[=N]]
 	
 	Where the input_db should be either a *_parsed_pivot.txt file output by the 
 		ortho_results_parser.py program, or an orthology database previously generated
-		by this program (Orthology_Comparison_DB__*.txt).
+		by this program (Orthology_Comparison_DB__*.txt). Input files can be gzip, bzip2 or
+		Zstandard-compressed. The optional --compress=FORMAT flag (FORMAT is gz, bz2 or zst)
+		compresses the output database, ie. Orthology_Comparison_DB__*.txt.gz.
+	The optional --check flag verifies, as each input file is loaded, that each protein is
+		assigned to exactly one cluster. With --check=REFERENCE (the encoding reference
+		file, FASTA file or *.fai index of the clustered proteins), proteins missing from
+		each input or not in the reference are reported as well. Orthology databases given
+		as inputs are checked column by column, using only the proteins each program
+		assigned to a cluster. A summary is printed per input file (or database column),
+		& the issues found are written to the output database name with the suffix
+		_validation.txt; see orthobench/validation.py.
+	The optional --store flag also writes the database, with the size of the cluster of
+		each protein in each column, into a DuckDB database file (--store=STORE.duckdb,
+		or the output database name with the extension .duckdb if no name is given) or a
+		Parquet file (--store=STORE.parquet). The og_db_query.py program runs canned
+		queries on the store; see orthobench/store.py. This requires the duckdb module.
+	The output files are written under temporary names & only renamed once they are
+		complete. With the optional --resume flag, the database merged so far is also
+		saved after each input file is merged (or after every N input files, with
+		--resume=N), to a create_ortho_db_<hash>_checkpoint/ directory named after the
+		input files. Each save pickles the whole database, which takes about as long &
+		as much disk space as writing it out, so a larger N makes the build faster at
+		the cost of redoing up to N merges after an interruption. Rerunning the same
+		command (with --resume) after an interruption then continues with the input file
+		after the last save, & keeps the output file name of the interrupted build; the
+		checkpoint directory is removed once the build has completed. See
+		orthobench/checkpoint.py.
+	The optional --profile (or --profile=cprofile) flag, or the ORTHOBENCH_PROFILE
+		environment variable, writes a JSON trace of the time & memory used by each
+		Part of the script; see orthobench/profiling.py.
 
 This script was written for Python 3.9.18, in Spyder 5.4.3. 
 
@@ -50,12 +87,51 @@ This script was written for Python 3.9.18, in Spyder 5.4.3.
 # import necessary modules
 import sys # allows execution of script from command line
 import os # allow access to computer files
-from datetime import datetime # access data from system regarding date & time
-import pandas as pd # allows manipulation of dataframes
+import json # serialization of the input file signatures
+from hashlib import blake2b # short hashes naming the checkpoint directories
+# make the shared orthobench package importable from the repository root
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from orthobench import profiling # opt-in time & memory instrumentation
+# start the optional stage-level profiling, enabled with --profile or ORTHOBENCH_PROFILE
+prof = profiling.start("create_ortho_db", profiling.pop_flag(sys.argv))
+prof.part("Part 1: Import modules & assign command line arguments")
+from orthobench import database # building of the query-based orthology database
+from orthobench.compression import pop_compress_flag, strip_extension # optional output compression
+from orthobench import validation # checks of the cluster assignments
 
 
 # determine input files
 
+# check whether the output database should be compressed
+compress = pop_compress_flag(sys.argv)
+
+# check whether the cluster assignments of the inputs should be validated
+check_ref = None
+for arg in list(sys.argv[1:]):
+	if arg == "--check" or arg.startswith("--check="):
+		check_ref = arg.split("=", 1)[1] if "=" in arg else ""
+		sys.argv.remove(arg)
+
+# check whether the database should also be written into a DuckDB or Parquet store
+store_path = None
+for arg in list(sys.argv[1:]):
+	if arg == "--store" or arg.startswith("--store="):
+		store_path = arg.split("=", 1)[1] if "=" in arg else ""
+		sys.argv.remove(arg)
+
+# check whether the progress of the build should be saved, so that it can be resumed
+# & after how many merged input files it should be saved
+resume = False
+resume_every = 1
+for arg in list(sys.argv[1:]):
+	if arg == "--resume" or arg.startswith("--resume="):
+		resume = True
+		if "=" in arg: 
+			resume_every = int(arg.split("=", 1)[1])
+			if resume_every < 1: 
+				raise ValueError("The number of input files merged between saves (--resume=N) must be at least 1")
+		sys.argv.remove(arg)
+
 # create empty list to contain command line arguments
 db_args = []
 
@@ -70,82 +146,88 @@ for idx, x in enumerate(sys.argv[1:]):
 	db_args.append(looping_db_arg)
 
 
-# designate output file name
-# first determine date & time of query
-now = datetime.now()
-time_now = now.strftime("%d-%m-%Y--%H%M%S")
-#and create the resulting outfile name
-output_db = "Orthology_Comparison_DB__" + time_now + ".txt"
+# designate output file name, based on the date & time of query
+output_db = database.default_db_name(compress)
 
+# save the progress of the build, if requested
+# the checkpoint is only resumed if the input files & the options are unchanged
+checkpoint = None
+if resume: 
+	from orthobench.checkpoint import Checkpoint, file_signature # resumable builds
+	signatures = [file_signature(input_db) for input_db in db_args]
+	# each set of inputs has its own checkpoint directory
+	job_key = blake2b(json.dumps(signatures).encode("utf-8"), digest_size=6).hexdigest()
+	checkpoint = Checkpoint("create_ortho_db_" + job_key + "_checkpoint", {
+		"inputs": signatures, "compress": compress, "check": check_ref, "store": store_path})
+	if checkpoint.value("output_db") is not None: 
+		# a resumed build keeps the output file name of the interrupted build
+		output_db = checkpoint.value("output_db")
+		print("Resuming from " + checkpoint.directory, file=sys.stderr)
+	else: 
+		checkpoint.mark("output_db", output_db)
 
-# Part 2: Build the query-based orthology database
+if store_path == "": 
+	# by default, the store is named after the output database
+	store_path = strip_extension(output_db)[:-len(".txt")] + ".duckdb"
 
-if len(db_args) == 1: 
-	# check to see if only 1 argument is given
-	# in which case, simply parse & flip the single database
-	input_db = db_args[0]
-	# determine the basename of the input file
-	# this will also be used in the OG column name
-	base = os.path.basename(input_db)
-	out_base = os.path.splitext(base)[0]
-	# import the dataframe into Pandas
-	input_df = pd.read_csv(input_db, sep='\t', header=0, low_memory=False)
-	# switch the column order
-	# ref: https://stackoverflow.com/questions/13148429/how-to-change-the-order-of-dataframe-columns
-	cols = input_df.columns.tolist()
-	cols = cols[-1:] + cols[:-1]
-	input_df = input_df[cols]
-	# rename the columns
-	# ref: https://stackoverflow.com/questions/11346283/renaming-column-names-in-pandas
-	input_df.columns = ['Query', out_base]
-	# and write out the results to a tab-separated text file
-	input_df.to_csv(output_db, index=False, header=True, sep = '\t')
-
-
-else: 
-	# if there is >1 element in the list of input files
-	for db_idx, i in enumerate(db_args): 
-		# loop over the elements of the input dataframe list
-		# save the specific database as a variable
-		input_db = db_args[db_idx]
-		# import the dataframe into Pandas
-		input_df = pd.read_csv(input_db, sep='\t', header=0, low_memory=False)
-		if db_idx == 0: 
-			# for the first element in the list of input dataframes
-			# check if the input is already in the style of the large orthology dataframe
-			if input_df.columns[0] != "Query": 
-				# if the dataframe is not already formatted in the large dataframe style
-				# determine the basename of the input file
-				# this will also be used in the OG column name
-				base = os.path.basename(input_db)
-				out_base = os.path.splitext(base)[0]
-				# switch the column order
-				cols = input_df.columns.tolist()
-				cols = cols[-1:] + cols[:-1]
-				input_df = input_df[cols]
-				# rename the columns
-				input_df.columns = ['Query', out_base]
-				# then copy the contents of this dataframe into what will be the large dataframe
-				ortho_df = input_df.copy()
-			else: 
-				# if the input database is already in the format of the large database
-				# simply copy the dataframe into the larger dataframe name
-				ortho_df = input_df.copy()
+
+# Part 2: Build the query-based orthology database
+prof.part("Part 2: Build the query-based orthology database")
+
+# load the reference proteins, if the inputs should be checked against them
+check_reports = {}
+reference = None
+if check_ref: 
+	reference = validation.load_reference(check_ref)
+
+# the database built so far & the number of inputs merged into it
+ortho_df = None
+merged_num = 0
+if checkpoint is not None: 
+	# load the database saved after the last column merged by an interrupted build
+	merged_num = max([num for num in range(1, len(db_args) + 1) if checkpoint.done("merged_%03d" % num)], default=0)
+	if merged_num > 0: 
+		ortho_df, check_reports = checkpoint.load("merged_%03d" % merged_num)
+
+# load the input dataframes into Pandas, & merge them into the larger orthology database
+# the basename of each input file will be used as its OG column name
+for input_num, input_db in enumerate(db_args[merged_num:], start=merged_num + 1): 
+	# loop over the remaining input files in order
+	input_df = database.read_pivot(input_db)
+	# record the number of proteins processed
+	prof.add_rows(len(input_df))
+	if check_ref is not None: 
+		# check that each protein of the input is assigned to exactly one cluster
+		if input_df.columns[0] == database.QUERY_COL: 
+			# orthology databases are checked per program column
+			input_reports = validation.check_database(input_df, reference)
 		else: 
-			# for all other elements of the list of dataframes
-			# determine the basename of the input file
-			# this will also be used in the OG column name
-			base = os.path.basename(input_db)
-			out_base = os.path.splitext(base)[0]
-			# switch the column order
-			cols = input_df.columns.tolist()
-			cols = cols[-1:] + cols[:-1]
-			input_df = input_df[cols]
-			# rename the columns
-			input_df.columns = ['Query', out_base]
-			# join the contents of the input dataframe into the larger dataframe
-			# ref: https://stackoverflow.com/questions/53645882/pandas-merging-101
-			# ref: https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.fillna.html
-			ortho_df = ortho_df.merge(input_df, on='Query', how='outer').fillna('-')
-	# finally, write out the large OG dataframe to a tab-separated text file
-	ortho_df.to_csv(output_db, index=False, header=True, sep = '\t')
+			input_reports = {database.column_name(input_db): validation.check_pivot(input_df, reference)}
+		for source, report in input_reports.items(): 
+			print(validation.summary(report, source), file=sys.stderr)
+		check_reports.update(input_reports)
+	ortho_df = database.merge_pivot(ortho_df, input_df, database.column_name(input_db))
+	if checkpoint is not None and input_num % resume_every == 0: 
+		# save the database merged so far, & remove the previous save
+		checkpoint.save("merged_%03d" % input_num, (ortho_df, check_reports))
+		if merged_num > 0: 
+			checkpoint.discard("merged_%03d" % merged_num)
+		merged_num = input_num
+
+if ortho_df is None: 
+	raise ValueError("At least one pivot table is needed to build the orthology database")
+
+if check_ref is not None: 
+	# write out the issues found in all of the inputs
+	validation.write_report(check_reports, strip_extension(output_db)[:-len(".txt")] + "_validation.txt")
+
+# finally, write out the large OG dataframe to a tab-separated text file
+database.write_ortho_db(ortho_df, output_db)
+if store_path: 
+	# and into the columnar store used by og_db_query.py
+	from orthobench.store import write_store # DuckDB & Parquet stores of the database
+	write_store(ortho_df, store_path)
+
+if checkpoint is not None: 
+	# the build has completed, so the checkpoint is no longer needed
+	checkpoint.clear()
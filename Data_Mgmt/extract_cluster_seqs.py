@@ -0,0 +1,205 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: extract_cluster_seqs.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This program extracts the protein sequences of selected orthologous clusters from
+		the (large, concatenated) FASTA file that was clustered, ie. to inspect clusters
+		on which the clustering programs disagree. A samtools faidx-style index of the
+		FASTA file (*.fai) is built in a single pass the first time the program is run
+		on it, and then reused; the FASTA file is memory-mapped, so only the bytes of
+		the requested sequences are read.
+	The cluster members are looked up in a *_parsed_pivot.txt file produced by the
+		ortho_results_parser.py program.
+
+List of functions:
+	No functions are defined in this script. The indexing & extraction is done by the
+		functions of orthobench/faidx.py.
+
+List of standard and non-standard modules used:
+	argparse
+	os
+	sys
+	orthobench.faidx
+	orthobench.profiling
+
+Procedure:
+	1. Assignment of command-line arguments.
+	2. Importing of modules
+	3. Determining the cluster IDs to extract
+	4. Indexing the FASTA file (if needed) & writing out the cluster sequences
+
+Known bugs and limitations:
+	- The FASTA file must not be compressed, since it is memory-mapped.
+	- The index is only rebuilt automatically if it does not exist; use the --reindex
+		flag if the FASTA file has changed since the index was built.
+
+Usage:
+	./extract_cluster_seqs.py [-h] -f FASTA [-p PIVOT] [-c CLUSTER_ID [CLUSTER_ID ...]] [-l ID_LIST]
+		[-o OUT_PATH] [-s] [--index-only] [--reindex] [--profile [{json,cprofile}]] [-v]
+	OR
+	python extract_cluster_seqs.py [-h] -f FASTA [-p PIVOT] [-c CLUSTER_ID [CLUSTER_ID ...]] [-l ID_LIST]
+		[-o OUT_PATH] [-s] [--index-only] [--reindex] [--profile [{json,cprofile}]] [-v]
+
+	Where the cluster IDs to extract are given on the command line (-c) and/or in a text
+		file with one cluster ID per line (-l). By default, all sequences are written to
+		one FASTA file, with the cluster ID added to each header; with the -s flag, one
+		<cluster ID>.fasta file is written per cluster into the OUT_PATH directory.
+
+This script was written for Python 3.9.18.
+
+"""
+
+#################################   ARGPARSE   #######################################
+import argparse
+# the argparse module allows for a single program script to be able to carry out a variety of specified functions
+# this can be done with the specification of unique flags for each command
+
+
+parser = argparse.ArgumentParser(description =
+								 'This program extracts the protein sequences of selected orthologous clusters \
+								 from an indexed, memory-mapped FASTA file, using the cluster assignments in a \
+								 *_parsed_pivot.txt file produced by the ortho_results_parser.py program.')
+
+
+# adding the arguments that the program can use
+parser.add_argument(
+	'-f', '--fasta',
+	dest='fasta_file',
+	metavar='FASTA',
+	required=True,
+	help='The (uncompressed) FASTA file that was clustered.'
+	)
+	# the '-f' flag specifies the FASTA file
+parser.add_argument(
+	'-p', '--pivot',
+	dest='pivot_file',
+	metavar='PIVOT',
+	help='The *_parsed_pivot.txt file containing the cluster assignments.'
+	)
+	# the '-p' flag specifies the pivot table
+parser.add_argument(
+	'-c', '--clusters',
+	dest='cluster_ids',
+	metavar='CLUSTER_ID',
+	nargs='+',
+	default=[],
+	help='One or more cluster IDs to extract (ie. MMS_Cluster_12).'
+	)
+	# the '-c' flag specifies cluster IDs on the command line
+parser.add_argument(
+	'-l', '--list',
+	dest='id_list',
+	metavar='ID_LIST',
+	help='A text file with one cluster ID to extract per line.'
+	)
+	# the '-l' flag specifies a file of cluster IDs
+parser.add_argument(
+	'-o', '--outpath',
+	dest='out_path',
+	metavar='OUT_PATH',
+	help = 'The output FASTA file (or directory, with -s). \n \
+		The default is <pivot basename>_cluster_seqs.fasta (or <pivot basename>_cluster_seqs/).'
+	)
+	# the '-o' flag allows the user to define the output file or directory
+parser.add_argument(
+	'-s', '--split',
+	action='store_true',
+	help='Write one FASTA file per cluster into the OUT_PATH directory.'
+	)
+	# the '-s' flag writes one file per cluster
+parser.add_argument(
+	'--index-only',
+	action='store_true',
+	help='Only build the *.fai index of the FASTA file.'
+	)
+	# the '--index-only' flag skips the extraction
+parser.add_argument(
+	'--reindex',
+	action='store_true',
+	help='Rebuild the *.fai index, even if it already exists.'
+	)
+	# the '--reindex' flag forces the index to be rebuilt
+parser.add_argument(
+	'--profile',
+	nargs='?',
+	const='json',
+	choices=['json', 'cprofile'],
+	help = 'This argument records the time & memory used by each step of the program \n \
+		to a JSON trace file. Use `--profile cprofile` to also write a cProfile dump.'
+	)
+	# the '--profile' flag enables the opt-in stage-level instrumentation
+parser.add_argument(
+	'-v', '--version',
+	action='version',
+	version='%(prog)s 1.0'
+	)
+	# This portion of the code specifies the version of the program; currently 1.0
+
+
+args = parser.parse_args()
+# this command allows the program to execute the arguments in the flags specified above
+if not args.index_only and not args.pivot_file:
+	parser.error("The -p flag is needed to extract cluster sequences.")
+
+
+# set up the optional stage-level profiling
+import os # allows access to the operating system
+import sys # allows access to the module search path
+# make the shared orthobench package importable from the repository root
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from orthobench import profiling # opt-in time & memory instrumentation
+prof = profiling.start("extract_cluster_seqs", args.profile)
+
+
+#################################   Main Program   ######################################
+
+
+# Part 1: Import necessary modules
+prof.part("Part 1: Import necessary modules")
+
+# import necessary modules
+from orthobench import faidx # FASTA indexing & sequence extraction
+from orthobench.compression import open_text, strip_extension # handling of compressed files
+
+
+# Part 2: Determine the cluster IDs to extract
+prof.part("Part 2: Determine the cluster IDs to extract")
+
+# gather the cluster IDs from the command line & the list file, without repeats
+cluster_ids = list(args.cluster_ids)
+if args.id_list:
+	with open_text(args.id_list) as infile:
+		cluster_ids.extend(line.strip() for line in infile if line.strip())
+cluster_ids = list(dict.fromkeys(cluster_ids))
+if not args.index_only and not cluster_ids:
+	parser.error("No cluster IDs were given; use the -c and/or -l flags.")
+
+# determine the output file or directory name
+if args.out_path:
+	out_path = args.out_path
+elif args.pivot_file:
+	base = os.path.splitext(os.path.basename(strip_extension(args.pivot_file)))[0]
+	out_path = base + "_cluster_seqs" + ("" if args.split else ".fasta")
+
+
+# Part 3: Index the FASTA file & write out the cluster sequences
+prof.part("Part 3: Index the FASTA file & write out the cluster sequences")
+
+if args.reindex or not os.path.isfile(faidx.index_path(args.fasta_file)):
+	# build the index in a single pass over the FASTA file
+	fasta_index = faidx.build_index(args.fasta_file)
+	prof.add_rows(len(fasta_index))
+
+if not args.index_only:
+	written = faidx.extract_clusters(args.fasta_file, args.pivot_file, cluster_ids, out_path, split=args.split)
+	# record the number of sequences written out
+	prof.add_rows(sum(written.values()))
+	# report clusters that weren't found in the pivot table
+	not_found = [cluster_id for cluster_id, count in written.items() if count == 0]
+	if not_found:
+		print("Clusters not found in " + args.pivot_file + ": " + ", ".join(not_found), file=sys.stderr)
@@ -13,11 +13,15 @@ Description:
 		integer >= 2.
 
 List of functions:
-	No functions are defined in this script.
+	No functions are defined in this script. The labelling is done by the
+		label_duplicates() function of orthobench/fasta.py.
 
 List of standard and non-standard modules used:
 	sys
-	re
+	os
+	orthobench.fasta
+	orthobench.compression
+	orthobench.profiling
 
 Procedure:
 	1. Loading required modules & assigning command line argument.
@@ -34,6 +38,12 @@ Usage
 	./labelFASTA_dupes.py input_fasta
 	OR
 	python labelFASTA_dupes.py input_fasta 
+	
+	The input FASTA file can be gzip, bzip2 or Zstandard-compressed. The optional
+		--compress=FORMAT flag (FORMAT is gz, bz2 or zst) compresses the output file.
+	The optional --profile (or --profile=cprofile) flag, or the ORTHOBENCH_PROFILE
+		environment variable, writes a JSON trace of the time & memory used by each
+		Part of the script; see orthobench/profiling.py.
 
 This script was written for Python 3.9.16, in Spyder 5.4.3. 
 
@@ -44,49 +54,31 @@ This script was written for Python 3.9.16, in Spyder 5.4.3.
 
 #import necessary modules
 import sys #allows execution of script from command line
-import re #enables regex pattern matching
+import os #allow access to computer files
+#make the shared orthobench package importable from the repository root
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from orthobench import profiling #opt-in time & memory instrumentation
+#start the optional stage-level profiling, enabled with --profile or ORTHOBENCH_PROFILE
+prof = profiling.start("labelFASTA_dupes", profiling.pop_flag(sys.argv))
+prof.part("Part 1: Import modules & assign command line arguments")
+from orthobench.fasta import label_duplicates #FASTA duplicate header labelling
+from orthobench.compression import pop_compress_flag, strip_extension, add_extension #compressed files
 
 
 #load input and output files
+#check whether the output FASTA file should be compressed
+compress = pop_compress_flag(sys.argv)
 input_fasta = sys.argv[1]
 #input_fasta = "Dupes_test_FASTA.fasta"
-output_fasta = ".".join(input_fasta.split('.')[:-1]) + '_CopyN.fasta'
+#the output name ignores any compression file extension of the input (ie. "*.faa.gz")
+input_name = strip_extension(input_fasta)
+output_fasta = add_extension(".".join(input_name.split('.')[:-1]) + '_CopyN.fasta', compress)
 
 
 # Part 2: Assign the alphanumeric headers and write out results files
+prof.part("Part 2: Label duplicate headers and write out results files")
 
-#create empty list for FASTA headers
-header_list = []
-
-#parse the FASTA files and change duplicate FASTA header names
-with open(input_fasta, "r") as infile, open(output_fasta, "w") as outfile:
-	#open the input file for reading and the output file for writing
-	for line in infile:
-		#iterate through the input file line by line
-		if line.startswith(">"):
-			#identify the header lines and remove the end-line character
-			header = line.strip()
-			#remove the ">" character at the start of the line
-			#this enables easier manipulation of the FASTA header
-			header = re.sub(">", "", header)
-			#now check to see whether this FASTA header is a duplicate
-			if header not in header_list:
-				#if the header is not already in the list
-				#add the header to the list of FASTA headers
-				header_list.append(header)
-				#and write the FASTA header out to the outfile as is
-				outfile.write(">" + header + "\n")
-			else: 
-				#if the header is already in the list
-				#count the number of times the header is already in the header list
-				dupe_number = header_list.count(header)
-				#add +1 to the value above
-				copy_number = dupe_number + 1
-				#and then still add the header to the list of FASTA headers
-				header_list.append(header)
-				#write out a new FASTA header to the file including the copy number
-				outfile.write(">" + header + " - Copy " + str(copy_number) + "\n")
-		else: 
-			#for sequence lines
-			#simply print the sequence line to the output file
-			outfile.write(line)
+#parse the FASTA file and change duplicate FASTA header names
+sequence_num = label_duplicates(input_fasta, output_fasta)
+#record the number of sequences processed
+prof.add_rows(sequence_num)
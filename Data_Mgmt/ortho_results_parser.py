@@ -16,16 +16,24 @@ Description:
 		- Diamond
 		- MMseqs2
 		- USEARCH
+		- OrthoFinder
+	Generic clustering results can also be parsed, either as one "cluster<TAB>member" line
+		per protein, or as one line of whitespace- or comma-separated members per cluster.
 
 List of functions:
-	No functions are used in this script.
+	main(): Parse the command line arguments & run the parse. The parsing itself is done
+		by the stream_results(), parse_clusters() & write_results() functions of
+		orthobench/parsers.py.
 
 List of standard and non-standard modules used:
 	argparse
 	os
-    pandas
-	re
-	json
+	sys
+	orthobench.compression
+	orthobench.parsers
+	orthobench.profiling
+	orthobench.validation
+	orthobench.checkpoint
 
 Procedure:
 	1. Assignment of command-line arguments.
@@ -34,21 +42,70 @@ Procedure:
 	4. Parsing input file and outputting results
 
 Known bugs and limitations:
-	- There is no quality-checking integrated into the code.
+	- The cluster assignments are only quality-checked when the --check flag is used.
 	- The basename of the output file can optionally be user-defined.
 	- The program cannot accept multiple input files, nor can it determine the type
 		of input file it was given (ie. which program's results file was used as input).
+	- The first line of the Diamond & MMseqs2 tables is always skipped as a header line,
+		even if it is a centroid<TAB>member line.
 
 Usage:
-	./ortho_results_parser.py [-h] -i INPUT_FILE [-c] [-d] [-m] [-u] [-o OUT_NAME] [-v]
+	./ortho_results_parser.py [-h] -i INPUT_FILE [-c] [-d] [-m] [-u] [-f] [-p] [-l] [-o OUT_NAME] [-z {gz,bz2,zst}] [--check [REFERENCE]] [--jsonl [CLUSTERS_PER_SHARD]] [--engine {auto,pyarrow,processes,pandas}] [-s] [--resume] [--profile [{json,cprofile}]] [-v]
 	OR
-	python ortho_results_parser.py [-h] -i INPUT_FILE [-c] [-d] [-m] [-u] [-o OUT_NAME] [-v]
+	python ortho_results_parser.py [-h] -i INPUT_FILE [-c] [-d] [-m] [-u] [-f] [-p] [-l] [-o OUT_NAME] [-z {gz,bz2,zst}] [--check [REFERENCE]] [--jsonl [CLUSTERS_PER_SHARD]] [--engine {auto,pyarrow,processes,pandas}] [-s] [--resume] [--profile [{json,cprofile}]] [-v]
 	
 	Where the input files accepted are as follows: 
 		- *.clustr file from CD-HIT
 		- *.txt file from `diamond cluster`
 		- *.tsv file from MMseqs2
 		- *.uc file from USEARCH
+		- Orthogroups.tsv or Orthogroups.txt file from OrthoFinder (-f); the orthogroup
+			IDs are kept as they are
+		- generic tab-separated file with one "cluster<TAB>member" line per protein (-p);
+			the cluster IDs are kept as they are
+		- generic file with one line of whitespace- or comma-separated members per
+			cluster (-l); the clusters are numbered in file order
+	Input files can also be gzip, bzip2 or Zstandard-compressed (ie. *.tsv.gz); this is
+		detected automatically. The optional -z flag compresses the output files in the
+		given format; see orthobench/compression.py.
+	The optional --profile flag (or the ORTHOBENCH_PROFILE environment variable) writes
+		a JSON trace of the time & memory used by each Part of the script; see
+		orthobench/profiling.py.
+	The optional --check flag verifies, while the input file is parsed, that each protein
+		is assigned to exactly one cluster. If the encoding reference file, FASTA file or
+		*.fai index of the clustered proteins is given (ie. --check PA_EncodingSummary.txt),
+		proteins missing from the results or not in the reference are reported as well.
+		A summary is printed & the issues found are written to <out_base>_validation.txt;
+		see orthobench/validation.py.
+	The optional --jsonl flag also writes the clusters as sharded JSON Lines files
+		(<out_base>_parsed.000.jsonl, ...; one cluster per line), with an index of the
+		byte offset of each cluster (<out_base>_parsed.jsonl.idx). The index can be given
+		to og_stats_benchmark.py instead of the *_parsed.json file, and single clusters
+		can be read without loading all of them; see orthobench/jsonl.py. The shards are
+		not compressed by the -z flag.
+	The Diamond & MMseqs2 tables are read on multiple cores when they are large: with
+		the pyarrow CSV reader if it is installed, or else by splitting the file into
+		byte ranges that are parsed in parallel worker processes. The --engine flag
+		overrides this choice, & the ORTHOBENCH_THREADS environment variable sets the
+		number of cores used; see orthobench/chunked.py.
+	The optional -s flag gives the clusters stable IDs based on a hash of their smallest
+		member ID (ie. MMS_Cluster_3f9a0c51d2e87b64), with the members sorted & the clusters
+		ordered by their smallest member, so that re-parsing the same clustering always
+		gives identical output files, even if the lines of the input file are reordered.
+		The first line of the Diamond & MMseqs2 tables is read as a header (as it always
+		has been), & is not part of the clustering, so for these tables, this only holds
+		if the first line stays in place.
+		If proteins are assigned to multiple clusters, two clusters can share their
+		smallest member, & the parse stops with an error; with --check, the issues
+		found are still reported (& written to the _validation.txt file) first.
+	The output files are written under temporary names & only renamed once they are
+		complete, so that an interrupted parse never leaves partial output files behind.
+		With the optional --resume flag, the progress of the parse is also saved to the
+		<out_base>_checkpoint/ directory: when the Diamond & MMseqs2 tables are read in
+		worker processes (--engine processes), the chunks are saved as they are parsed,
+		& the output files are recorded as they are completed. Rerunning the same command (with --resume) after an interruption then
+		resumes where the parse stopped; the checkpoint directory is removed once the
+		parse has completed. See orthobench/checkpoint.py.
 
 This script was written for Python 3.9.18, in Spyder 5.4.3.
 
@@ -66,7 +123,8 @@ parser = argparse.ArgumentParser(description =
 								 Three results files will be produced: a JSON dictionary, an expanded pivot table, \
 								 and a compressed comma-separated pivot table. \
 								 The clustering software whose results files can be used as input are: \
-								 CD-HIT, Diamond, MMseqs2 and USEARCH.')
+								 CD-HIT, Diamond, MMseqs2, USEARCH and OrthoFinder, as well as generic \
+								 cluster/member pair or cluster-per-line files.')
 # The most general description of what this program can do is defined here
 
 
@@ -104,6 +162,24 @@ parser.add_argument(
 	help = 'This argument will parse the *.uc results file of the USEARCH program.'
 	)
 	# the '-u' flag will call for a CD-HIT results file to be parsed
+parser.add_argument(
+	'-f', '--orthofinder',
+	action='store_true',
+	help = 'This argument will parse the Orthogroups.tsv or Orthogroups.txt results file of OrthoFinder.'
+	)
+	# the '-f' flag will call for an OrthoFinder results file to be parsed
+parser.add_argument(
+	'-p', '--pairs',
+	action='store_true',
+	help = 'This argument will parse a generic tab-separated file with one "cluster<TAB>member" line per protein.'
+	)
+	# the '-p' flag will call for a generic cluster/member pairs file to be parsed
+parser.add_argument(
+	'-l', '--lines',
+	action='store_true',
+	help = 'This argument will parse a generic file with one line of (whitespace- or comma-separated) members per cluster.'
+	)
+	# the '-l' flag will call for a generic cluster-per-line file to be parsed
 parser.add_argument(
 	'-o', '--outname',
 	metavar='OUT_NAME',
@@ -112,6 +188,71 @@ parser.add_argument(
 		The default basename is the basename of the input file.'
 	)
 	# the '-o' flag allows the user to define a the output file basename
+parser.add_argument(
+	'-z', '--compress',
+	dest='compress',
+	choices=['gz', 'bz2', 'zst'],
+	help = 'This argument compresses the output files in the given format \n \
+		(multithreaded where pigz, lbzip2/pbzip2 or zstd are available).'
+	)
+	# the '-z' flag allows the user to compress the output files
+parser.add_argument(
+	'--check',
+	nargs='?',
+	const='',
+	metavar='REFERENCE',
+	help = 'This argument checks that each protein is assigned to exactly one cluster. \n \
+		Optionally give the encoding reference file, FASTA file or *.fai index that was \n \
+		clustered, to also report proteins missing from (or not in) the reference. \n \
+		Issues are written to <OUT_NAME>_validation.txt.'
+	)
+	# the '--check' flag validates the cluster assignments while the file is parsed
+parser.add_argument(
+	'--jsonl',
+	nargs='?',
+	const=1000000,
+	type=int,
+	metavar='CLUSTERS_PER_SHARD',
+	help = 'This argument also writes the clusters as sharded JSON Lines files (one cluster \n \
+		per line; default 1000000 clusters per shard), with a byte-offset index \n \
+		(<OUT_NAME>_parsed.jsonl.idx) that allows single clusters to be read directly.'
+	)
+	# the '--jsonl' flag writes the sharded JSON Lines output
+parser.add_argument(
+	'--engine',
+	choices=['auto', 'pyarrow', 'processes', 'pandas'],
+	default='auto',
+	help = 'This argument selects how the Diamond & MMseqs2 tables are read: with the \n \
+		multithreaded pyarrow CSV reader, in parallel worker processes, or with a single \n \
+		pd.read_csv call. The default (auto) uses pyarrow or worker processes for large files.'
+	)
+	# the '--engine' flag selects the reader of the centroid/member tables
+parser.add_argument(
+	'-s', '--stable-ids',
+	dest='stable_ids',
+	action='store_true',
+	help = 'This argument names the clusters after a hash of their smallest member ID, \n \
+		& sorts the clusters & their members, so that the same clustering always gives \n \
+		identical output files & cluster IDs. The first line of Diamond & MMseqs2 \n \
+		tables is read as a header, so it must stay in place for this to hold.'
+	)
+	# the '-s' flag gives the clusters deterministic IDs
+parser.add_argument(
+	'--resume',
+	action='store_true',
+	help = 'This argument saves the progress of the parse to the <OUT_NAME>_checkpoint/ \n \
+		directory, so that a rerun of an interrupted parse resumes where it stopped.'
+	)
+	# the '--resume' flag makes the parse resumable
+parser.add_argument(
+	'--profile',
+	nargs='?',
+	const='json',
+	choices=['json', 'cprofile'],
+	help = 'This argument records the time & memory used by each step of the program \n \
+		to a JSON trace file. Use `--profile cprofile` to also write a cProfile dump.'
+	)
+	# the '--profile' flag enables the opt-in stage-level instrumentation
 parser.add_argument(
 	'-v', '--version',
 	action='version',
@@ -121,220 +262,138 @@ parser.add_argument(
 	# The user can call this flag ('-v') without specifying input and output files
 
 
-args = parser.parse_args()
-# this command allows the program to execute the arguments in the flags specified above
-
-
-#################################   Main Program   ######################################
-
-
-# Part 1: Import necessary modules
-
-# import necessary modules
-import os # allows access to the operating system
-import pandas as pd # allows manipulation of dataframes in Python
-import re # enables regex pattern matching
-from string import punctuation # manipulate punctuation marks in strings
-import json # allows import and export of data in JSON format
-
-
-# Part 2: Determine input and output file names
-
-# designate input file name as variable
-input_ortho = args.input_file.name
-
-# determine the output file basename
-if args.out_name: 
-	# if the user has specified an output basename to use
-	# use that file name as the output file basename
-	out_base = args.out_name
-else: 
-	# if no output file basename is provided
-	base = os.path.basename(input_ortho)
-	out_base = os.path.splitext(base)[0]
-
-# establish the output file names
-output_txt = out_base + "_parsed.txt"
-output_pivot = out_base + "_parsed_pivot.txt"
-output_json = out_base + "_parsed.json"
-
-
-# Part 3: Parse input file & output results
-
-# create empty dictionary to store orthologous cluster information
-ortho_dict = {}
-
-
-# parse arguments
-
-if args.cd_hit:
-	# if the user has given a CD-HIT input file
-	with open(input_ortho, "r") as infile, open(output_txt, "w") as outfile_txt, open(output_pivot, "w") as outfile_pivot, open(output_json, "w") as outfile_json:
-		# open the input and output files
-		for line in infile: 
-			# iterate over the input file line by line
-			if line.startswith(">"): 
-				# identify the sections that start a specific cluster ID
-				cluster_id_tmp = line.strip()
-				# strip the end line character from the cluster ID line
-				cluster_id_tmp = re.sub(">", "CDH_", cluster_id_tmp)
-				# remove the ">" character from the cluster ID name
-				cluster_id = re.sub(" ", "_", cluster_id_tmp)
-				# replace space in the cluster ID name with underscore
-				# finally create an empty list to store cluster member IDs
-				cluster_list = []
-			else: 
-				# if the line is a cluster member
-				cluster_line = line.strip()
-				# remove end-line character
-				cluster_member_tmp = cluster_line.split(" ")[1]
-				# extract the cluster member name
-				cluster_member_tmp = re.sub(">", "", cluster_member_tmp)
-				# remove the ">" character from the start of the name
-				cluster_member = cluster_member_tmp.strip(punctuation)
-				# remove the trailing periods from the end of the name
-				# ref: https://stackoverflow.com/questions/37221307/how-do-i-strip-all-leading-and-trailing-punctuation-in-python
-				cluster_list.append(cluster_member)
-				# add the cluster member ID to the cluster membership list
-			ortho_dict[cluster_id] = cluster_list
-			# add the cluster information to the dictionary before moving to the next cluster
-		# export the dictionary to a JSON file
-		json.dump(ortho_dict, outfile_json)
-		# convert dictionary to pandas dataframe in expanded form
-		# ref: https://stackoverflow.com/questions/50751184/pandas-dataframe-from-dictionary-of-list-values
-		ortho_pivot_df = pd.DataFrame([(key, var) for (key, L) in ortho_dict.items() for var in L], 
-								columns=['CD-HIT_ID', 'CD-HIT_Members'])
-		# write out the results to tab-separated text file
-		ortho_pivot_df.to_csv(outfile_pivot, sep='\t', index=False, lineterminator='\n')
-		# convert dictionary to pandas dataframe with lists in column
-		# ref: https://stackoverflow.com/questions/33504424/pandas-dataframe-from-dictionary-with-lists
-		ortho_df = pd.DataFrame([ortho_dict])
-		# next need to flip the columns & rows
-		# ref: https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.transpose.html
-		ortho_df = ortho_df.transpose()
-		# pull the cluster ID column out of the index
-		# ref: https://datatofish.com/index-to-column-pandas-dataframe/
-		ortho_df.reset_index(inplace=True)
-		# add/change the column names
-		# ref: https://www.geeksforgeeks.org/add-column-names-to-dataframe-in-pandas/
-		ortho_df.columns =['CD-HIT_ID', 'CD-HIT_Members']
-		# turn the columns of lists into comma-separated strings
-		# ref: https://stackoverflow.com/questions/45306988/column-of-lists-convert-list-to-string-as-a-new-column
-		ortho_df['CD-HIT_Members'] = [','.join(map(str, l)) for l in ortho_df['CD-HIT_Members']]
-		# export the pandas dataframe as a tab-separated text file
-		ortho_df.to_csv(outfile_txt, sep='\t', index=False, lineterminator='\n')
-		# last argument prevents random extra newlines between cluster info lines
-		# ref: https://stackoverflow.com/questions/56398306/using-pandas-to-write-file-creates-blank-lines
-
-
-if args.diamond or args.mmseqs2: 
-	# same general parsing style can be used for Diamond or MMseqs2
-	# so only the column names have to be specified
-	if args.diamond: 
-		# if the input file is from Diamond, name variables accordingly
-		prog_clust_head = 'DMD_Cluster_'
-		clust_id_col = 'Diamond_ID'
-		clust_mem_col = 'Diamond_Members'
-	if args.mmseqs2: 
-		# if the input file is from MMseqs2, name variables accordingly
-		prog_clust_head = 'MMS_Cluster_'
-		clust_id_col = 'MMseqs2_ID'
-		clust_mem_col = 'MMseqs2_Members'
-	input_df = pd.read_csv(input_ortho, header = 0, sep = "\t")
-	# read the input file into a pandas dataframe
-	# and then set the column names
-	# this is necessary to ensure the following section works for both Diamond & MMseqs2
-	input_df.columns = ['centroid', 'member']
-	# group dataframe to comma-separated strings per cluster
-	ortho_df = input_df.groupby('centroid', as_index = False).agg(list)
-	# pull the cluster ID column out of the index
-	# ref: https://datatofish.com/index-to-column-pandas-dataframe/
-	ortho_df.reset_index(inplace=True)
-	# add cluster name identifier to the previous index column
-	# ref: https://stackoverflow.com/questions/20025882/add-a-string-prefix-to-each-value-in-a-string-column-using-pandas
-	ortho_df['index'] = prog_clust_head + ortho_df['index'].astype(str)
-	# drop centroid id column
-	ortho_df.drop('centroid', axis=1, inplace = True)
-	# rename the columns
-	ortho_df.columns = [clust_id_col, clust_mem_col]
-	# convert the dataframe into a dictionary
-	# ref: https://stackoverflow.com/questions/18695605/how-to-convert-a-dataframe-to-a-dictionary
-	ortho_dict = dict(zip(ortho_df[clust_id_col], ortho_df[clust_mem_col]))
-	with open(output_json, "w") as outfile_json:
-		# open the JSON file for writing
-		# and export the dictionary to a JSON file
-		json.dump(ortho_dict, outfile_json)
-	# convert dictionary to pandas dataframe in expanded form
-	# ref: https://stackoverflow.com/questions/50751184/pandas-dataframe-from-dictionary-of-list-values
-	ortho_pivot_df = pd.DataFrame([(key, var) for (key, L) in ortho_dict.items() for var in L], 
-							columns=[clust_id_col, clust_mem_col])
-	# write out the results to tab-separated text file
-	ortho_pivot_df.to_csv(output_pivot, sep='\t', index=False, lineterminator='\n')
-	# turn the columns of lists into comma-separated strings
-	# ref: https://stackoverflow.com/questions/45306988/column-of-lists-convert-list-to-string-as-a-new-column
-	ortho_df[clust_mem_col] = [','.join(map(str, l)) for l in ortho_df[clust_mem_col]]
-	# export the pandas dataframe as a tab-separated text file
-	ortho_df.to_csv(output_txt, sep='\t', index=False, lineterminator='\n')
-	# last argument prevents random extra newlines between cluster info lines
-	# ref: https://stackoverflow.com/questions/56398306/using-pandas-to-write-file-creates-blank-lines
-
-
-if args.usearch: 
-	# if the input file is from USEARCH
-	with open(input_ortho, "r") as infile, open(output_txt, "w") as outfile_txt, open(output_pivot, "w") as outfile_pivot, open(output_json, "w") as outfile_json:
-		# open the input and output files
-		# create a counter to use to create cluster IDs
-		counter = 0
-		for line in infile: 
-			# iterate over the input file line by line
-			if line.startswith("S"): 
-				# identify the sections that start a specific cluster ID
-				centroid_id = line.strip().split("\t")[8]
-				# strip the end line character from the cluster ID line
-				# also split the elements of the line into a list
-				# and select the sequence ID (pythonic index 8)
-				cluster_id = "USR_Cluster_" + str(counter)
-				# replace space in the cluster ID name with underscore
-				# finally create an empty list to store cluster member IDs
-				cluster_list = []
-				# add the centroid sequence ID to the list
-				cluster_list.append(centroid_id)
-				# add +1 to the counter for the next iteration
-				counter += 1
-			elif line.startswith("H"): 
-				# if the line is a cluster member
-				cluster_member = line.strip().split("\t")[8]
-				# strip the end line character from the line
-				# also split the elements of the line into a list
-				# and select the sequence ID (pythonic index 8)
-				cluster_list.append(cluster_member)
-				# add the cluster member ID to the cluster membership list
-			ortho_dict[cluster_id] = cluster_list
-			# add the cluster information to the dictionary before moving to the next cluster
-		# export the dictionary to a JSON file
-		json.dump(ortho_dict, outfile_json)
-		# convert dictionary to pandas dataframe in expanded form
-		# ref: https://stackoverflow.com/questions/50751184/pandas-dataframe-from-dictionary-of-list-values
-		ortho_pivot_df = pd.DataFrame([(key, var) for (key, L) in ortho_dict.items() for var in L], 
-								columns=['USEARCH_ID', 'USEARCH_Members'])
-		# write out the results to tab-separated text file
-		ortho_pivot_df.to_csv(outfile_pivot, sep='\t', index=False, lineterminator='\n')
-		# convert dictionary to pandas dataframe with lists in column
-		# ref: https://stackoverflow.com/questions/33504424/pandas-dataframe-from-dictionary-with-lists
-		ortho_df = pd.DataFrame([ortho_dict])
-		# next need to flip the columns & rows
-		# ref: https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.transpose.html
-		ortho_df = ortho_df.transpose()
-		# pull the cluster ID column out of the index
-		# ref: https://datatofish.com/index-to-column-pandas-dataframe/
-		ortho_df.reset_index(inplace=True)
-		# add/change the column names
-		# ref: https://www.geeksforgeeks.org/add-column-names-to-dataframe-in-pandas/
-		ortho_df.columns =['USEARCH_ID', 'USEARCH_Members']
-		# turn the columns of lists into comma-separated strings
-		# ref: https://stackoverflow.com/questions/45306988/column-of-lists-convert-list-to-string-as-a-new-column
-		ortho_df['USEARCH_Members'] = [','.join(map(str, l)) for l in ortho_df['USEARCH_Members']]
-		# export the pandas dataframe as a tab-separated text file
-		ortho_df.to_csv(outfile_txt, sep='\t', index=False, lineterminator='\n')
-		# last argument prevents random extra newlines between cluster info lines
-		# ref: https://stackoverflow.com/questions/56398306/using-pandas-to-write-file-creates-blank-lines
+def main():
+	"""Parse the results file given on the command line & write out the results files."""
+	args = parser.parse_args()
+	# this command allows the program to execute the arguments in the flags specified above
+
+
+	# set up the optional stage-level profiling
+	import os # allows access to the operating system
+	import sys # allows access to the module search path
+	# make the shared orthobench package importable from the repository root
+	sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+	from orthobench import profiling # opt-in time & memory instrumentation
+	prof = profiling.start("ortho_results_parser", args.profile)
+
+
+	#################################   Main Program   ######################################
+
+
+	# Part 1: Import necessary modules
+	prof.part("Part 1: Import necessary modules")
+
+	# import necessary modules
+	# Pandas is only loaded by the parser for the Diamond & MMseqs2 input files
+	from orthobench.compression import strip_extension # handling of compressed file names
+	from orthobench.parsers import STREAMING_FORMATS, stream_results, parse_clusters, stable_pivot, write_results
+	if args.check is not None:
+		# validation of the cluster assignments
+		from orthobench import validation
+	if args.resume:
+		# resumable parsing
+		from orthobench.checkpoint import Checkpoint, file_signature
+
+
+	# Part 2: Determine input and output file names
+	prof.part("Part 2: Determine input and output file names")
+
+	# designate input file name as variable
+	input_ortho = args.input_file.name
+
+	# determine the output file basename
+	if args.out_name: 
+		# if the user has specified an output basename to use
+		# use that file name as the output file basename
+		out_base = args.out_name
+	else: 
+		# if no output file basename is provided
+		# ignoring any compression file extension (ie. "Pa_DB_90_clu.tsv.gz")
+		base = os.path.basename(strip_extension(input_ortho))
+		out_base = os.path.splitext(base)[0]
+
+
+	# Part 3: Parse input file & output results
+	prof.part("Part 3: Parse input file & output results")
+
+	# determine which clustering program's results file was given
+	if args.cd_hit:
+		# if the user has given a CD-HIT input file
+		input_format = "cd-hit"
+	elif args.diamond:
+		# if the input file is from Diamond
+		input_format = "diamond"
+	elif args.mmseqs2:
+		# if the input file is from MMseqs2
+		input_format = "mmseqs2"
+	elif args.usearch:
+		# if the input file is from USEARCH
+		input_format = "usearch"
+	elif args.orthofinder:
+		# if the input file is from OrthoFinder
+		input_format = "orthofinder"
+	elif args.pairs:
+		# if the input file has one cluster/member pair per line
+		input_format = "pairs"
+	elif args.lines:
+		# if the input file has one cluster per line
+		input_format = "lines"
+	else:
+		parser.error("One of the -c, -d, -m, -u, -f, -p or -l flags is needed to specify the input file type.")
+
+	# load the reference proteins, if the cluster assignments should be checked against them
+	reference = None
+	if args.check: 
+		reference = validation.load_reference(args.check)
+
+	# save the progress of the parse, if requested
+	# the checkpoint is only resumed if the input file & the options are unchanged
+	checkpoint = None
+	if args.resume: 
+		checkpoint = Checkpoint(out_base + "_checkpoint", {
+			"input": file_signature(input_ortho), "format": input_format, "compress": args.compress,
+			"jsonl": args.jsonl, "stable_ids": args.stable_ids, "check": args.check})
+		if checkpoint.resumed: 
+			print("Resuming from " + checkpoint.directory, file=sys.stderr)
+
+	# the issues found by the check are reported even if the parse then stops with an error
+	# ie. when clusters share their smallest member, & so can't be given stable IDs
+	check_report = None
+	try: 
+		if input_format in STREAMING_FORMATS: 
+			# the line-based CD-HIT, USEARCH, OrthoFinder & generic files are parsed without Pandas
+			# the outputs are the JSON dictionary, expanded pivot table & compressed pivot table
+			# the records are checked as they are parsed
+			check = validation.MembershipCheck(reference) if args.check is not None else None
+			try: 
+				prof.add_rows(stream_results(input_ortho, input_format, out_base, args.compress, check, args.jsonl, args.stable_ids, checkpoint))
+			finally: 
+				if check is not None: 
+					check_report = check.report()
+		else: 
+			# parse the input file into a pivot table with one row per protein
+			ortho_pivot_df = parse_clusters(input_ortho, input_format, args.engine, checkpoint=checkpoint)
+			# record the number of proteins parsed
+			prof.add_rows(len(ortho_pivot_df))
+			if args.check is not None: 
+				# check the cluster assignments of the pivot table
+				check_report = validation.check_pivot(ortho_pivot_df, reference)
+			if args.stable_ids: 
+				# rename & reorder the clusters deterministically (after checking the assignments)
+				ortho_pivot_df = stable_pivot(ortho_pivot_df, input_format)
+			# and write out the JSON dictionary, expanded pivot table & compressed pivot table
+			write_results(ortho_pivot_df, out_base, args.compress, args.jsonl, checkpoint)
+	finally: 
+		if check_report is not None: 
+			# report the results of the check on the terminal & write out the issues found
+			print(validation.summary(check_report, out_base), file=sys.stderr)
+			validation.write_report({out_base: check_report}, out_base + "_validation.txt")
+
+	if checkpoint is not None: 
+		# the parse has completed, so the checkpoint is no longer needed
+		checkpoint.clear()
+
+
+# the script is only run when executed, & not when it is imported (ie. by a worker process)
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: orthobench/__init__.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	Shared helper package for the OrthoBenchmark workflow scripts in the Data_Mgmt/
+		and Analysis_Scripts/ directories.
+	The workflow steps are exposed as importable functions that pass in-memory Pandas
+		dataframes between each other, so that pipelines can chain the steps without
+		writing intermediate text files, ie.:
+			from orthobench import parse_clusters, build_ortho_db, cluster_counts
+			pivots = {"CD-HIT_Pa_90": parse_clusters("Pa_90.clstr", "cd-hit"),
+					  "MMseqs2_Pa_90": parse_clusters("Pa_DB_90_clu.tsv", "mmseqs2")}
+			counts_df = cluster_counts(build_ortho_db(pivots))
+	The command-line scripts are thin wrappers around these functions.
+
+List of modules:
+	parsers: Parsing of clustering results files into pivot tables & writing of the
+		standard *_parsed* results files.
+	chunked: Multi-core reading of the Diamond & MMseqs2 centroid/member tables into
+		integer-coded arrays.
+	jsonl: Sharded JSON Lines cluster files with a byte-offset index, for streaming
+		or random access to single clusters.
+	database: Building the query-based orthology database from pivot tables.
+	store: DuckDB & Parquet stores of the orthology database, & canned queries over them.
+	stats: Cluster membership counts & cluster size statistics.
+	fasta: Labelling of duplicate FASTA headers & encoding of FASTA headers.
+	faidx: samtools faidx-style indexing of FASTA files & extraction of the member
+		sequences of clusters from a memory-mapped FASTA file.
+	sampling: Estimates of the pairwise agreement of the clusterings from sampled
+		protein pairs.
+	nesting: Nesting & purity of the clusters of each program across consecutive
+		percent identity thresholds.
+	validation: Checks that each protein is assigned to exactly one cluster, & that all
+		of the clustered proteins are covered.
+	checkpoint: Atomic output files & resumable checkpoints of long parse & database
+		build jobs.
+	compression: Transparent reading & writing of gzip, bzip2 & Zstandard-compressed
+		text files.
+	profiling: Opt-in stage-level wall time, CPU time, peak RSS & row count
+		instrumentation for the numbered "Part" steps of each script.
+
+Usage:
+	The scripts add the repository root to the module search path, so no installation
+		is needed when they are run from within the repository. When the scripts are
+		copied into a flat Scripts/ directory (as on Vera & Phoebe), copy this
+		orthobench/ directory alongside them.
+
+"""
+
+
+# the public functions of the submodules are re-exported here, but only imported on
+# first access, so that importing orthobench (or orthobench.profiling) stays cheap and
+# doesn't load Pandas on the code paths that don't need it
+# ref: https://peps.python.org/pep-0562/
+_EXPORTS = {
+	"parse_clusters": "parsers",
+	"stable_pivot": "parsers",
+	"cluster_dict": "parsers",
+	"compressed_pivot": "parsers",
+	"write_results": "parsers",
+	"stream_results": "parsers",
+	"read_pairs": "chunked",
+	"write_jsonl": "jsonl",
+	"iter_jsonl": "jsonl",
+	"ClusterIndex": "jsonl",
+	"read_pivot": "database",
+	"merge_pivot": "database",
+	"build_ortho_db": "database",
+	"write_ortho_db": "database",
+	"write_store": "store",
+	"OrthoStore": "store",
+	"cluster_counts": "stats",
+	"clean_counts": "stats",
+	"load_clusters": "stats",
+	"cluster_sizes": "stats",
+	"cluster_stats": "stats",
+	"stats_table": "stats",
+	"label_duplicates": "fasta",
+	"encode_headers": "fasta",
+	"build_index": "faidx",
+	"extract_clusters": "faidx",
+	"nesting_tables": "nesting",
+	"estimate_agreement": "sampling",
+	"load_reference": "validation",
+	"check_pivot": "validation",
+	"check_database": "validation",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+	"""Import the submodule providing a re-exported function (or class) on first access."""
+	if name in _EXPORTS:
+		from importlib import import_module # loads the submodule on first use
+		module = import_module("." + _EXPORTS[name], __name__)
+		return getattr(module, name)
+	raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+
+
+def __dir__():
+	return sorted(list(globals()) + __all__)
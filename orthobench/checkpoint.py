@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: checkpoint.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module makes long parse & database build jobs resumable, & their output files
+		safe to use by the next step of the workflow.
+	Output files are written atomically: each file is written under a temporary name in
+		the same directory (".<name>.tmp"), & only renamed to its final name once it
+		has been written completely. A job that is killed or times out therefore never
+		leaves a partially written *_parsed_pivot.txt file (or database) behind that
+		could silently be used as an input. The temporary name is the same in every
+		run, & temporary files left behind by an interrupted run are removed before the
+		file is written again (& from the checkpoint directory when a job is resumed).
+	Progress is recorded in a checkpoint directory: a marker file (checkpoint.json)
+		lists the steps that have been completed (ie. the input chunks parsed, or the
+		columns merged into the database), & the intermediate results of these steps
+		are saved alongside it. The marker also records the settings of the job & the
+		size & modification time of its input files; if these differ when the job is
+		rerun, the checkpoint is discarded & the job starts from scratch. The
+		checkpoint directory is removed once the job has completed.
+
+List of functions:
+	atomic_path(path): Context manager returning a temporary path that is renamed to `path` on success.
+	remove_stale(path): Remove the temporary files left next to `path` by interrupted writes.
+	file_signature(path): Return the (absolute path, size, modification time) of an input file.
+
+List of classes:
+	Checkpoint: The completed steps & saved intermediate results of a resumable job.
+
+List of standard and non-standard modules used:
+	os
+	glob
+	json
+	pickle
+	shutil
+	contextlib.contextmanager
+
+Usage:
+	with atomic_path("MMseqs2_Pa_90_parsed_pivot.txt") as tmp_path:
+		pivot_df.to_csv(tmp_path, sep="\t", index=False)
+	checkpoint = Checkpoint("MMseqs2_Pa_90_checkpoint", {"input": file_signature("Pa_DB_90_clu.tsv")})
+	if not checkpoint.done("chunk_00000"):
+		checkpoint.save("chunk_00000", chunk)
+
+"""
+
+
+import os # allow access to computer files
+import glob # finding of leftover temporary files
+import json # allows import and export of data in JSON format
+import pickle # serialization of the intermediate results
+import shutil # removal of the checkpoint directory
+from contextlib import contextmanager # creation of context managers
+
+
+# name of the marker file in a checkpoint directory
+MARKER_NAME = "checkpoint.json"
+# infix of the temporary file names
+TMP_INFIX = ".tmp"
+
+
+def remove_stale(path):
+	"""Remove the temporary files (".<name>.tmp*") left next to `path` by interrupted writes."""
+	directory, name = os.path.split(path)
+	for stale_path in glob.glob(os.path.join(glob.escape(directory), "." + glob.escape(name) + TMP_INFIX + "*")):
+		os.remove(stale_path)
+
+
+@contextmanager
+def atomic_path(path):
+	"""Yield a temporary path in the directory of `path`, & rename it to `path` once the block completes.
+
+	The temporary name (".<name>.tmp<extension>") is the same in every run, & keeps the
+		file extension, so that compression is still determined from the extension
+		(see compression.open_text()). Temporary files left behind by an interrupted
+		run are removed first. If the block raises an exception, the temporary file is
+		removed & `path` is left untouched.
+	"""
+	directory, name = os.path.split(path)
+	tmp_path = os.path.join(directory, "." + name + TMP_INFIX + os.path.splitext(name)[1])
+	remove_stale(path)
+	try:
+		yield tmp_path
+		os.replace(tmp_path, path)
+	finally:
+		if os.path.exists(tmp_path):
+			os.remove(tmp_path)
+
+
+def file_signature(path):
+	"""Return the absolute path, size & modification time of a file, to detect changed inputs."""
+	stat = os.stat(path)
+	return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+class Checkpoint:
+	"""The completed steps & saved intermediate results of a resumable job.
+
+	`directory` is the checkpoint directory & `settings` a JSON-serializable description of
+		the job (ie. the input file signatures & options). An existing checkpoint is
+		resumed only if it was made with the same settings; the temporary files of saves
+		that were interrupted are then removed.
+
+	Usage:
+		checkpoint = Checkpoint("MMseqs2_Pa_90_checkpoint", settings)
+		for step in steps:
+			if checkpoint.done(step):
+				result = checkpoint.load(step)
+			else:
+				checkpoint.save(step, run(step))
+		checkpoint.clear()
+	"""
+
+	def __init__(self, directory, settings):
+		self.directory = directory
+		# round-trip the settings through JSON, so that they compare equal to the saved ones
+		self.settings = json.loads(json.dumps(settings, default=str))
+		self.steps = {}
+		self.resumed = False
+		marker = self._marker_path()
+		if os.path.exists(marker):
+			with open(marker, "r") as marker_file:
+				saved = json.load(marker_file)
+			if saved.get("settings") == self.settings:
+				self.steps = saved.get("steps", {})
+				self.resumed = bool(self.steps)
+				# remove the temporary files of interrupted saves
+				for stale_path in glob.glob(os.path.join(glob.escape(self.directory), ".*" + TMP_INFIX + "*")):
+					os.remove(stale_path)
+			else:
+				# the inputs or options have changed, so start over
+				self.clear()
+		os.makedirs(self.directory, exist_ok=True)
+
+	def _marker_path(self):
+		return os.path.join(self.directory, MARKER_NAME)
+
+	def _write_marker(self):
+		with atomic_path(self._marker_path()) as tmp_path:
+			with open(tmp_path, "w") as marker_file:
+				json.dump({"settings": self.settings, "steps": self.steps}, marker_file, default=str)
+
+	def path(self, name):
+		"""Return the path of a file in the checkpoint directory."""
+		return os.path.join(self.directory, name)
+
+	def done(self, step):
+		"""Return True if a step has been completed (& its saved result, if any, still exists)."""
+		if step not in self.steps:
+			return False
+		return not self.steps[step].get("saved") or os.path.exists(self.path(step + ".pkl"))
+
+	def value(self, step, default=None):
+		"""Return the JSON value recorded with a completed step."""
+		return self.steps[step].get("value", default) if step in self.steps else default
+
+	def mark(self, step, value=None):
+		"""Record a step as completed, optionally with a small JSON-serializable value."""
+		self.steps[step] = {"value": value} if value is not None else {}
+		self._write_marker()
+
+	def save(self, step, result, value=None):
+		"""Save the result of a step to the checkpoint directory (atomically), & record the step as completed."""
+		with atomic_path(self.path(step + ".pkl")) as tmp_path:
+			with open(tmp_path, "wb") as result_file:
+				pickle.dump(result, result_file, protocol=pickle.HIGHEST_PROTOCOL)
+		self.steps[step] = {"saved": True}
+		if value is not None:
+			self.steps[step]["value"] = value
+		self._write_marker()
+
+	def load(self, step):
+		"""Load the saved result of a completed step."""
+		with open(self.path(step + ".pkl"), "rb") as result_file:
+			return pickle.load(result_file)
+
+	def discard(self, step):
+		"""Remove the saved result of a step that is no longer needed.
+
+		The step is then no longer done() (its result can't be loaded), so that the
+			latest step with a saved result can be found, ie. the last merge of a build.
+		"""
+		if os.path.exists(self.path(step + ".pkl")):
+			os.remove(self.path(step + ".pkl"))
+
+	def clear(self):
+		"""Remove the checkpoint directory, ie. once the job has completed."""
+		self.steps = {}
+		if os.path.isdir(self.directory):
+			shutil.rmtree(self.directory)
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: chunked.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module reads the two-column centroid<TAB>member results tables of Diamond &
+		MMseqs2 on multiple cores, instead of with a single-threaded `pd.read_csv` call.
+		The file is split into byte ranges of about equal size, each range is moved
+		forward to the next line break so that no line is split, and the ranges are
+		parsed with vectorized numpy operations in parallel worker processes (started
+		with the "fork" method). Each worker factorizes the centroid IDs of its chunk &
+		returns their integer codes, with the member IDs joined into a single byte
+		string, and the chunks are then merged into integer codes for the whole file.
+	If the pyarrow library is installed, its multithreaded CSV reader is used instead.
+	As with the `pd.read_csv(header=0)` call used before, the first line of the file is
+		treated as a header & skipped.
+	Optionally, each parsed byte range is saved to a checkpoint (see the checkpoint
+		module), so that a read that was interrupted resumes where it stopped; this is
+		only done by the "processes" engine.
+	The result is returned as arrays that are ready for grouping the members by cluster:
+		- centroid_codes: the integer code of the centroid of each line, numbered in the
+			sorted order of the centroid IDs
+		- centroid_ids: the centroid ID of each code
+		- members: the member ID of each line, in file order
+
+List of functions:
+	byte_ranges(path, n_chunks): Split a file into byte ranges that start at line starts.
+	read_pairs(path, engine="auto", workers=None, checkpoint=None): Read a centroid/member table into
+		coded arrays.
+	has_pyarrow(): Return True if the pyarrow library is installed.
+
+List of standard and non-standard modules used:
+	os
+	multiprocessing (only loaded for the "processes" engine)
+	numpy (imported lazily)
+	pandas (imported lazily)
+	pyarrow (optional; imported lazily)
+	orthobench.compression
+
+Known bugs and limitations:
+	- Compressed input files can't be split into byte ranges, so they are read with
+		pyarrow (if installed) or with a single `pd.read_csv` call.
+	- Unlike `pd.read_csv` with its defaults, the "processes" engine converts no values
+		to NaN (ie. a protein named "NA") & doesn't treat quotes specially.
+	- Where the "fork" start method is not available, the "processes" engine parses the
+		byte ranges one at a time in the main process.
+
+"""
+
+
+import os # allow access to computer files
+from .compression import compression_type, thread_count, open_text # (de)compression helpers
+
+
+# engines that can be used to read the tables
+ENGINES = ("auto", "pyarrow", "processes", "pandas")
+# with the "auto" engine, files smaller than this are read with Pandas, since starting the
+# worker processes (or importing pyarrow) would take longer than parsing the file
+MIN_PARALLEL_BYTES = 64 * 1024 * 1024
+
+
+def byte_ranges(path, n_chunks):
+	"""Split a file into at most `n_chunks` (start, end) byte ranges that begin at the start of a line.
+
+	The ranges are contiguous & cover the whole file; each range boundary is moved
+		forward to just after the next line break.
+	"""
+	size = os.path.getsize(path)
+	n_chunks = max(1, min(n_chunks, size))
+	boundaries = [0]
+	with open(path, "rb") as infile:
+		for chunk_num in range(1, n_chunks):
+			position = max(size * chunk_num // n_chunks, boundaries[-1])
+			infile.seek(position)
+			if position > 0:
+				# move forward to the start of the next line
+				infile.seek(position - 1)
+				infile.readline()
+			boundaries.append(min(infile.tell(), size))
+	boundaries.append(size)
+	return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def _range_mask(size, starts, stops):
+	"""Return a boolean mask of `size` bytes that is True within the non-overlapping [start, stop) ranges."""
+	import numpy as np # allows vectorized array operations
+	steps = np.zeros(size + 1, dtype=np.int8)
+	steps[starts] += 1
+	steps[stops] -= 1
+	return np.cumsum(steps[:-1], dtype=np.int8).astype(bool)
+
+
+def _parse_range(task):
+	"""Parse the lines of one byte range of a file (run in a worker process).
+
+	The line breaks & tabs are located with vectorized numpy operations on the raw bytes,
+		& the centroid & member fields are cut out as 2 byte strings of line-separated
+		IDs, so that no Python-level loop over the lines is needed. Returns the unique
+		centroid IDs of the chunk, the chunk-level centroid codes (int32) & the member
+		IDs as a single line-separated UTF-8 byte string, which is much faster to send
+		back to the main process than an array of strings.
+	"""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	path, start, end = task
+	with open(path, "rb") as infile:
+		infile.seek(start)
+		data = infile.read(end - start)
+	if start == 0:
+		# skip the header line, as pd.read_csv(header=0) does
+		header_end = data.find(b"\n")
+		data = data[header_end + 1:] if header_end >= 0 else b""
+	if data and not data.endswith(b"\n"):
+		data += b"\n"
+	buffer = np.frombuffer(data, dtype=np.uint8)
+	line_ends = np.flatnonzero(buffer == 10)
+	line_starts = np.concatenate(([0], line_ends + 1))[:len(line_ends)].astype(np.int64)
+	# leave out the carriage returns of Windows line breaks
+	content_ends = line_ends - ((line_ends > line_starts) & (buffer[line_ends - 1] == 13))
+	# & skip blank lines, as pd.read_csv does
+	filled = content_ends > line_starts
+	line_starts, content_ends = line_starts[filled], content_ends[filled]
+	# the centroid ends at the first tab of the line, & the member at the next tab or the line end
+	tabs = np.append(np.flatnonzero(buffer == 9), len(buffer))
+	first_tabs = np.searchsorted(tabs, line_starts)
+	centroid_ends = tabs[first_tabs]
+	if (centroid_ends >= content_ends).any():
+		line_num = int(np.argmax(centroid_ends >= content_ends))
+		line = data[line_starts[line_num]:content_ends[line_num]].decode("utf-8", "replace")
+		raise ValueError("Expected a centroid<TAB>member line in " + path + ", found: " + line)
+	if len(tabs) - 1 == len(line_ends) and filled.all() and (content_ends == line_ends).all():
+		# every line is a plain centroid<TAB>member line (the usual case), so the text can
+		# be split on both the tabs & the line breaks, & the fields taken alternately
+		fields = data.decode("utf-8").replace("\t", "\n").split("\n")[:-1]
+		codes, uniques = pd.factorize(np.array(fields[0::2], dtype=object))
+		members = ("\n".join(fields[1::2]) + "\n").encode("utf-8") if fields else b""
+		return np.asarray(uniques, dtype=object), codes.astype(np.int32), members
+	member_ends = np.minimum(tabs[np.minimum(first_tabs + 1, len(tabs) - 1)], content_ends)
+	# end each field with a line break, & cut the fields out of the buffer
+	fields = buffer.copy()
+	fields[centroid_ends] = 10
+	fields[member_ends] = 10
+	centroids = fields[_range_mask(len(fields), line_starts, centroid_ends + 1)].tobytes()
+	members = fields[_range_mask(len(fields), centroid_ends + 1, member_ends + 1)].tobytes()
+	codes, uniques = pd.factorize(np.array(centroids.decode("utf-8").split("\n")[:-1], dtype=object))
+	return np.asarray(uniques, dtype=object), codes.astype(np.int32), members
+
+
+def _split_members(members):
+	"""Split the line-separated member IDs of a chunk back into an array of strings."""
+	import numpy as np # allows vectorized array operations
+	return np.array(members.decode("utf-8").split("\n")[:-1], dtype=object)
+
+
+def _merge_chunks(chunks):
+	"""Merge the chunk-level centroid codes of several chunks into codes for the whole file."""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	if not chunks:
+		return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=object), np.zeros(0, dtype=object)
+	# number the centroids of all chunks together, in sorted order
+	all_uniques = np.concatenate([uniques for uniques, _, _ in chunks])
+	global_codes, centroid_ids = pd.factorize(all_uniques, sort=True)
+	# and translate the codes of each chunk
+	centroid_codes = []
+	offset = 0
+	for uniques, codes, _ in chunks:
+		centroid_codes.append(global_codes[offset:offset + len(uniques)][codes])
+		offset += len(uniques)
+	members = np.concatenate([_split_members(chunk_members) for _, _, chunk_members in chunks])
+	return np.concatenate(centroid_codes).astype(np.int64), np.asarray(centroid_ids, dtype=object), members
+
+
+def _fork_context():
+	"""Return the "fork" multiprocessing context, or None where it is not available (ie. Windows).
+
+	Forked workers don't re-import the calling script, so the scripts work whatever the
+		default start method (spawn on macOS, & forkserver on Linux from Python 3.14).
+	"""
+	import multiprocessing # parallel worker processes
+	if "fork" not in multiprocessing.get_all_start_methods():
+		return None
+	return multiprocessing.get_context("fork")
+
+
+def _read_processes(path, workers, checkpoint=None):
+	"""Read an uncompressed table by parsing byte ranges in parallel worker processes.
+
+	If a checkpoint.Checkpoint is given, each parsed chunk is saved to it, & the chunks
+		saved by an interrupted run are loaded instead of being parsed again.
+	"""
+	if checkpoint is None:
+		ranges = byte_ranges(path, workers * 4)
+	else:
+		# the byte ranges of an interrupted run are reused, so that its chunks match
+		ranges = checkpoint.value("ranges")
+		if ranges is None:
+			ranges = byte_ranges(path, workers * 4)
+			checkpoint.mark("ranges", ranges)
+	tasks = [(path, start, end) for start, end in ranges]
+	chunks = [None] * len(tasks)
+	todo = []
+	for chunk_num in range(len(tasks)):
+		if checkpoint is not None and checkpoint.done("chunk_%05d" % chunk_num):
+			chunks[chunk_num] = checkpoint.load("chunk_%05d" % chunk_num)
+		else:
+			todo.append(chunk_num)
+
+	def collect(results):
+		"""Store (and save) the parsed chunks as they are returned, in file order."""
+		for chunk_num, chunk in zip(todo, results):
+			chunks[chunk_num] = chunk
+			if checkpoint is not None:
+				checkpoint.save("chunk_%05d" % chunk_num, chunk)
+
+	if workers == 1 or len(todo) <= 1 or _fork_context() is None:
+		# without the fork start method, the ranges are parsed in this process one at a time
+		collect(_parse_range(tasks[chunk_num]) for chunk_num in todo)
+	else:
+		with _fork_context().Pool(workers) as pool:
+			# the chunks are returned in file order
+			collect(pool.imap(_parse_range, [tasks[chunk_num] for chunk_num in todo]))
+	return _merge_chunks(chunks)
+
+
+def _read_pyarrow(path, workers):
+	"""Read a (possibly compressed) table with the multithreaded CSV reader of pyarrow."""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	import pyarrow as pa # columnar data & multithreaded CSV reading
+	from pyarrow import csv as pa_csv
+	pa.set_cpu_count(workers)
+	# compressed files are recognized by their content, as in the compression module
+	compress = compression_type(path)
+	source = path if compress is None else pa.input_stream(path, compression={"gz": "gzip", "bz2": "bz2", "zst": "zstd"}[compress])
+	table = pa_csv.read_csv(
+		source,
+		# skip the header line, as pd.read_csv(header=0) does
+		read_options=pa_csv.ReadOptions(column_names=["centroid", "member"], skip_rows=1, use_threads=True),
+		parse_options=pa_csv.ParseOptions(delimiter="\t", quote_char=False),
+		convert_options=pa_csv.ConvertOptions(column_types={"centroid": pa.string(), "member": pa.string()},
+											  strings_can_be_null=False, quoted_strings_can_be_null=False),
+	)
+	# dictionary-encode the centroids, then renumber the codes in sorted order
+	encoded = table.column("centroid").combine_chunks().dictionary_encode()
+	dictionary = np.asarray(encoded.dictionary.to_pylist(), dtype=object)
+	order_codes, centroid_ids = pd.factorize(dictionary, sort=True)
+	centroid_codes = order_codes[encoded.indices.to_numpy()]
+	members = np.asarray(table.column("member").to_pylist(), dtype=object)
+	return centroid_codes.astype(np.int64), np.asarray(centroid_ids, dtype=object), members
+
+
+def _read_pandas(path):
+	"""Read a (possibly compressed) table with a single pd.read_csv call, as before."""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	with open_text(path) as infile:
+		input_df = pd.read_csv(infile, header=0, sep="\t", dtype=str)
+	centroid_codes, centroid_ids = pd.factorize(input_df.iloc[:, 0], sort=True)
+	return centroid_codes.astype(np.int64), np.asarray(centroid_ids, dtype=object), input_df.iloc[:, 1].to_numpy()
+
+
+def has_pyarrow():
+	"""Return True if pyarrow can be imported."""
+	try:
+		import pyarrow.csv # noqa: F401
+	except ImportError:
+		return False
+	return True
+
+
+def read_pairs(path, engine="auto", workers=None, checkpoint=None):
+	"""Read a centroid<TAB>member table into (centroid_codes, centroid_ids, members) arrays.
+
+	`engine` is one of:
+		- "pyarrow": the multithreaded pyarrow CSV reader
+		- "processes": byte ranges parsed in parallel worker processes (uncompressed files only)
+		- "pandas": a single-threaded pd.read_csv call
+		- "auto": Pandas for small files; otherwise pyarrow if installed, or worker
+			processes for uncompressed files if more than one core is available
+	`workers` is the number of threads or processes to use (by default, the number of
+		cores available; see compression.thread_count()).
+	If a checkpoint.Checkpoint is given & the "processes" engine is used (which the "auto"
+		engine picks for large uncompressed files without pyarrow, on more than one
+		core), each parsed range is saved, so that an interrupted read resumes with the
+		ranges that were not yet parsed. The other engines read the whole file again.
+	"""
+	if engine not in ENGINES:
+		raise ValueError("Unknown engine '" + str(engine) + "'; expected one of: " + ", ".join(ENGINES))
+	workers = workers or thread_count()
+	compressed = compression_type(path) is not None
+	if engine == "auto":
+		# a checkpoint doesn't change the choice of engine, so that resumable reads are not slower
+		if os.path.getsize(path) < MIN_PARALLEL_BYTES:
+			engine = "pandas"
+		elif has_pyarrow():
+			engine = "pyarrow"
+		elif workers > 1 and not compressed and _fork_context() is not None:
+			engine = "processes"
+		else:
+			engine = "pandas"
+	if engine == "pyarrow":
+		return _read_pyarrow(path, workers)
+	if engine == "processes":
+		if compressed:
+			raise ValueError("Compressed files can't be split into byte ranges; use the pyarrow or pandas engine")
+		return _read_processes(path, workers, checkpoint)
+	return _read_pandas(path)
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: compression.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module provides transparent reading & writing of compressed text files for the
+		OrthoBenchmark scripts, so that large clustering results files (ie. the MMseqs2
+		results, which are tar-gzipped on Vera before being moved to Phoebe) can be
+		parsed without first being extracted, and so that the large parsed outputs can
+		be written out compressed.
+	Compressed input files are recognized by their content (magic bytes), rather than
+		by their file extension; output files are compressed according to their file
+		extension. The supported formats are:
+		- gzip (.gz)
+		- bzip2 (.bz2)
+		- Zstandard (.zst)
+	Where available, multithreaded external programs are used, so that compression does
+		not become the bottleneck of the scripts: pigz for gzip, lbzip2 or pbzip2 for
+		bzip2, and the zstandard Python module or the zstd program for Zstandard. If
+		these aren't available, the gzip & bz2 modules of the standard library are used.
+	When an external program fails, an OSError is raised as the file is closed. The
+		only exception is a file that is closed before its end was read: the
+		decompression program is then stopped, & its exit code ignored.
+
+List of functions:
+	compression_type(path): Determine the compression format of an existing file.
+	strip_extension(path): Remove a compression file extension from a file name.
+	add_extension(path, compress): Add the file extension of a compression format.
+	open_text(path, mode="r", newline=None): Open a (possibly compressed) text file.
+	thread_count(): Return the number of threads to use for compression.
+	pop_compress_flag(argv): Remove a `--compress=FORMAT` flag from a `sys.argv`-style list.
+
+List of standard and non-standard modules used:
+	os
+	io
+	shutil
+	subprocess
+	gzip
+	bz2
+	zstandard (optional; imported lazily)
+
+Usage:
+	with open_text("Pa_DB_90_clu.tsv.gz") as infile: ...
+	with open_text("MMseqs2_Pa_90_parsed_pivot.txt.zst", "w", newline="") as outfile: ...
+	The number of compression threads defaults to the number of CPU cores available to
+		the process, and can be set with the ORTHOBENCH_THREADS environment variable.
+
+"""
+
+
+import os # allows access to the operating system
+import io # text wrappers for binary streams
+# shutil, subprocess & the compression modules are imported only when a compressed
+# file is actually opened, to keep the startup of the scripts fast
+
+
+# file extensions of the supported compression formats
+COMPRESS_FORMATS = ("gz", "bz2", "zst")
+# magic bytes at the start of compressed files
+# ref: https://en.wikipedia.org/wiki/List_of_file_signatures
+_MAGIC = (
+	(b"\x1f\x8b", "gz"),
+	(b"BZh", "bz2"),
+	(b"\x28\xb5\x2f\xfd", "zst"),
+)
+# environment variable used to set the number of compression threads
+ENV_THREADS = "ORTHOBENCH_THREADS"
+
+
+def thread_count():
+	"""Return the number of threads to use for (de)compression."""
+	if os.environ.get(ENV_THREADS):
+		return max(1, int(os.environ[ENV_THREADS]))
+	if hasattr(os, "sched_getaffinity"):
+		# only count the cores actually allocated to the job (ie. by SLURM)
+		return len(os.sched_getaffinity(0))
+	return os.cpu_count() or 1
+
+
+def compression_type(path):
+	"""Return "gz", "bz2" or "zst" if the file is compressed in that format, else None."""
+	with open(path, "rb") as infile:
+		start = infile.read(4)
+	for magic, compress in _MAGIC:
+		if start.startswith(magic):
+			return compress
+	return None
+
+
+def _extension_type(path):
+	"""Return the compression format indicated by a file name's extension, or None."""
+	extension = os.path.splitext(path)[1].lstrip(".")
+	return extension if extension in COMPRESS_FORMATS else None
+
+
+def strip_extension(path):
+	"""Remove a .gz, .bz2 or .zst extension from a file name, ie. "x.tsv.gz" becomes "x.tsv"."""
+	if _extension_type(path):
+		return os.path.splitext(path)[0]
+	return path
+
+
+def add_extension(path, compress):
+	"""Add the file extension of a compression format (if any) to a file name."""
+	if not compress:
+		return path
+	if compress not in COMPRESS_FORMATS:
+		raise ValueError("Unknown compression format '" + str(compress) + "'; expected one of: " + ", ".join(COMPRESS_FORMATS))
+	return path + "." + compress
+
+
+class _PipeReader(io.RawIOBase):
+	"""Unbuffered reader of the output pipe of a decompression program, which records whether the end was reached."""
+
+	def __init__(self, pipe):
+		super().__init__()
+		self._pipe = pipe
+		self.eof = False
+
+	def readable(self):
+		return True
+
+	def readinto(self, buffer):
+		count = self._pipe.readinto(buffer)
+		if count == 0:
+			self.eof = True
+		return count
+
+	def close(self):
+		self._pipe.close()
+		super().close()
+
+
+class _ProcessTextFile(io.TextIOWrapper):
+	"""Text file connected to an external (de)compression program through a pipe."""
+
+	def __init__(self, process, stream, out_file=None, newline=None, reader=None):
+		super().__init__(stream, encoding="utf-8", newline=newline)
+		self._process = process
+		self._out_file = out_file
+		self._reader = reader
+
+	def close(self):
+		if self.closed:
+			return
+		# the exit code of a decompression program is only ignored if the caller stopped
+		# reading before the end of the file, & the program was stopped because of that
+		stopped = False
+		if self._reader is not None and not self._reader.eof and self._process.poll() is None:
+			# the file was closed before the end was reached, so the program may be
+			# blocked on writing to the full pipe
+			self._process.kill()
+			stopped = True
+		super().close()
+		returncode = self._process.wait()
+		if self._out_file is not None:
+			self._out_file.close()
+		if returncode != 0 and not stopped:
+			raise OSError(" ".join(self._process.args) + " failed with exit code " + str(returncode))
+
+
+def _external_program(compress):
+	"""Return the multithreaded (de)compression program to use for a format, if installed."""
+	import shutil # locates external compression programs
+	candidates = {"gz": ["pigz"], "bz2": ["lbzip2", "pbzip2"], "zst": ["zstd"]}[compress]
+	for program in candidates:
+		if shutil.which(program):
+			return program
+	return None
+
+
+def _thread_args(program):
+	"""Return the command-line options that set the number of threads of a program."""
+	threads = str(thread_count())
+	if program == "pigz":
+		return ["-p", threads]
+	if program == "pbzip2":
+		return ["-p" + threads]
+	if program == "lbzip2":
+		return ["-n", threads]
+	return ["-T" + threads]
+
+
+def _open_external(program, path, mode, newline):
+	"""Open a compressed file by piping it through an external program."""
+	import subprocess # runs external compression programs
+	if mode == "r":
+		# decompress to standard output
+		process = subprocess.Popen([program, "-d", "-c"] + _thread_args(program) + [path], stdout=subprocess.PIPE, bufsize=0)
+		reader = _PipeReader(process.stdout)
+		return _ProcessTextFile(process, io.BufferedReader(reader), newline=newline, reader=reader)
+	# compress standard input into the output file
+	out_file = open(path, "ab" if mode == "a" else "wb")
+	process = subprocess.Popen([program, "-c"] + _thread_args(program), stdin=subprocess.PIPE, stdout=out_file)
+	return _ProcessTextFile(process, process.stdin, out_file=out_file, newline=newline)
+
+
+def open_text(path, mode="r", newline=None):
+	"""Open a plain, gzip, bzip2 or Zstandard-compressed text file for reading or writing.
+
+	When reading ("r"), the compression format is determined from the file content. When
+		writing ("w") or appending ("a"), it is determined from the file extension.
+	"""
+	if mode not in ("r", "w", "a"):
+		raise ValueError("Unsupported file mode '" + str(mode) + "'")
+	compress = compression_type(path) if mode == "r" else _extension_type(path)
+	if compress is None:
+		return open(path, mode, newline=newline)
+	if compress == "zst":
+		try:
+			import zstandard # Zstandard bindings, with multithreaded compression
+		except ImportError:
+			zstandard = None
+		if zstandard is not None:
+			cctx = zstandard.ZstdCompressor(threads=thread_count()) if mode != "r" else None
+			return zstandard.open(path, mode, cctx=cctx, encoding="utf-8", newline=newline)
+	program = _external_program(compress)
+	if program is not None:
+		return _open_external(program, path, mode, newline)
+	if compress == "gz":
+		import gzip # single-threaded gzip support from the standard library
+		return gzip.open(path, mode + "t", encoding="utf-8", newline=newline)
+	if compress == "bz2":
+		import bz2 # single-threaded bzip2 support from the standard library
+		return bz2.open(path, mode + "t", encoding="utf-8", newline=newline)
+	raise RuntimeError("Reading & writing .zst files requires the zstandard Python module or the zstd program")
+
+
+def pop_compress_flag(argv):
+	"""Remove `--compress=FORMAT` from an argument list & return the format (or None).
+
+	This is used by the scripts that read their arguments directly from `sys.argv`.
+	"""
+	compress = None
+	for arg in list(argv[1:]):
+		# loop over a copy of the arguments, since the list is edited in place
+		if arg.startswith("--compress="):
+			compress = arg.split("=", 1)[1]
+			add_extension("", compress)
+			argv.remove(arg)
+	return compress
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: database.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module builds the query-based orthology database used throughout the
+		OrthoBenchmark workflow: a single table with one row per query protein, and one
+		column per clustering program & percent identity threshold, containing the
+		ID of the cluster the protein was assigned to ("-" if it was not assigned).
+	Inputs are either pivot tables (as produced by the parsers module, or read from the
+		*_parsed_pivot.txt files) or an orthology database previously built with this
+		module (Orthology_Comparison_DB__*.txt). Inputs & outputs may be gzip, bzip2 or
+		Zstandard-compressed.
+
+List of functions:
+	read_pivot(path): Read a *_parsed_pivot.txt file or orthology database from disk.
+	column_name(path): Return the database column name used for an input file.
+	flip_pivot(pivot_df, name): Convert a pivot table into a Query-first database column.
+	merge_pivot(ortho_df, pivot_df, name): Merge one pivot table into an orthology database.
+	build_ortho_db(pivots): Merge pivot tables & databases into one orthology database.
+	default_db_name(compress=None): Return the timestamped default output file name.
+	write_ortho_db(ortho_df, path): Write out the orthology database.
+
+List of standard and non-standard modules used:
+	os
+	datetime.datetime
+	pandas (imported lazily)
+	orthobench.compression
+	orthobench.checkpoint
+
+"""
+
+
+import os # allow access to computer files
+from datetime import datetime # access data from system regarding date & time
+from .compression import open_text, strip_extension, add_extension # transparent (de)compression
+from .checkpoint import atomic_path # atomic output files
+
+
+# name of the protein ID column of the orthology database
+QUERY_COL = "Query"
+# placeholder for proteins that were not assigned to a cluster by a program
+MISSING = "-"
+
+
+def read_pivot(path):
+	"""Read a *_parsed_pivot.txt file or a previously built orthology database."""
+	import pandas as pd # allows manipulation of dataframes
+	with open_text(path) as infile:
+		return pd.read_csv(infile, sep="\t", header=0, low_memory=False)
+
+
+def column_name(path):
+	"""Return the database column name for an input file: its basename without extension(s).
+
+	Compression extensions are removed as well, ie. "X_parsed_pivot.txt.gz" gives "X_parsed_pivot".
+	"""
+	return os.path.splitext(os.path.basename(strip_extension(path)))[0]
+
+
+def flip_pivot(pivot_df, name):
+	"""Put the protein column of a pivot table first and name the columns Query & `name`.
+
+	Inputs that are already in the format of the orthology database (ie. the first
+		column is named "Query") are returned unchanged.
+	"""
+	if pivot_df.columns[0] == QUERY_COL:
+		return pivot_df
+	# switch the column order
+	# ref: https://stackoverflow.com/questions/13148429/how-to-change-the-order-of-dataframe-columns
+	cols = pivot_df.columns.tolist()
+	flipped_df = pivot_df[cols[-1:] + cols[:-1]]
+	# rename the columns
+	# ref: https://stackoverflow.com/questions/11346283/renaming-column-names-in-pandas
+	flipped_df.columns = [QUERY_COL, name]
+	return flipped_df
+
+
+def merge_pivot(ortho_df, pivot_df, name):
+	"""Merge one pivot table (or orthology database) into an orthology database.
+
+	`ortho_df` is the database built so far (None for the first input) & `name` the
+		database column name of the input. Proteins missing from either are filled in
+		with "-".
+	"""
+	input_df = flip_pivot(pivot_df, name)
+	if ortho_df is None:
+		# copy the first dataframe into what will be the large dataframe
+		return input_df.copy()
+	# join the contents of the input dataframe into the larger dataframe
+	# ref: https://stackoverflow.com/questions/53645882/pandas-merging-101
+	# ref: https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.fillna.html
+	return ortho_df.merge(input_df, on=QUERY_COL, how="outer").fillna(MISSING)
+
+
+def build_ortho_db(pivots):
+	"""Merge pivot tables (and/or orthology databases) into a single orthology database.
+
+	`pivots` is a dictionary of database column names & dataframes, in the order the
+		columns should appear; the names of inputs that are already orthology databases
+		are ignored. Proteins missing from an input are filled in with "-".
+	"""
+	ortho_df = None
+	for name, pivot_df in pivots.items():
+		# loop over the input dataframes in order
+		ortho_df = merge_pivot(ortho_df, pivot_df, name)
+	if ortho_df is None:
+		raise ValueError("At least one pivot table is needed to build the orthology database")
+	return ortho_df
+
+
+def default_db_name(compress=None):
+	"""Return the default output file name, based on the current date & time.
+
+	`compress` is an optional compression format ("gz", "bz2" or "zst") to add as a file extension.
+	"""
+	time_now = datetime.now().strftime("%d-%m-%Y--%H%M%S")
+	return add_extension("Orthology_Comparison_DB__" + time_now + ".txt", compress)
+
+
+def write_ortho_db(ortho_df, path):
+	"""Write out the orthology database to a tab-separated text file (compressed according to its extension).
+
+	The file is written under a temporary name & renamed once it is complete, so that an
+		interrupted run never leaves a partial database behind.
+	"""
+	with atomic_path(path) as tmp_path:
+		with open_text(tmp_path, "w", newline="") as outfile:
+			ortho_df.to_csv(outfile, index=False, header=True, sep="\t")
+	return path
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: faidx.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module builds a samtools faidx-compatible offset index (*.fai) of a FASTA file
+		in a single pass, and uses it to extract the sequences of selected proteins
+		(ie. the members of a set of orthologous clusters) from a memory-mapped copy of
+		the FASTA file. Only the bytes of the requested sequences are read, so that
+		clusters can be inspected without scanning the whole multi-GB concatenated
+		FASTA file, or having the clustering program write one file per cluster.
+	Each line of the index contains, tab-separated: the sequence name (the FASTA header
+		up to the first whitespace), the sequence length, the byte offset of the first
+		residue, the number of residues per line and the number of bytes per line.
+		ref: https://www.htslib.org/doc/samtools-faidx.html
+
+List of functions:
+	index_path(fasta_path): Return the default index file name of a FASTA file.
+	build_index(fasta_path, out_index=None): Index a FASTA file & write out the *.fai file.
+	load_index(fasta_path, in_index=None): Load a *.fai index, building it first if needed.
+	read_cluster_members(pivot_path, cluster_ids): Collect the members of clusters from a
+		*_parsed_pivot.txt file.
+	extract_clusters(fasta_path, pivot_path, cluster_ids, out_path, split=False): Write
+		out the member sequences of a set of clusters.
+
+List of classes:
+	IndexedFasta: Random access to the sequences of a memory-mapped, indexed FASTA file.
+
+List of standard and non-standard modules used:
+	os
+	csv
+	mmap
+	orthobench.compression
+	orthobench.checkpoint
+
+Known bugs and limitations:
+	- The FASTA file must not be compressed, since it is memory-mapped.
+	- As with samtools faidx, all sequence lines of a record (except the last) must have
+		the same length.
+
+"""
+
+
+import os # allow access to computer files
+import csv # reading of the tab-separated pivot tables
+import mmap # memory-mapped random access to the FASTA file
+from .compression import open_text, compression_type # transparent (de)compression
+from .checkpoint import atomic_path # atomic output files
+
+
+def index_path(fasta_path):
+	"""Return the default index file name of a FASTA file: the FASTA file name + ".fai"."""
+	return fasta_path + ".fai"
+
+
+def build_index(fasta_path, out_index=None):
+	"""Index a FASTA file in a single pass & write out the faidx-style *.fai index file.
+
+	Returns the index as a dictionary of sequence names & (length, offset, line bases,
+		line width) tuples. A ValueError is raised for duplicate sequence names or
+		inconsistent line lengths within a record. The *.fai file is written to a
+		temporary file that is renamed once it is complete, since load_index() uses any
+		existing *.fai file as it is.
+	"""
+	if compression_type(fasta_path) is not None:
+		raise ValueError("Compressed FASTA files can't be indexed; decompress " + fasta_path + " first")
+	out_index = out_index or index_path(fasta_path)
+	index = {}
+	# fields of the record currently being read
+	name = None
+	length = offset = line_bases = line_width = 0
+	# set when a record has had a line shorter than the first line (must be its last line)
+	short_line = False
+
+	def _finish_record():
+		if name is None:
+			return
+		if name in index:
+			raise ValueError("Duplicate sequence name in " + fasta_path + ": " + name)
+		index[name] = (length, offset, line_bases, line_width)
+
+	position = 0
+	with open(fasta_path, "rb") as infile:
+		for line in infile:
+			# iterate over the FASTA file in binary mode, to keep track of byte offsets
+			if line.startswith(b">"):
+				_finish_record()
+				# the sequence name is the header up to the first whitespace
+				fields = line[1:].split(None, 1)
+				name = fields[0].decode() if fields else ""
+				length = line_bases = line_width = 0
+				offset = position + len(line)
+				short_line = False
+			elif name is not None:
+				bases = len(line.rstrip(b"\r\n"))
+				if bases == 0:
+					# blank lines are only allowed at the end of a record
+					short_line = short_line or line_bases > 0
+					position += len(line)
+					continue
+				if line_bases == 0:
+					# the first sequence line determines the line length of the record
+					line_bases, line_width = bases, len(line)
+				elif short_line or bases > line_bases:
+					# only the last line of a record may be shorter than the first
+					raise ValueError("Different line lengths in sequence " + name + " of " + fasta_path)
+				if bases < line_bases:
+					short_line = True
+				length += bases
+			position += len(line)
+	_finish_record()
+	with atomic_path(out_index) as tmp_index:
+		with open(tmp_index, "w") as outfile:
+			for seq_name, (seq_length, seq_offset, seq_bases, seq_width) in index.items():
+				outfile.write("\t".join(map(str, (seq_name, seq_length, seq_offset, seq_bases, seq_width))) + "\n")
+	return index
+
+
+def load_index(fasta_path, in_index=None):
+	"""Load the *.fai index of a FASTA file, building it first if it doesn't exist yet."""
+	in_index = in_index or index_path(fasta_path)
+	if not os.path.isfile(in_index):
+		return build_index(fasta_path, in_index)
+	index = {}
+	with open(in_index, "r") as infile:
+		for line in infile:
+			fields = line.rstrip("\n").split("\t")
+			index[fields[0]] = tuple(int(value) for value in fields[1:5])
+	return index
+
+
+class IndexedFasta:
+	"""Random access to the sequences of an indexed FASTA file, through a memory map.
+
+	Usage:
+		with IndexedFasta("Concat_Pseudomonas_aeruginosa_CopyN_edit.fasta") as fasta:
+			sequence = fasta.fetch("DwRpjELei6lWNbKs")
+	"""
+
+	def __init__(self, fasta_path, in_index=None):
+		self.fasta_path = fasta_path
+		self.index = load_index(fasta_path, in_index)
+		self._file = open(fasta_path, "rb")
+		self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		if hasattr(self._map, "madvise") and hasattr(mmap, "MADV_RANDOM"):
+			# tell the kernel not to read ahead, since the access pattern is random
+			self._map.madvise(mmap.MADV_RANDOM)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def close(self):
+		"""Close the memory map & the FASTA file."""
+		self._map.close()
+		self._file.close()
+
+	def __contains__(self, name):
+		return name in self.index
+
+	def _raw(self, name):
+		"""Return the bytes of a sequence as stored in the file, including line breaks."""
+		length, offset, line_bases, line_width = self.index[name]
+		if length == 0:
+			return b""
+		full_lines, remainder = divmod(length, line_bases)
+		end = offset + full_lines * line_width + remainder
+		return self._map[offset:end]
+
+	def fetch(self, name):
+		"""Return the sequence of a protein as a single-line string."""
+		return self._raw(name).replace(b"\n", b"").replace(b"\r", b"").decode()
+
+	def write_records(self, names, outfile, label=None):
+		"""Write the FASTA records of `names` to a binary file object, keeping their line wrapping.
+
+		`label` is optional text to add after the name in each header. Returns the number
+			of records written; names missing from the index raise a KeyError.
+		"""
+		written = 0
+		for name in names:
+			raw = self._raw(name)
+			header = ">" + name
+			if label:
+				header += " " + label
+			outfile.write(header.encode() + b"\n" + raw)
+			if raw and not raw.endswith(b"\n"):
+				outfile.write(b"\n")
+			written += 1
+		return written
+
+
+def read_cluster_members(pivot_path, cluster_ids):
+	"""Collect the members of the given clusters from a *_parsed_pivot.txt file.
+
+	The pivot table is streamed, so only the members of the requested clusters are kept
+		in memory. Returns a dictionary of cluster IDs & lists of members, in the order
+		the clusters were requested; clusters that were not found have empty lists.
+	"""
+	wanted = {cluster_id: [] for cluster_id in cluster_ids}
+	with open_text(pivot_path) as infile:
+		reader = csv.reader(infile, delimiter="\t")
+		# skip the header line
+		next(reader, None)
+		for row in reader:
+			if row and row[0] in wanted:
+				wanted[row[0]].append(row[1])
+	return wanted
+
+
+def extract_clusters(fasta_path, pivot_path, cluster_ids, out_path, split=False, in_index=None):
+	"""Write out the member sequences of a set of clusters from an indexed FASTA file.
+
+	By default all of the sequences are written to the single FASTA file `out_path`, with
+		the cluster ID added to each header (ie. ">DwRpjELei6lWNbKs MMS_Cluster_12").
+		With `split=True`, `out_path` is a directory, and one <cluster ID>.fasta file is
+		written per cluster. Returns a dictionary of cluster IDs & numbers of sequences
+		written.
+	"""
+	members = read_cluster_members(pivot_path, cluster_ids)
+	written = {}
+	with IndexedFasta(fasta_path, in_index) as fasta:
+		missing = [name for group in members.values() for name in group if name not in fasta]
+		if missing:
+			raise KeyError(str(len(missing)) + " cluster members are missing from " + fasta_path + ", ie. " + missing[0])
+
+		def _by_offset(names):
+			# read the sequences in file order, so that the accesses are sequential
+			return sorted(names, key=lambda name: fasta.index[name][1])
+
+		if split:
+			os.makedirs(out_path, exist_ok=True)
+			for cluster_id, names in members.items():
+				with open(os.path.join(out_path, cluster_id + ".fasta"), "wb") as outfile:
+					written[cluster_id] = fasta.write_records(_by_offset(names), outfile)
+		else:
+			with open(out_path, "wb") as outfile:
+				for cluster_id, names in members.items():
+					written[cluster_id] = fasta.write_records(_by_offset(names), outfile, cluster_id)
+	return written
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: fasta.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module contains the FASTA header processing steps of the OrthoBenchmark data
+		preparation: labelling duplicate FASTA headers with their copy number, and
+		replacing FASTA headers with random 16-character alphanumeric codes that are
+		recorded in an encoding reference file.
+	Input FASTA files may be gzip, bzip2 or Zstandard-compressed, and the output FASTA
+		files are compressed according to their file extension. The encoding reference
+		file is always kept as plain text, since it is appended to.
+
+List of functions:
+	label_duplicates(input_fasta, output_fasta): Label repeated headers with " - Copy n".
+	load_encodings(ref_db_file): Return the set of alphanumeric codes already in use.
+	encode_headers(input_fasta, output_fasta, ref_db_file, source_name): Replace the
+		FASTA headers with unique alphanumeric codes.
+
+List of standard and non-standard modules used:
+	os
+	random
+	orthobench.compression
+
+"""
+
+
+import os # allow access to computer files
+import random # enables random number & variable generation
+from .compression import open_text # transparent (de)compression
+
+
+# characters & length of the alphanumeric codes used to encode FASTA headers
+# this is string.ascii_letters + string.digits, written out since importing the string
+# module also loads the regex engine, which noticeably slows down script startup
+CODE_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+CODE_LENGTH = 16
+
+
+def label_duplicates(input_fasta, output_fasta):
+	"""Make duplicate FASTA headers unique by adding " - Copy n" to the 2nd, 3rd... copies.
+
+	Returns the number of sequences written out.
+	"""
+	# count the number of times each header has been seen so far
+	header_counts = {}
+	with open_text(input_fasta) as infile, open_text(output_fasta, "w") as outfile:
+		for line in infile:
+			# iterate through the input file line by line
+			if line.startswith(">"):
+				# identify the header lines and remove the ">" & the end-line character
+				header = line.strip().replace(">", "")
+				copy_number = header_counts.get(header, 0) + 1
+				header_counts[header] = copy_number
+				if copy_number == 1:
+					# the first copy of the header is written out as is
+					outfile.write(">" + header + "\n")
+				else:
+					# otherwise, write out the header including the copy number
+					outfile.write(">" + header + " - Copy " + str(copy_number) + "\n")
+			else:
+				# sequence lines are copied to the outfile without changes
+				outfile.write(line)
+	return sum(header_counts.values())
+
+
+def load_encodings(ref_db_file):
+	"""Return the set of alphanumeric codes in an encoding reference file (empty if it doesn't exist)."""
+	if not os.path.isfile(ref_db_file):
+		return set()
+	with open(ref_db_file, "r") as ref_db:
+		# the codes are in the first column of the tab-separated reference file
+		return {line.split("\t", 1)[0] for line in ref_db if line.strip()}
+
+
+def encode_headers(input_fasta, output_fasta, ref_db_file, source_name):
+	"""Replace the FASTA headers with random, unique 16-character alphanumeric codes.
+
+	Each code is recorded in the reference file (created if it does not exist yet, and
+		appended to otherwise) as: code, original header & `source_name`. Codes already
+		present in the reference file are never reused. Returns the number of sequences
+		encoded.
+	"""
+	encodings = load_encodings(ref_db_file)
+	encoded_num = 0
+	with open_text(input_fasta) as infile, open_text(output_fasta, "w") as outfile, open(ref_db_file, "a") as ref_db:
+		for line in infile:
+			# iterate through the input file line by line
+			if line.startswith(">"):
+				# identify the header lines and remove the ">" & the end-line character
+				header = line.strip().replace(">", "")
+				while True:
+					# generate a random 16-character alphanumeric string to replace the original header
+					# and check that the same alphanumeric code hasn't already been used somewhere
+					assigned_header = ''.join(random.choices(CODE_CHARS, k=CODE_LENGTH))
+					if assigned_header not in encodings:
+						break
+				encodings.add(assigned_header)
+				# now print the new header to the outfile
+				outfile.write(">" + assigned_header + "\n")
+				# add the header to the large reference file, along with the file basename
+				ref_db.write(assigned_header + "\t" + header + "\t" + source_name + "\n")
+				encoded_num += 1
+			else:
+				# sequence lines are copied to the outfile without changes
+				outfile.write(line)
+	return encoded_num
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: jsonl.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module writes & reads the clusters of a parsed clustering results file as
+		sharded JSON Lines files, as an alternative to the single *_parsed.json
+		dictionary, which has to be loaded completely to read even one cluster.
+	Each line of a shard contains one cluster, ie.:
+		{"id": "MMS_Cluster_0", "members": ["DwRpjELei6lWNbKs", "mZ1lBq1b2uHcTWkS"]}
+	The clusters are written in order, with a fixed number of clusters per shard:
+		<out_base>_parsed.000.jsonl, <out_base>_parsed.001.jsonl, ...
+	Alongside the shards, a tab-separated index file (<out_base>_parsed.jsonl.idx) is
+		written, with one line per cluster: the cluster ID, the number of members, the
+		shard file name, and the byte offset & length of the cluster's line in the
+		shard. The index is enough to get the cluster sizes, & to read single clusters
+		by seeking directly to their line.
+	The shards are never compressed, since byte offsets into a compressed file can't
+		be used for random access.
+	When the clusters are written again with fewer shards (ie. with more clusters per
+		shard), the higher-numbered shards of the previous run are removed once the new
+		index is in place, so that globbing *_parsed.*.jsonl never picks up stale data.
+	The shards (& the index) are written under temporary names, & only renamed once all
+		of them are complete, so that an interrupted run never leaves a truncated shard
+		behind.
+
+List of functions:
+	jsonl_names(out_base): Return the index file name & shard file name pattern for a basename.
+	write_jsonl(clusters, out_base, shard_size=SHARD_SIZE, index_path=None): Write clusters to sharded
+		JSON Lines files.
+	remove_extra_shards(out_base): Remove the shards of a basename that its index doesn't list.
+	read_index(index_path): Read the index of a set of shards.
+	iter_jsonl(index_path): Stream the clusters of a set of shards, in order.
+	cluster_sizes(index_path): Return the cluster sizes recorded in the index.
+
+List of classes:
+	ClusterIndex: Random access to single clusters of a set of shards.
+
+List of standard and non-standard modules used:
+	os
+	re
+	glob
+	json
+	contextlib.ExitStack
+	orthobench.checkpoint
+
+Usage:
+	write_jsonl(ortho_dict.items(), "MMseqs2_Pa_90")
+	for cluster_id, members in iter_jsonl("MMseqs2_Pa_90_parsed.jsonl.idx"): ...
+	with ClusterIndex("MMseqs2_Pa_90_parsed.jsonl.idx") as clusters:
+		members = clusters["MMS_Cluster_12"]
+
+"""
+
+
+import os # allow access to computer files
+import re # matching of the shard numbers
+import glob # finding of the shards of a basename
+import json # allows import and export of data in JSON format
+from contextlib import ExitStack, nullcontext # renaming of the completed shards
+from .checkpoint import atomic_path # atomic output files
+
+
+# default number of clusters written to each shard
+SHARD_SIZE = 1000000
+# file name suffixes of the index & the shards
+INDEX_SUFFIX = "_parsed.jsonl.idx"
+INDEX_COLUMNS = ["Cluster_ID", "Size", "Shard", "Offset", "Length"]
+
+
+def jsonl_names(out_base):
+	"""Return the index file name & the shard file name pattern (with a {:03d} field) for a basename."""
+	return out_base + INDEX_SUFFIX, out_base + "_parsed.{:03d}.jsonl"
+
+
+def write_jsonl(clusters, out_base, shard_size=SHARD_SIZE, index_path=None):
+	"""Write clusters to sharded JSON Lines files, with a byte-offset index.
+
+	`clusters` is an iterable of (cluster ID, list of members) pairs, ie. the items() of a
+		cluster dictionary. The index is written to `index_path` if given (ie. a
+		temporary file that is renamed once all of the shards are complete), in which
+		case remove_extra_shards() should be called once it has been renamed; otherwise
+		the shards left over from a previous run with more shards are removed here.
+		Each shard is written to a temporary file (see checkpoint.atomic_path()), & the
+		shards are renamed together once all of them are complete, before the index.
+		Returns the name of the index file.
+	"""
+	if shard_size < 1:
+		raise ValueError("The number of clusters per shard must be at least 1")
+	default_index_path, shard_pattern = jsonl_names(out_base)
+	write_directly = index_path is None
+	index_path = index_path or default_index_path
+	# the index is also written atomically, unless a temporary file was given
+	with atomic_path(index_path) if write_directly else nullcontext(index_path) as index_tmp_path:
+		shard_file = None
+		# the shards are only renamed once all of them are complete, so that a failed run
+		# doesn't replace some of the shards listed in the previous index
+		with open(index_tmp_path, "w") as index_file, ExitStack() as shard_renames:
+			index_file.write("\t".join(INDEX_COLUMNS) + "\n")
+			try:
+				for cluster_num, (cluster_id, members) in enumerate(clusters):
+					if cluster_num % shard_size == 0:
+						# start the next shard
+						if shard_file is not None:
+							shard_file.close()
+						shard_path = shard_pattern.format(cluster_num // shard_size)
+						shard_file = open(shard_renames.enter_context(atomic_path(shard_path)), "wb")
+						shard_name = os.path.basename(shard_path)
+					line = (json.dumps({"id": cluster_id, "members": members}) + "\n").encode("utf-8")
+					offset = shard_file.tell()
+					shard_file.write(line)
+					index_file.write("\t".join((str(cluster_id), str(len(members)), shard_name, str(offset), str(len(line)))) + "\n")
+			finally:
+				if shard_file is not None:
+					shard_file.close()
+	if write_directly:
+		remove_extra_shards(out_base)
+	return index_path
+
+
+def remove_extra_shards(out_base):
+	"""Remove the <out_base>_parsed.NNN.jsonl shards that are not listed in the index of `out_base`.
+
+	These are the higher-numbered shards left over from a previous run that wrote more
+		shards. Returns the list of the removed files.
+	"""
+	index_path, shard_pattern = jsonl_names(out_base)
+	listed = set(os.path.basename(shard_path) for shard_path in _shard_paths(index_path))
+	prefix, suffix = shard_pattern.split("{:03d}")
+	removed = []
+	for shard_path in glob.glob(glob.escape(prefix) + "*" + glob.escape(suffix)):
+		number = shard_path[len(prefix):len(shard_path) - len(suffix)]
+		if re.fullmatch(r"[0-9]{3,}", number) and os.path.basename(shard_path) not in listed:
+			os.remove(shard_path)
+			removed.append(shard_path)
+	return removed
+
+
+def read_index(index_path):
+	"""Read the index of a set of shards into a dictionary of cluster IDs & (size, shard, offset, length) tuples.
+
+	The shard names are returned as paths relative to the current directory, so that
+		shards are found next to their index file.
+	"""
+	index_dir = os.path.dirname(index_path)
+	index = {}
+	with open(index_path, "r") as index_file:
+		# skip the header line
+		next(index_file, None)
+		for line in index_file:
+			cluster_id, size, shard, offset, length = line.rstrip("\n").split("\t")
+			index[cluster_id] = (int(size), os.path.join(index_dir, shard), int(offset), int(length))
+	return index
+
+
+def _shard_paths(index_path):
+	"""Return the shard file paths of an index, in order, without loading the whole index."""
+	index_dir = os.path.dirname(index_path)
+	shards = {}
+	with open(index_path, "r") as index_file:
+		next(index_file, None)
+		for line in index_file:
+			shards[line.rstrip("\n").split("\t")[2]] = None
+	return [os.path.join(index_dir, shard) for shard in shards]
+
+
+def iter_jsonl(index_path):
+	"""Yield the (cluster ID, list of members) pairs of a set of shards, in order.
+
+	Only one cluster is held in memory at a time.
+	"""
+	for shard_path in _shard_paths(index_path):
+		with open(shard_path, "r", encoding="utf-8") as shard_file:
+			for line in shard_file:
+				cluster = json.loads(line)
+				yield cluster["id"], cluster["members"]
+
+
+def cluster_sizes(index_path):
+	"""Return the list of cluster sizes recorded in an index, without reading the shards."""
+	with open(index_path, "r") as index_file:
+		next(index_file, None)
+		return [int(line.split("\t", 2)[1]) for line in index_file]
+
+
+class ClusterIndex:
+	"""Random access to single clusters of a set of shards, through the byte-offset index.
+
+	Usage:
+		with ClusterIndex("MMseqs2_Pa_90_parsed.jsonl.idx") as clusters:
+			members = clusters["MMS_Cluster_12"]
+	"""
+
+	def __init__(self, index_path):
+		self.index = read_index(index_path)
+		# shard files are opened on first use & kept open
+		self._files = {}
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def close(self):
+		"""Close the shard files."""
+		for shard_file in self._files.values():
+			shard_file.close()
+		self._files = {}
+
+	def __contains__(self, cluster_id):
+		return cluster_id in self.index
+
+	def __len__(self):
+		return len(self.index)
+
+	def __iter__(self):
+		return iter(self.index)
+
+	def size(self, cluster_id):
+		"""Return the number of members of a cluster, from the index."""
+		return self.index[cluster_id][0]
+
+	def __getitem__(self, cluster_id):
+		"""Return the list of members of a cluster, reading only its line of the shard."""
+		_, shard_path, offset, length = self.index[cluster_id]
+		if shard_path not in self._files:
+			self._files[shard_path] = open(shard_path, "rb")
+		shard_file = self._files[shard_path]
+		shard_file.seek(offset)
+		return json.loads(shard_file.read(length).decode("utf-8"))["members"]
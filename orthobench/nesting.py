@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: nesting.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module measures how consistently the clusters of each program nest across the
+		percent identity thresholds used (ie. 99% -> 95% -> 90%). Ideally, every cluster
+		at a higher threshold (a "fine" cluster) is entirely contained in one cluster at
+		the next lower threshold (a "coarse" cluster), so that lowering the threshold
+		only merges clusters. Fine clusters whose members are split over several coarse
+		clusters violate this nesting.
+	For each pair of consecutive thresholds of a program, the cluster ID columns of the
+		orthology database are coded as integers, and the (fine, coarse) code pairs are
+		counted with grouped reductions over these codes, so that each comparison runs
+		in linear time in the number of proteins, rather than comparing the member lists
+		of every pair of clusters.
+	The scores reported are:
+		- Nesting_Score: the fraction of fine clusters that are entirely contained in a
+			single coarse cluster
+		- Purity: the fraction of proteins that are in the dominant coarse cluster of
+			their fine cluster (the coarse cluster containing most of its members)
+
+List of functions:
+	threshold_series(columns): Group the database columns by program, ordered by threshold.
+	compare_thresholds(fine, coarse): Compare the cluster assignments at two thresholds.
+	nesting_tables(ortho_df): Compare all consecutive thresholds of all programs in a database.
+
+List of standard and non-standard modules used:
+	re
+	numpy (imported lazily)
+	pandas (imported lazily)
+	orthobench.database
+
+"""
+
+
+import re # enables regex pattern matching
+from .database import QUERY_COL, MISSING # orthology database layout
+
+
+# column names of the nesting summary & violations tables
+NESTING_COLUMNS = ['Program', 'Fine_Column', 'Coarse_Column', 'Proteins', 'Unpaired_Proteins',
+				   'Fine_Clusters', 'Nested_Clusters', 'Split_Clusters', 'Nesting_Score', 'Purity']
+VIOLATION_COLUMNS = ['Program', 'Fine_Column', 'Coarse_Column', 'Fine_ID', 'Size', 'Coarse_Num',
+					 'Dominant_Coarse_ID', 'Purity', 'Coarse_IDs']
+# database column names end in the percent identity threshold, ie. "MMseqs2_Pa_95_parsed_pivot"
+_THRESHOLD_PATTERN = re.compile(r"^(?P<program>.*?)_?(?P<threshold>\d+(?:\.\d+)?)(?:_parsed_pivot)?$")
+
+
+def threshold_series(columns):
+	"""Group the cluster ID columns of an orthology database by program.
+
+	The program of a column is its name without the percent identity threshold & the
+		"_parsed_pivot" suffix, ie. "MMseqs2_Pa_95_parsed_pivot" belongs to "MMseqs2_Pa".
+		Returns a dictionary of program names & lists of column names, ordered from the
+		highest to the lowest threshold. Columns without a threshold are ignored.
+	"""
+	series = {}
+	for column in columns:
+		if column == QUERY_COL:
+			continue
+		match = _THRESHOLD_PATTERN.match(column)
+		if match is None:
+			continue
+		series.setdefault(match.group("program"), []).append((float(match.group("threshold")), column))
+	return {program: [column for _, column in sorted(columns, reverse=True)] for program, columns in series.items()}
+
+
+def compare_thresholds(fine, coarse):
+	"""Compare the cluster assignments of the same proteins at a higher & a lower threshold.
+
+	`fine` & `coarse` are the cluster ID columns (Pandas series aligned on the proteins)
+		of the higher & lower threshold. Proteins that were not assigned at both
+		thresholds ("-") are left out. Returns a dictionary with the counts & scores of
+		NESTING_COLUMNS (except the Program & column names), & a dataframe of the fine
+		clusters that are split over several coarse clusters (the VIOLATION_COLUMNS,
+		except the Program & column names), sorted from the largest to the smallest.
+	"""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	paired = ((fine != MISSING) & (coarse != MISSING) & fine.notna() & coarse.notna()).to_numpy()
+	# code the cluster IDs of the paired proteins as integers
+	fine_codes, fine_ids = pd.factorize(fine.to_numpy()[paired])
+	coarse_codes, coarse_ids = pd.factorize(coarse.to_numpy()[paired])
+	n_fine = len(fine_ids)
+	# code each (fine, coarse) combination as a single integer & count the proteins in each
+	pair_codes, pair_keys = pd.factorize(fine_codes.astype(np.int64) * max(len(coarse_ids), 1) + coarse_codes)
+	pair_counts = np.bincount(pair_codes, minlength=len(pair_keys))
+	pair_fine = pair_keys // max(len(coarse_ids), 1)
+	pair_coarse = pair_keys % max(len(coarse_ids), 1)
+	# grouped reductions over the fine cluster codes
+	fine_sizes = np.bincount(fine_codes, minlength=n_fine)
+	coarse_num = np.bincount(pair_fine, minlength=n_fine)
+	dominant_count = np.zeros(n_fine, dtype=np.int64)
+	np.maximum.at(dominant_count, pair_fine, pair_counts)
+	# the dominant coarse cluster of each fine cluster (the first one, in case of ties)
+	is_dominant = np.flatnonzero(pair_counts == dominant_count[pair_fine])[::-1]
+	dominant = np.zeros(n_fine, dtype=np.int64)
+	dominant[pair_fine[is_dominant]] = pair_coarse[is_dominant]
+	nested = int(np.count_nonzero(coarse_num == 1))
+	scores = {
+		'Proteins': int(paired.sum()),
+		'Unpaired_Proteins': int(len(paired) - paired.sum()),
+		'Fine_Clusters': n_fine,
+		'Nested_Clusters': nested,
+		'Split_Clusters': n_fine - nested,
+		'Nesting_Score': nested / n_fine if n_fine else float("nan"),
+		'Purity': dominant_count.sum() / fine_sizes.sum() if n_fine else float("nan"),
+	}
+	# list the coarse clusters of each split fine cluster, from the most to the least members
+	split = np.flatnonzero(coarse_num > 1)
+	split_pairs = np.flatnonzero(coarse_num[pair_fine] > 1)
+	split_pairs = split_pairs[np.lexsort((-pair_counts[split_pairs], pair_fine[split_pairs]))]
+	coarse_lists = {}
+	for fine_code, coarse_code in zip(pair_fine[split_pairs], pair_coarse[split_pairs]):
+		coarse_lists.setdefault(fine_code, []).append(str(coarse_ids[coarse_code]))
+	violations_df = pd.DataFrame({
+		'Fine_ID': fine_ids[split],
+		'Size': fine_sizes[split],
+		'Coarse_Num': coarse_num[split],
+		'Dominant_Coarse_ID': coarse_ids[dominant[split]] if len(split) else [],
+		'Purity': dominant_count[split] / fine_sizes[split],
+		'Coarse_IDs': [",".join(coarse_lists[fine_code]) for fine_code in split],
+	})
+	violations_df = violations_df.sort_values(['Size', 'Purity'], ascending=[False, True], kind="stable")
+	return scores, violations_df.reset_index(drop=True)
+
+
+def nesting_tables(ortho_df):
+	"""Compare every pair of consecutive thresholds of every program in an orthology database.
+
+	Returns the nesting summary dataframe (NESTING_COLUMNS; 1 row per pair of thresholds)
+		& the dataframe of violating clusters of all pairs (VIOLATION_COLUMNS).
+	"""
+	import pandas as pd # allows manipulation of dataframes in Python
+	rows = []
+	violations = []
+	for program, columns in threshold_series(ortho_df.columns).items():
+		for fine_col, coarse_col in zip(columns, columns[1:]):
+			# compare each threshold to the next lower one
+			scores, violations_df = compare_thresholds(ortho_df[fine_col], ortho_df[coarse_col])
+			rows.append(dict(scores, Program=program, Fine_Column=fine_col, Coarse_Column=coarse_col))
+			violations.append(violations_df.assign(Program=program, Fine_Column=fine_col, Coarse_Column=coarse_col))
+	summary_df = pd.DataFrame(rows, columns=NESTING_COLUMNS)
+	if not violations:
+		return summary_df, pd.DataFrame(columns=VIOLATION_COLUMNS)
+	return summary_df, pd.concat(violations, ignore_index=True)[VIOLATION_COLUMNS]
@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: parsers.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module parses the results files of the orthologous clustering programs used
+		in the OrthoBenchmark workflow into a standardized in-memory pivot table: a
+		Pandas dataframe with one row per protein, where the first column contains
+		the cluster ID and the second column the protein (cluster member) ID. Rows
+		are grouped by cluster, in the order the clusters were encountered.
+	The pivot table can be passed directly to the functions in the database and stats
+		modules, or written out as the three standard results files of the
+		ortho_results_parser.py program: a JSON dictionary (*_parsed.json), an expanded
+		pivot table (*_parsed_pivot.txt) and a compressed comma-separated pivot table
+		(*_parsed.txt).
+	The clustering software whose results files can be parsed are:
+		- CD-HIT ("cd-hit"; *.clstr file)
+		- Diamond ("diamond"; *.txt file from `diamond cluster`)
+		- MMseqs2 ("mmseqs2"; *.tsv file from `mmseqs createtsv`)
+		- USEARCH ("usearch"; *.uc file)
+		- OrthoFinder ("orthofinder"; Orthogroups.tsv or Orthogroups.txt file)
+		- generic cluster/member pairs ("pairs"; one "cluster<TAB>member" line per protein)
+		- generic cluster lists ("lines"; one line of whitespace- or comma-separated
+			members per cluster)
+	The OrthoFinder orthogroup IDs & the cluster IDs of the "pairs" format are kept as
+		they are; the clusters of the "lines" format are numbered in file order.
+	Optionally, the clusters can instead be given stable IDs, derived from a hash of the
+		smallest member ID of each cluster (ie. "MMS_Cluster_3f9a0c51d2e87b64"), with the
+		members sorted & the clusters ordered by their smallest member. Parsing the same
+		clustering then always gives identical output files, whatever the order of the
+		lines of the input file, so that the IDs can be matched between runs.
+	Input files can be plain text or gzip/bzip2/Zstandard-compressed, and the output files
+		can optionally be compressed (see the compression module).
+	The output files are written atomically, & the parse can be made resumable with a
+		checkpoint (see the checkpoint module).
+
+List of functions:
+	iter_records(path, fmt): Stream the (cluster ID, member ID) pairs of a line-oriented results file.
+	parse_clusters(path, fmt, engine="auto", stable_ids=False, checkpoint=None): Parse a clustering
+		results file into a pivot table.
+	stable_dict(ortho_dict, fmt): Rename & reorder the clusters of a cluster dictionary deterministically.
+	stable_pivot(pivot_df, fmt): Rename & reorder the clusters of a pivot table deterministically.
+	cluster_dict(pivot_df, grouped=None): Convert a pivot table into a dictionary of cluster member lists.
+	compressed_pivot(pivot_df, grouped=None): Convert a pivot table into one comma-separated row per cluster.
+	output_names(out_base, compress=None): Return the standard output file names for a basename.
+	write_results(pivot_df, out_base, compress=None, jsonl_shard_size=None, checkpoint=None): Write
+		out the three standard results files.
+	stream_results(path, fmt, out_base, compress=None, check=None, jsonl_shard_size=None,
+		stable_ids=False, checkpoint=None): Parse a line-oriented results file & write out
+		the three standard results files without loading Pandas.
+
+List of standard and non-standard modules used:
+	os
+	re
+	csv
+	json
+	itertools.chain
+	string.punctuation
+	hashlib.blake2b
+	orthobench.compression
+	orthobench.jsonl
+	orthobench.chunked
+	orthobench.checkpoint
+	numpy (imported lazily)
+	pandas (imported lazily)
+
+"""
+
+
+import os # allow access to computer files
+import re # enables regex pattern matching
+import csv # writes tab-separated text files without Pandas
+import json # allows import and export of data in JSON format
+from itertools import chain # re-attaches the first line of a file to the rest
+from string import punctuation # manipulate punctuation marks in strings
+from hashlib import blake2b # run-independent hashes for stable cluster IDs
+from .compression import open_text, add_extension # transparent (de)compression
+from .jsonl import write_jsonl, jsonl_names, remove_extra_shards # sharded JSON Lines output
+from .chunked import read_pairs # parallel reading of centroid/member tables
+from .checkpoint import atomic_path, remove_stale # atomic output files
+# numpy & pandas are imported inside the functions that need them, so that the
+# streaming CD-HIT & USEARCH code paths don't pay for importing them
+
+
+# cluster ID prefix & pivot table column names used for each clustering program
+FORMATS = {
+	"cd-hit": ("CDH_", "CD-HIT_ID", "CD-HIT_Members"),
+	"diamond": ("DMD_Cluster_", "Diamond_ID", "Diamond_Members"),
+	"mmseqs2": ("MMS_Cluster_", "MMseqs2_ID", "MMseqs2_Members"),
+	"usearch": ("USR_Cluster_", "USEARCH_ID", "USEARCH_Members"),
+	"orthofinder": ("", "OrthoFinder_ID", "OrthoFinder_Members"),
+	"pairs": ("", "Cluster_ID", "Cluster_Members"),
+	"lines": ("Cluster_", "Cluster_ID", "Cluster_Members"),
+}
+
+
+def _check_format(fmt):
+	"""Return the prefix & column names for a clustering format, or raise a ValueError."""
+	if fmt not in FORMATS:
+		raise ValueError("Unknown clustering results format '" + str(fmt) + "'; expected one of: " + ", ".join(FORMATS))
+	return FORMATS[fmt]
+
+
+def _iter_cd_hit(path):
+	"""Yield (cluster ID, member ID) pairs from a CD-HIT *.clstr file."""
+	with open_text(path) as infile:
+		for line in infile:
+			# iterate over the input file line by line
+			if line.startswith(">"):
+				# identify the lines that start a specific cluster
+				# and create the cluster ID from it, ie. ">Cluster 0" becomes "CDH_Cluster_0"
+				cluster_id = re.sub(" ", "_", re.sub(">", "CDH_", line.strip()))
+			else:
+				# if the line is a cluster member, extract the member name
+				# ie. "1	119aa, >AAAA... at 95.00%" becomes "AAAA"
+				cluster_member = line.strip().split(" ")[1]
+				cluster_member = re.sub(">", "", cluster_member)
+				# remove the trailing periods from the end of the name
+				# ref: https://stackoverflow.com/questions/37221307/how-do-i-strip-all-leading-and-trailing-punctuation-in-python
+				yield cluster_id, cluster_member.strip(punctuation)
+
+
+def _iter_usearch(path):
+	"""Yield (cluster ID, member ID) pairs from a USEARCH *.uc file."""
+	# create a counter to use to create cluster IDs
+	counter = 0
+	with open_text(path) as infile:
+		for line in infile:
+			# iterate over the input file line by line
+			if line.startswith("S"):
+				# centroid records start a new cluster
+				cluster_id = "USR_Cluster_" + str(counter)
+				counter += 1
+			elif not line.startswith("H"):
+				# skip the "C" cluster summary records
+				continue
+			# the sequence ID is in the 9th column (pythonic index 8)
+			yield cluster_id, line.strip().split("\t")[8]
+
+
+def _iter_orthofinder(path):
+	"""Yield (orthogroup ID, member ID) pairs from an OrthoFinder Orthogroups.tsv or Orthogroups.txt file.
+
+	Orthogroups.tsv has a header line & one row per orthogroup, with one column per
+		genome containing a comma-separated list of the genes of that genome, ie.
+		"OG0000000<TAB>AAAA, BBBB<TAB>CCCC". Orthogroups.txt has one line per
+		orthogroup, ie. "OG0000000: AAAA BBBB CCCC". The format is recognized from
+		the first line. Only one row is held in memory at a time.
+	"""
+	with open_text(path) as infile:
+		first_line = infile.readline()
+		if first_line.startswith("Orthogroup\t"):
+			# Orthogroups.tsv: skip the header with the genome names
+			for line in infile:
+				fields = line.rstrip("\r\n").split("\t")
+				for genome_genes in fields[1:]:
+					# the genes of each genome are separated by ", "
+					for member in genome_genes.split(","):
+						member = member.strip()
+						if member:
+							yield fields[0], member
+		else:
+			# Orthogroups.txt: the orthogroup ID is followed by a colon
+			for line in chain([first_line], infile):
+				if not line.strip():
+					continue
+				orthogroup, _, members = line.partition(":")
+				for member in members.split():
+					yield orthogroup.strip(), member
+
+
+def _iter_pairs(path):
+	"""Yield (cluster ID, member ID) pairs from a generic "cluster<TAB>member" file.
+
+	Blank lines & lines starting with "#" are skipped; columns after the second are ignored.
+	"""
+	with open_text(path) as infile:
+		for line in infile:
+			if not line.strip() or line.startswith("#"):
+				continue
+			fields = line.rstrip("\r\n").split("\t")
+			if len(fields) < 2:
+				raise ValueError("Expected a cluster<TAB>member line in " + path + ", found: " + line.rstrip())
+			yield fields[0], fields[1]
+
+
+def _iter_lines(path):
+	"""Yield (cluster ID, member ID) pairs from a generic file with one cluster per line.
+
+	The members of each cluster are separated by whitespace and/or commas, and the
+		clusters are numbered in file order, ie. "Cluster_0". Blank lines & lines
+		starting with "#" are skipped.
+	"""
+	# create a counter to use to create cluster IDs
+	counter = 0
+	with open_text(path) as infile:
+		for line in infile:
+			if line.startswith("#"):
+				continue
+			members = [member for member in re.split(r"[\s,]+", line) if member]
+			if not members:
+				continue
+			cluster_id = "Cluster_" + str(counter)
+			counter += 1
+			for member in members:
+				yield cluster_id, member
+
+
+# line-oriented results formats, which can be parsed & written out without Pandas
+STREAMING_FORMATS = {
+	"cd-hit": _iter_cd_hit,
+	"usearch": _iter_usearch,
+	"orthofinder": _iter_orthofinder,
+	"pairs": _iter_pairs,
+	"lines": _iter_lines,
+}
+
+
+def iter_records(path, fmt):
+	"""Yield the (cluster ID, member ID) pairs of a line-oriented results file, in file order.
+
+	`fmt` is one of the STREAMING_FORMATS: "cd-hit", "usearch", "orthofinder", "pairs" or "lines".
+	"""
+	_check_format(fmt)
+	if fmt not in STREAMING_FORMATS:
+		raise ValueError("The '" + fmt + "' format cannot be streamed; use parse_clusters() instead")
+	return STREAMING_FORMATS[fmt](path)
+
+
+def _collect_clusters(path, fmt, check=None):
+	"""Collect the records of a line-oriented results file into a dictionary of member lists.
+
+	The clusters are kept in the order they were first encountered, so that the members
+		of a cluster are grouped together even if its lines are not consecutive in the
+		input file (ie. in the "pairs" format). If `check` (a validation.MembershipCheck)
+		is given, each record is also passed to it.
+	"""
+	# create empty dictionary to store orthologous cluster information
+	ortho_dict = {}
+	for cluster_id, member in iter_records(path, fmt):
+		ortho_dict.setdefault(cluster_id, []).append(member)
+		if check is not None:
+			check.add(cluster_id, member)
+	return ortho_dict
+
+
+def _parse_centroid_table(path, fmt, engine="auto", checkpoint=None):
+	"""Parse a two-column centroid/member table from Diamond or MMseqs2 into a pivot table.
+
+	The table is read by chunked.read_pairs(), on multiple cores where possible; `engine`
+		& `checkpoint` are passed on to it.
+	"""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	prog_clust_head, clust_id_col, clust_mem_col = _check_format(fmt)
+	# read the input file into integer-coded centroids & the member IDs
+	# note that the first line of the file is treated as a header
+	# the clusters are numbered in the sorted order of their centroid IDs
+	codes, _, members = read_pairs(path, engine, checkpoint=checkpoint)
+	# group the members of each cluster together, keeping their original order
+	order = np.argsort(codes, kind="stable")
+	return pd.DataFrame({
+		clust_id_col: prog_clust_head + pd.Series(codes[order]).astype(str),
+		clust_mem_col: members[order],
+	})
+
+
+def stable_prefix(fmt):
+	"""Return the cluster ID prefix used with stable cluster IDs, ie. "MMS_Cluster_"."""
+	prefix = _check_format(fmt)[0]
+	return prefix if prefix.endswith("Cluster_") else prefix + "Cluster_"
+
+
+def stable_id(prefix, member):
+	"""Return the stable cluster ID of a cluster: `prefix` + a 64-bit hash of its smallest member ID.
+
+	The BLAKE2b hash is used, which (unlike Python's hash()) is the same in every run.
+	"""
+	return prefix + blake2b(str(member).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _check_stable_ids(cluster_ids):
+	"""Raise a ValueError if two clusters were given the same stable cluster ID."""
+	cluster_ids = list(cluster_ids)
+	if len(set(cluster_ids)) != len(cluster_ids):
+		raise ValueError("Two clusters share their smallest member, so their stable cluster IDs would be "
+						 "the same; proteins assigned to multiple clusters are listed by --check")
+
+
+def stable_dict(ortho_dict, fmt):
+	"""Give the clusters of a cluster dictionary stable IDs that don't depend on the input order.
+
+	The members of each cluster are sorted, each cluster is named after a hash of its
+		smallest member (see stable_id()), & the clusters are ordered by their smallest
+		member, so that the same clustering always gives the same output files.
+	"""
+	prefix = stable_prefix(fmt)
+	clusters = sorted(sorted(members) for members in ortho_dict.values() if members)
+	cluster_ids = [stable_id(prefix, members[0]) for members in clusters]
+	_check_stable_ids(cluster_ids)
+	return dict(zip(cluster_ids, clusters))
+
+
+def stable_pivot(pivot_df, fmt):
+	"""Give the clusters of a pivot table stable IDs that don't depend on the input order.
+
+	This is the vectorized equivalent of stable_dict(): the members are ranked by sorting
+		their IDs once, the smallest rank of each cluster is found with a grouped minimum
+		over the integer cluster codes, & the rows are ordered by (smallest rank of the
+		cluster, rank of the member). Only the hashing of the cluster IDs is not
+		vectorized: it is a Python-level loop over the unique smallest members, so
+		each hash is computed once.
+	"""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	clust_id_col, clust_mem_col = pivot_df.columns[:2]
+	if len(pivot_df) == 0:
+		return pivot_df.copy()
+	cluster_codes, _ = pd.factorize(pivot_df[clust_id_col])
+	members = pivot_df[clust_mem_col].to_numpy()
+	member_ranks, sorted_members = pd.factorize(members, sort=True)
+	# the rank of the smallest member of each cluster
+	min_ranks = np.full(cluster_codes.max() + 1, len(sorted_members), dtype=np.int64)
+	np.minimum.at(min_ranks, cluster_codes, member_ranks)
+	# order the clusters by their smallest member, & the members within each cluster
+	order = np.lexsort((member_ranks, cluster_codes, min_ranks[cluster_codes]))
+	# hash each smallest member once, & map the hashes onto the clusters
+	prefix = stable_prefix(fmt)
+	smallest = pd.Series(sorted_members[min_ranks])
+	unique_smallest = pd.unique(smallest)
+	if len(unique_smallest) != len(smallest):
+		# two clusters share their smallest member
+		_check_stable_ids(smallest.tolist())
+	hashes = dict(zip(unique_smallest, (stable_id(prefix, member) for member in unique_smallest)))
+	cluster_ids = smallest.map(hashes).to_numpy(dtype=object)
+	# distinct members could still share a hash
+	_check_stable_ids(hashes.values())
+	return pd.DataFrame({
+		clust_id_col: cluster_ids[cluster_codes[order]],
+		clust_mem_col: members[order],
+	})
+
+
+def parse_clusters(path, fmt, engine="auto", stable_ids=False, checkpoint=None):
+	"""Parse the results file of an orthologous clustering program into a pivot table.
+
+	`fmt` is one of the keys of FORMATS. The returned dataframe has one row per protein,
+		with the columns <Program>_ID & <Program>_Members. `engine` selects how the
+		Diamond & MMseqs2 tables are read (see chunked.read_pairs()). With
+		`stable_ids=True`, the clusters are named & ordered independently of the order
+		of the input file (see stable_pivot()). If a checkpoint.Checkpoint is given, the
+		Diamond & MMseqs2 tables are read in chunks that are saved to it, so that an
+		interrupted parse resumes with the chunks that were not yet read.
+	"""
+	import pandas as pd # allows manipulation of dataframes in Python
+	_, clust_id_col, clust_mem_col = _check_format(fmt)
+	if fmt not in STREAMING_FORMATS:
+		# the same general parsing style can be used for Diamond or MMseqs2
+		pivot_df = _parse_centroid_table(path, fmt, engine, checkpoint)
+		return stable_pivot(pivot_df, fmt) if stable_ids else pivot_df
+	ortho_dict = _collect_clusters(path, fmt)
+	if stable_ids:
+		ortho_dict = stable_dict(ortho_dict, fmt)
+	return pd.DataFrame({
+		clust_id_col: [cluster_id for cluster_id, members in ortho_dict.items() for _ in members],
+		clust_mem_col: [member for members in ortho_dict.values() for member in members],
+	})
+
+
+def _grouped_members(pivot_df):
+	"""Return the cluster IDs of a pivot table (in order of appearance) & their member lists."""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	clust_id_col, clust_mem_col = pivot_df.columns[:2]
+	codes, cluster_ids = pd.factorize(pivot_df[clust_id_col])
+	# sort the members by cluster, keeping their original order within each cluster
+	order = np.argsort(codes, kind="stable")
+	members = pivot_df[clust_mem_col].to_numpy()[order]
+	# and split the sorted members at the cluster boundaries
+	boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+	return list(cluster_ids), [group.tolist() for group in np.split(members, boundaries)]
+
+
+def cluster_dict(pivot_df, grouped=None):
+	"""Convert a pivot table into a dictionary of cluster IDs & lists of member IDs.
+
+	`grouped` is the (cluster IDs, member lists) pair of the pivot table, if it has already
+		been computed (see write_results()).
+	"""
+	if len(pivot_df) == 0:
+		return {}
+	return dict(zip(*(grouped or _grouped_members(pivot_df))))
+
+
+def compressed_pivot(pivot_df, grouped=None):
+	"""Convert a pivot table into one row per cluster, with comma-separated member IDs.
+
+	As in cluster_dict(), `grouped` is the already computed (cluster IDs, member lists) pair.
+	"""
+	import pandas as pd # allows manipulation of dataframes in Python
+	clust_id_col, clust_mem_col = pivot_df.columns[:2]
+	if len(pivot_df) == 0:
+		return pd.DataFrame(columns=[clust_id_col, clust_mem_col])
+	cluster_ids, members = grouped or _grouped_members(pivot_df)
+	# turn the lists of members into comma-separated strings
+	return pd.DataFrame({
+		clust_id_col: cluster_ids,
+		clust_mem_col: [",".join(map(str, group)) for group in members],
+	})
+
+
+def output_names(out_base, compress=None):
+	"""Return the (compressed, pivot, JSON) output file names for an output basename.
+
+	`compress` is an optional compression format ("gz", "bz2" or "zst") to add as a
+		file extension to the names.
+	"""
+	return tuple(add_extension(out_base + suffix, compress) for suffix in ("_parsed.txt", "_parsed_pivot.txt", "_parsed.json"))
+
+
+def _write_output(path, write, checkpoint=None):
+	"""Write an output file atomically by calling `write(tmp_path)`, unless a checkpoint records it as written.
+
+	The file is written under a temporary name & renamed once it is complete (see
+		checkpoint.atomic_path()), so that an interrupted run never leaves a partial file.
+	"""
+	step = "output_" + os.path.basename(path)
+	if checkpoint is not None and checkpoint.done(step) and os.path.exists(path):
+		# only remove the temporary files that an interrupted run may have left behind
+		remove_stale(path)
+		return
+	with atomic_path(path) as tmp_path:
+		write(tmp_path)
+	if checkpoint is not None:
+		checkpoint.mark(step)
+
+
+def write_results(pivot_df, out_base, compress=None, jsonl_shard_size=None, checkpoint=None):
+	"""Write out the JSON dictionary, expanded pivot table & compressed pivot table.
+
+	The files are optionally compressed in the `compress` format ("gz", "bz2" or "zst").
+		If `jsonl_shard_size` is given, the clusters are also written out as sharded
+		JSON Lines files with that many clusters per shard (see the jsonl module).
+		Each file is written atomically; if a checkpoint.Checkpoint is given, the files
+		that were completed by an interrupted run are not written again.
+	"""
+	output_txt, output_pivot, output_json = output_names(out_base, compress)
+	# group the members by cluster once, for both the dictionary & the compressed pivot table
+	grouped = _grouped_members(pivot_df) if len(pivot_df) else None
+	ortho_dict = cluster_dict(pivot_df, grouped)
+
+	def write_json(tmp_path):
+		with open_text(tmp_path, "w") as outfile_json:
+			# export the dictionary to a JSON file
+			json.dump(ortho_dict, outfile_json)
+
+	def write_pivot(tmp_path):
+		# the lineterminator prevents random extra newlines between cluster info lines
+		# ref: https://stackoverflow.com/questions/56398306/using-pandas-to-write-file-creates-blank-lines
+		with open_text(tmp_path, "w", newline="") as outfile_pivot:
+			pivot_df.to_csv(outfile_pivot, sep="\t", index=False, lineterminator="\n")
+
+	def write_txt(tmp_path):
+		with open_text(tmp_path, "w", newline="") as outfile_txt:
+			compressed_pivot(pivot_df, grouped).to_csv(outfile_txt, sep="\t", index=False, lineterminator="\n")
+
+	_write_output(output_json, write_json, checkpoint)
+	if jsonl_shard_size:
+		_write_output(jsonl_names(out_base)[0], lambda tmp_path: write_jsonl(ortho_dict.items(), out_base, jsonl_shard_size, tmp_path), checkpoint)
+		# the index is in place, so the shards of a previous run with more shards can go
+		remove_extra_shards(out_base)
+	_write_output(output_pivot, write_pivot, checkpoint)
+	_write_output(output_txt, write_txt, checkpoint)
+	return output_txt, output_pivot, output_json
+
+
+def stream_results(path, fmt, out_base, compress=None, check=None, jsonl_shard_size=None, stable_ids=False, checkpoint=None):
+	"""Parse a line-oriented results file & write out the standard results files without Pandas.
+
+	The output files are identical to those of parse_clusters() followed by write_results(),
+		and are optionally compressed in the `compress` format. If `check` (a
+		validation.MembershipCheck) is given, the records are checked as they are
+		parsed. If `jsonl_shard_size` is given, the clusters are also written out as
+		sharded JSON Lines files (see the jsonl module). With `stable_ids=True`, the
+		clusters are named & ordered independently of the order of the input file
+		(see stable_dict()). As in write_results(), each file is written atomically, &
+		the files recorded in `checkpoint` are not written again. Returns the number of
+		proteins parsed.
+	"""
+	_, clust_id_col, clust_mem_col = _check_format(fmt)
+	output_txt, output_pivot, output_json = output_names(out_base, compress)
+	ortho_dict = _collect_clusters(path, fmt, check)
+	if stable_ids:
+		ortho_dict = stable_dict(ortho_dict, fmt)
+
+	def write_pivot(tmp_path):
+		with open_text(tmp_path, "w", newline="") as outfile_pivot:
+			# write out the expanded pivot table, with the members grouped by cluster
+			pivot_writer = csv.writer(outfile_pivot, delimiter="\t", lineterminator="\n")
+			pivot_writer.writerow([clust_id_col, clust_mem_col])
+			for cluster_id, members in ortho_dict.items():
+				pivot_writer.writerows([cluster_id, member] for member in members)
+
+	def write_json(tmp_path):
+		with open_text(tmp_path, "w") as outfile_json:
+			# export the dictionary to a JSON file
+			json.dump(ortho_dict, outfile_json)
+
+	def write_txt(tmp_path):
+		with open_text(tmp_path, "w", newline="") as outfile_txt:
+			# turn the lists of members into comma-separated strings
+			txt_writer = csv.writer(outfile_txt, delimiter="\t", lineterminator="\n")
+			txt_writer.writerow([clust_id_col, clust_mem_col])
+			for cluster_id, members in ortho_dict.items():
+				txt_writer.writerow([cluster_id, ",".join(members)])
+
+	_write_output(output_pivot, write_pivot, checkpoint)
+	_write_output(output_json, write_json, checkpoint)
+	if jsonl_shard_size:
+		_write_output(jsonl_names(out_base)[0], lambda tmp_path: write_jsonl(ortho_dict.items(), out_base, jsonl_shard_size, tmp_path), checkpoint)
+		# the index is in place, so the shards of a previous run with more shards can go
+		remove_extra_shards(out_base)
+	_write_output(output_txt, write_txt, checkpoint)
+	return sum(len(members) for members in ortho_dict.values())
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: profiling.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module provides opt-in instrumentation for the OrthoBenchmark scripts. Each
+		script is written as a series of numbered "Part" steps; when profiling is
+		enabled, the wall time, CPU time, peak resident set size (RSS) and number of
+		rows processed are recorded for each Part, and written out to a JSON trace
+		file once the script finishes. The CPU time & peak RSS of child processes
+		(ie. the worker processes of the parallel table reader, or the external
+		decompression programs) are recorded separately, as children_cpu_s &
+		children_peak_rss_mb. Optionally, a cProfile dump of the whole run
+		is also written, which can be inspected with `python -m pstats`, snakeviz,
+		or compared against py-spy recordings of the same script.
+	When profiling is not enabled, all of the calls in this module are no-ops.
+
+List of functions:
+	mode_from_env(): Read the profiling mode from the ORTHOBENCH_PROFILE environment variable.
+	pop_flag(argv): Remove a `--profile[=MODE]` flag from a `sys.argv`-style list.
+	start(script_name, mode=None): Create the StageProfiler for a script.
+
+List of classes:
+	StageProfiler: Records per-Part measurements and writes out the trace files.
+
+List of standard and non-standard modules used:
+	os
+	sys
+	time
+	json (only loaded when writing the trace)
+	atexit
+	resource (optional; Unix only)
+	cProfile (only loaded in "cprofile" mode)
+
+Known bugs and limitations:
+	- The figures of the child processes come from getrusage(RUSAGE_CHILDREN), which
+		only includes the child processes that have exited & been waited for; the CPU
+		time of a worker pool is therefore attributed to the Part in which it is closed.
+	- children_peak_rss_mb is the peak RSS of the largest single child process since
+		the start of the script (it can't be reset between Parts), not the sum over
+		child processes running at the same time.
+	- Neither is available on systems without the resource module (ie. Windows).
+
+Usage:
+	Profiling is enabled either on the command line, with the `--profile` flag
+		(`--profile=cprofile` to also write a cProfile dump), or by setting the
+		environment variable before running a script:
+			ORTHOBENCH_PROFILE=1 python ortho_results_parser.py -i Pa_DB_90_clu.tsv -m
+			ORTHOBENCH_PROFILE=cprofile python create_ortho_db.py *_parsed_pivot.txt
+	The trace files are written to the current working directory, or to the directory
+		given in the ORTHOBENCH_PROFILE_DIR environment variable, as:
+			<script>__profile__<date>--<time>.json
+			<script>__profile__<date>--<time>.prof
+	Within a script:
+		prof = profiling.start("ortho_results_parser", args.profile)
+		prof.part("Part 1: Import necessary modules")
+		...
+		prof.add_rows(len(input_df))
+
+"""
+
+
+import os # allows access to the operating system
+import sys # access the interpreter state & command line
+import time # wall clock & CPU time counters
+import atexit # ensures the trace is written when the script exits
+# json is only imported when the trace is written out, so that importing this module
+# adds as little as possible to the startup time of the scripts when profiling is off
+try:
+	import resource # peak RSS via getrusage() on Unix systems
+except ImportError:
+	resource = None
+
+
+# accepted profiling modes
+# "json" writes only the stage trace, "cprofile" additionally writes a cProfile dump
+PROFILE_MODES = ("json", "cprofile")
+# environment variables used to configure profiling
+ENV_MODE = "ORTHOBENCH_PROFILE"
+ENV_DIR = "ORTHOBENCH_PROFILE_DIR"
+# the command line as the script was invoked, recorded in the trace; it is copied when
+# this module is imported, since the scripts then remove the --profile, --compress &
+# --resume flags from sys.argv
+INVOKED_ARGV = list(sys.argv)
+
+
+def _normalize_mode(value):
+	"""Convert a flag or environment variable value into a profiling mode (or None)."""
+	if value is None:
+		return None
+	value = str(value).strip().lower()
+	if value in ("", "0", "false", "no", "off"):
+		# profiling explicitly switched off
+		return None
+	if value in ("1", "true", "yes", "on"):
+		# profiling switched on without a specific mode
+		return "json"
+	if value not in PROFILE_MODES:
+		raise ValueError("Unknown profiling mode '" + value + "'; expected one of: " + ", ".join(PROFILE_MODES))
+	return value
+
+
+def mode_from_env():
+	"""Return the profiling mode requested via the ORTHOBENCH_PROFILE environment variable."""
+	return _normalize_mode(os.environ.get(ENV_MODE))
+
+
+def pop_flag(argv):
+	"""Remove `--profile` or `--profile=MODE` from an argument list & return the mode.
+
+	This is used by the scripts that read their arguments directly from `sys.argv`,
+		so that the profiling flag does not get mistaken for an input file.
+	"""
+	mode = None
+	for arg in list(argv[1:]):
+		# loop over a copy of the arguments, since the list is edited in place
+		if arg == "--profile":
+			mode = "json"
+			argv.remove(arg)
+		elif arg.startswith("--profile="):
+			mode = _normalize_mode(arg.split("=", 1)[1])
+			argv.remove(arg)
+	return mode
+
+
+def _current_peak_rss_kb():
+	"""Return the peak RSS of the process in kilobytes, and the scope of that value."""
+	try:
+		# on Linux, VmHWM is the high-water mark, which can be reset between stages
+		with open("/proc/self/status", "r") as status_file:
+			for line in status_file:
+				if line.startswith("VmHWM:"):
+					return int(line.split()[1]), "stage"
+	except OSError:
+		pass
+	if resource is not None:
+		# getrusage() only gives the peak over the lifetime of the process
+		peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+		if sys.platform == "darwin":
+			# macOS reports the value in bytes, rather than kilobytes
+			peak = peak // 1024
+		return peak, "process"
+	return None, None
+
+
+def _children_usage():
+	"""Return the CPU time (s) & peak RSS (kB) of the terminated child processes, or Nones."""
+	if resource is None:
+		return None, None
+	usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+	peak = usage.ru_maxrss
+	if sys.platform == "darwin":
+		# macOS reports the value in bytes, rather than kilobytes
+		peak = peak // 1024
+	return usage.ru_utime + usage.ru_stime, peak
+
+
+def _children_fields(started_cpu):
+	"""Return the children_cpu_s & children_peak_rss_mb fields of a Part (or of the whole run)."""
+	cpu, peak_kb = _children_usage()
+	return {
+		"children_cpu_s": None if cpu is None else round(cpu - started_cpu, 6),
+		"children_peak_rss_mb": None if peak_kb is None else round(peak_kb / 1024, 3),
+	}
+
+
+def _reset_peak_rss():
+	"""Reset the Linux peak RSS counter, so that each stage gets its own high-water mark."""
+	try:
+		# ref: https://www.kernel.org/doc/html/latest/filesystems/proc.html (clear_refs)
+		with open("/proc/self/clear_refs", "w") as clear_refs:
+			clear_refs.write("5")
+	except OSError:
+		pass
+
+
+class _NullProfiler:
+	"""Stand-in used when profiling is disabled; every method does nothing."""
+
+	enabled = False
+
+	def part(self, name):
+		pass
+
+	def add_rows(self, count):
+		pass
+
+	def finish(self):
+		pass
+
+
+class StageProfiler:
+	"""Record wall time, CPU time, peak RSS & rows processed for each Part of a script.
+
+	Calling `part()` closes the previous Part (if any) and opens a new one; the last
+		Part is closed and the trace is written out automatically when the interpreter
+		exits, or explicitly with `finish()`.
+	"""
+
+	enabled = True
+
+	def __init__(self, script_name, mode="json", out_dir=None):
+		self.script_name = script_name
+		self.mode = mode
+		self.out_dir = out_dir or os.environ.get(ENV_DIR) or os.getcwd()
+		self.stages = []
+		self._current = None
+		self._finished = False
+		self._started_wall = time.perf_counter()
+		self._started_cpu = time.process_time()
+		self._started_children_cpu = _children_usage()[0] or 0.0
+		self._started_at = time.localtime()
+		self._cprofile = None
+		if mode == "cprofile":
+			# cProfile is only loaded when it is actually needed
+			import cProfile
+			self._cprofile = cProfile.Profile()
+			self._cprofile.enable()
+		atexit.register(self.finish)
+
+	def part(self, name):
+		"""Close the currently running Part and start timing the next one."""
+		self._close_current()
+		_reset_peak_rss()
+		self._current = {
+			"name": name,
+			"rows": None,
+			"_wall": time.perf_counter(),
+			"_cpu": time.process_time(),
+			"_children_cpu": _children_usage()[0] or 0.0,
+		}
+
+	def add_rows(self, count):
+		"""Add to the number of rows (lines, proteins, clusters...) processed in this Part."""
+		if self._current is None:
+			return
+		self._current["rows"] = (self._current["rows"] or 0) + int(count)
+
+	def _close_current(self):
+		"""Finalize the measurements of the currently running Part."""
+		if self._current is None:
+			return
+		stage = self._current
+		peak_kb, peak_scope = _current_peak_rss_kb()
+		record = {
+			"name": stage["name"],
+			"wall_s": round(time.perf_counter() - stage["_wall"], 6),
+			"cpu_s": round(time.process_time() - stage["_cpu"], 6),
+			"peak_rss_mb": None if peak_kb is None else round(peak_kb / 1024, 3),
+			"peak_rss_scope": peak_scope,
+		}
+		# the CPU time & peak RSS of the child processes are reported separately
+		record.update(_children_fields(stage["_children_cpu"]))
+		record["rows"] = stage["rows"]
+		self.stages.append(record)
+		self._current = None
+
+	def finish(self):
+		"""Close the last Part and write out the JSON trace (and the cProfile dump)."""
+		import json # allows export of data in JSON format
+		if self._finished:
+			return
+		self._finished = True
+		self._close_current()
+		if self._cprofile is not None:
+			self._cprofile.disable()
+		# the process-wide peak RSS is reported alongside the per-stage values
+		process_peak = None
+		if resource is not None:
+			process_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+			if sys.platform == "darwin":
+				process_peak = process_peak // 1024
+		trace = {
+			"script": self.script_name,
+			"argv": INVOKED_ARGV,
+			"started": time.strftime("%Y-%m-%dT%H:%M:%S", self._started_at),
+			"python": sys.version.split()[0],
+			"pid": os.getpid(),
+			"stages": self.stages,
+			"total": {
+				"wall_s": round(time.perf_counter() - self._started_wall, 6),
+				"cpu_s": round(time.process_time() - self._started_cpu, 6),
+				"peak_rss_mb": None if process_peak is None else round(process_peak / 1024, 3),
+			},
+		}
+		# as for the Parts, the child processes are reported separately
+		trace["total"].update(_children_fields(self._started_children_cpu))
+		# name the trace files after the script & the start time of the run
+		time_now = time.strftime("%d-%m-%Y--%H%M%S", self._started_at)
+		out_base = os.path.join(self.out_dir, self.script_name + "__profile__" + time_now)
+		with open(out_base + ".json", "w") as trace_file:
+			json.dump(trace, trace_file, indent=2)
+		if self._cprofile is not None:
+			self._cprofile.dump_stats(out_base + ".prof")
+
+
+def start(script_name, mode=None):
+	"""Return a StageProfiler if profiling was requested by flag or environment variable.
+
+	`mode` is the value of the script's `--profile` flag; when it is not given, the
+		ORTHOBENCH_PROFILE environment variable is used instead. If neither enables
+		profiling, a no-op profiler is returned.
+	"""
+	mode = _normalize_mode(mode) or mode_from_env()
+	if mode is None:
+		return _NullProfiler()
+	return StageProfiler(script_name, mode)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: sampling.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module estimates the pairwise agreement of the clusterings in an orthology
+		database by sampling protein pairs, instead of counting every pair of proteins
+		that are clustered together (which grows with the square of the cluster sizes).
+	The cluster ID columns are first coded as integers (-1 for unassigned proteins).
+		Two kinds of pairs are then sampled with a seedable random number generator:
+		- within-cluster pairs: for each column, clusters are drawn with probabilities
+			proportional to their numbers of pairs, & 2 different members are drawn from
+			each, which gives a uniform sample of the pairs clustered together by that
+			column. The fraction of the pairs of column A that are also together in
+			column B estimates the precision of A relative to B; the fraction of the
+			pairs of B that are together in A estimates the recall.
+		- random protein pairs: uniform pairs of different proteins, of which the
+			fraction on which 2 columns agree (together in both, or apart in both)
+			estimates the Rand index.
+		As in the co-membership query of the store module, only proteins assigned in both
+			columns are compared. Each within-cluster sample of a column is reused for the
+			comparisons with all other columns.
+	Each estimate is reported with a Wilson score confidence interval. The Jaccard index
+		of the pairs (1 / (1/precision + 1/recall - 1)) is derived from the precision &
+		recall estimates, & its interval from their bounds.
+
+List of functions:
+	code_columns(ortho_df): Code the cluster ID columns of an orthology database as integers.
+	wilson_interval(successes, trials, confidence=0.95): Return the Wilson score interval of a proportion.
+	sample_cluster_pairs(codes, n_samples, rng): Sample pairs of proteins clustered together by a column.
+	sample_random_pairs(n_proteins, n_samples, rng): Sample uniform pairs of different proteins.
+	estimate_agreement(ortho_df, n_samples=SAMPLES, seed=None, confidence=0.95): Estimate the
+		agreement of every pair of columns.
+
+List of standard and non-standard modules used:
+	statistics.NormalDist
+	numpy (imported lazily)
+	pandas (imported lazily)
+	orthobench.database
+
+Known bugs and limitations:
+	- The Jaccard interval combines the precision & recall intervals, & so is wider than
+		a proper confidence interval at the same level.
+	- Columns without any cluster of 2 or more proteins give no precision or recall estimates.
+
+"""
+
+
+from statistics import NormalDist # quantiles of the standard normal distribution
+from .database import QUERY_COL, MISSING # orthology database layout
+
+
+# default number of pairs sampled per column (and of random protein pairs)
+SAMPLES = 100000
+# column names of the agreement table
+AGREEMENT_COLUMNS = ['Column_A', 'Column_B',
+					 'Precision', 'Precision_Low', 'Precision_High', 'Precision_Samples',
+					 'Recall', 'Recall_Low', 'Recall_High', 'Recall_Samples',
+					 'Jaccard', 'Jaccard_Low', 'Jaccard_High',
+					 'Rand_Index', 'Rand_Low', 'Rand_High', 'Rand_Samples']
+
+
+def code_columns(ortho_df):
+	"""Code the cluster ID columns of an orthology database as integers.
+
+	Returns a dictionary of column names & int64 arrays of cluster codes (in database
+		row order), with -1 for unassigned proteins ("-").
+	"""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	coded = {}
+	for column in ortho_df.columns:
+		if column == QUERY_COL:
+			continue
+		values = ortho_df[column].to_numpy()
+		codes, _ = pd.factorize(values)
+		codes = codes.astype(np.int64)
+		codes[values == MISSING] = -1
+		coded[column] = codes
+	return coded
+
+
+def wilson_interval(successes, trials, confidence=0.95):
+	"""Return the (low, high) Wilson score interval of a proportion, or NaNs without trials."""
+	if trials == 0:
+		return float("nan"), float("nan")
+	z = NormalDist().inv_cdf(0.5 + confidence / 2)
+	proportion = successes / trials
+	denominator = 1 + z * z / trials
+	center = (proportion + z * z / (2 * trials)) / denominator
+	margin = z * ((proportion * (1 - proportion) / trials + z * z / (4 * trials * trials)) ** 0.5) / denominator
+	return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def sample_cluster_pairs(codes, n_samples, rng):
+	"""Sample `n_samples` pairs of proteins clustered together by a column, uniformly over all such pairs.
+
+	`codes` are the cluster codes of the column (-1 for unassigned proteins) & `rng` a
+		numpy random Generator. Clusters are drawn in proportion to their numbers of
+		pairs, then 2 different members of each drawn cluster. Returns 2 arrays of row
+		indices (empty if no cluster has 2 or more members).
+	"""
+	import numpy as np # allows vectorized array operations
+	assigned = np.flatnonzero(codes >= 0)
+	sizes = np.bincount(codes[assigned]) if len(assigned) else np.zeros(0, dtype=np.int64)
+	pair_counts = sizes.astype(np.float64) * (sizes - 1) / 2
+	if pair_counts.sum() == 0:
+		return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+	# draw the clusters in proportion to their numbers of pairs
+	cumulative = np.cumsum(pair_counts)
+	clusters = np.searchsorted(cumulative, rng.random(n_samples) * cumulative[-1], side="right")
+	clusters = np.minimum(clusters, len(sizes) - 1)
+	# group the rows of the drawn clusters only, which avoids sorting the whole column
+	drawn = np.unique(clusters)
+	is_drawn = np.zeros(len(sizes), dtype=bool)
+	is_drawn[drawn] = True
+	rows = assigned[is_drawn[codes[assigned]]]
+	members = rows[np.argsort(codes[rows], kind="stable")]
+	starts = np.concatenate(([0], np.cumsum(sizes[drawn])[:-1]))[np.searchsorted(drawn, clusters)]
+	# & 2 different members of each cluster
+	first = rng.integers(0, sizes[clusters])
+	second = rng.integers(0, sizes[clusters] - 1)
+	second += second >= first
+	return members[starts + first], members[starts + second]
+
+
+def sample_random_pairs(n_proteins, n_samples, rng):
+	"""Sample `n_samples` uniform pairs of different row indices out of `n_proteins` rows."""
+	import numpy as np # allows vectorized array operations
+	if n_proteins < 2:
+		return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+	first = rng.integers(0, n_proteins, n_samples)
+	second = rng.integers(0, n_proteins - 1, n_samples)
+	second += second >= first
+	return first, second
+
+
+def _together(codes, first, second):
+	"""Return the pairs of which both proteins are assigned, & which of these are in the same cluster."""
+	codes_first, codes_second = codes[first], codes[second]
+	valid = (codes_first >= 0) & (codes_second >= 0)
+	return valid, valid & (codes_first == codes_second)
+
+
+def estimate_agreement(ortho_df, n_samples=SAMPLES, seed=None, confidence=0.95):
+	"""Estimate the pairwise precision, recall, Jaccard & Rand indices of every pair of columns.
+
+	`n_samples` pairs are sampled within the clusters of each column, & `n_samples`
+		random protein pairs are shared by all columns. `seed` makes the samples (and so
+		the estimates) reproducible. Returns a dataframe of AGREEMENT_COLUMNS, with one
+		row per pair of columns (in database order): the precision is that of Column_A
+		relative to Column_B, & the recall that of Column_B's pairs recovered by Column_A.
+	"""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	rng = np.random.default_rng(seed)
+	coded = code_columns(ortho_df)
+	columns = list(coded)
+	# one within-cluster sample per column, reused for all comparisons
+	cluster_pairs = {column: sample_cluster_pairs(coded[column], n_samples, rng) for column in columns}
+	random_first, random_second = sample_random_pairs(len(ortho_df), n_samples, rng)
+
+	def recovered(sampled_column, other_column):
+		"""Count the sampled pairs of one column that are assigned in & together in another column."""
+		first, second = cluster_pairs[sampled_column]
+		valid, together = _together(coded[other_column], first, second)
+		return int(together.sum()), int(valid.sum())
+
+	rows = []
+	for num, column_a in enumerate(columns):
+		for column_b in columns[num + 1:]:
+			# the fraction of the pairs of A that are together in B, & vice versa
+			precision_hits, precision_trials = recovered(column_a, column_b)
+			recall_hits, recall_trials = recovered(column_b, column_a)
+			precision = precision_hits / precision_trials if precision_trials else float("nan")
+			recall = recall_hits / recall_trials if recall_trials else float("nan")
+			precision_low, precision_high = wilson_interval(precision_hits, precision_trials, confidence)
+			recall_low, recall_high = wilson_interval(recall_hits, recall_trials, confidence)
+			# the random pairs on which both columns agree
+			valid_a, together_a = _together(coded[column_a], random_first, random_second)
+			valid_b, together_b = _together(coded[column_b], random_first, random_second)
+			valid = valid_a & valid_b
+			rand_trials = int(valid.sum())
+			rand_hits = int((valid & (together_a == together_b)).sum())
+			rand_low, rand_high = wilson_interval(rand_hits, rand_trials, confidence)
+			rows.append([column_a, column_b,
+						 precision, precision_low, precision_high, precision_trials,
+						 recall, recall_low, recall_high, recall_trials,
+						 _jaccard(precision, recall), _jaccard(precision_low, recall_low), _jaccard(precision_high, recall_high),
+						 rand_hits / rand_trials if rand_trials else float("nan"), rand_low, rand_high, rand_trials])
+	return pd.DataFrame(rows, columns=AGREEMENT_COLUMNS)
+
+
+def _jaccard(precision, recall):
+	"""Return the Jaccard index of the pairs of 2 columns, given the precision & recall of one relative to the other."""
+	if precision != precision or recall != recall:
+		# NaN
+		return float("nan")
+	if precision == 0 or recall == 0:
+		return 0.0
+	return 1 / (1 / precision + 1 / recall - 1)
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: stats.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module computes the descriptive statistics used to compare the orthologous
+		clusters of the benchmarked programs: the counts of cluster membership in the
+		orthology database, and summary statistics of the cluster size distributions.
+
+List of functions:
+	cluster_counts(ortho_df): Count the number of proteins assigned to each cluster, per column.
+	clean_counts(counts_df): Drop the cluster ID columns from a cluster counts table.
+	load_clusters(path): Load a *_parsed.json cluster dictionary (or *_parsed.jsonl.idx shards).
+	iter_clusters(path): Stream the clusters of a *_parsed.json file or *_parsed.jsonl.idx shards.
+	load_sizes(path): Return the cluster sizes of a *_parsed.json file or *_parsed.jsonl.idx index.
+	cluster_sizes(clusters): Return the list of cluster sizes of a cluster dictionary or pivot table.
+	cluster_stats(sizes): Compute the descriptive statistics of a list of cluster sizes.
+	stats_table(named_sizes): Compile the statistics of several programs into one dataframe.
+	source_name(path): Return the OG_Source name used for a *_parsed.json file.
+	sequence_lengths(path): Load the protein sequence lengths from a FASTA file's *.fai index.
+	cluster_lengths(clusters, lengths, batch_size=LOOKUP_BATCH): Compute the member length
+		statistics of each cluster.
+	length_summary(lengths_df): Summarize the per-cluster length statistics of a source.
+	lengths_table(named_lengths): Compile the per-cluster length statistics of several sources.
+
+List of standard and non-standard modules used:
+	os
+	json
+	statistics
+	numpy (imported lazily)
+	pandas (imported lazily)
+	orthobench.compression
+	orthobench.jsonl
+	orthobench.faidx (imported lazily)
+
+"""
+
+
+import os # allows access to the file system
+import json # allows import and export of data in JSON format
+import statistics # allows calculation of statistics in Python
+from .compression import open_text, strip_extension # transparent (de)compression
+from . import jsonl # sharded JSON Lines cluster files
+
+
+# column names of the cluster statistics table
+STATS_COLUMNS = ['OG_Source', 'Cluster_Num', 'Min_Size', 'Max_Size', 'Avg_Mean_Size',
+				 'Median_Size', 'Mode_Size', 'Std_Dev', 'Variance', 'Singletons', 'Singleton_Num']
+# column names of the per-cluster sequence length table
+LENGTH_COLUMNS = ['OG_Source', 'Cluster_ID', 'Size', 'Min_Length', 'Max_Length', 'Mean_Length',
+				  'Length_CV', 'Total_Residues']
+# summary columns added to the cluster statistics table when sequence lengths are given
+LENGTH_STATS_COLUMNS = ['Mean_Length_CV', 'Median_Length_CV', 'Max_Length_CV',
+						'Mean_Total_Residues', 'Max_Total_Residues']
+# number of member IDs looked up in the sequence length table at a time
+LOOKUP_BATCH = 1000000
+
+
+def cluster_counts(ortho_df):
+	"""Count the number of proteins in each cluster, for every program column of the database.
+
+	For each column, two columns are produced side by side: the cluster IDs (named after
+		the database column) & the counts (named <column basename>_counts), sorted from
+		the largest to the smallest cluster.
+	"""
+	import pandas as pd # allows manipulation of dataframes in Python
+	counts_list = []
+	for column in ortho_df:
+		# loop over the columns in the dataframe
+		if column == "Query":
+			# skip over the first column with the query prot names
+			continue
+		# get the basename of the column
+		count_col_name = column.replace('_parsed_pivot', '') + "_counts"
+		# get counts of the column & save results to a temporary dataframe
+		# ref: https://stackoverflow.com/questions/47136436/python-pandas-convert-value-counts-output-to-dataframe
+		counts_list.append(ortho_df[column].value_counts(ascending=False).rename_axis(column).reset_index(name=count_col_name))
+	# join the count dataframes of the columns into the larger dataframe
+	# ref: https://stackoverflow.com/questions/60341348/merge-multiple-dataframes-without-common-columns
+	return pd.concat(counts_list, axis=1)
+
+
+def clean_counts(counts_df):
+	"""Drop the cluster ID columns from a counts table, leaving only the counts."""
+	# ref: https://stackoverflow.com/questions/19071199/drop-columns-whose-name-contains-a-specific-string-from-pandas-dataframe
+	return counts_df[counts_df.columns.drop(list(counts_df.filter(regex = '_parsed_pivot')))]
+
+
+def load_clusters(path):
+	"""Load a *_parsed.json file (or *_parsed.jsonl.idx shards) produced by ortho_results_parser.py into a dictionary."""
+	if path.endswith(jsonl.INDEX_SUFFIX):
+		return dict(jsonl.iter_jsonl(path))
+	with open_text(path) as json_file:
+		return json.load(json_file)
+
+
+def iter_clusters(path):
+	"""Yield the (cluster ID, list of members) pairs of a *_parsed.json file or *_parsed.jsonl.idx shards.
+
+	The shards are streamed one cluster at a time; a JSON dictionary has to be loaded whole.
+	"""
+	if path.endswith(jsonl.INDEX_SUFFIX):
+		return jsonl.iter_jsonl(path)
+	return iter(load_clusters(path).items())
+
+
+def load_sizes(path):
+	"""Return the list of cluster sizes of a *_parsed.json file or *_parsed.jsonl.idx index.
+
+	For sharded JSON Lines output, the sizes are read from the index alone, so the
+		clusters themselves are never loaded.
+	"""
+	if path.endswith(jsonl.INDEX_SUFFIX):
+		return jsonl.cluster_sizes(path)
+	return cluster_sizes(load_clusters(path))
+
+
+def cluster_sizes(clusters):
+	"""Return the list of cluster sizes of a cluster dictionary or of a pivot table."""
+	if isinstance(clusters, dict):
+		return [len(members) for members in clusters.values()]
+	# for a pivot table, count the rows of each cluster in order of appearance
+	return clusters.iloc[:, 0].value_counts(sort=False).tolist()
+
+
+def cluster_stats(sizes):
+	"""Compute the descriptive statistics of a list of cluster sizes.
+
+	Returns a dictionary with the statistics columns of STATS_COLUMNS (except OG_Source):
+		the number of clusters, minimum, maximum, mean, median & mode cluster size, the
+		(population) standard deviation & variance, and the presence & number of
+		singleton clusters.
+	"""
+	return {
+		'Cluster_Num': len(sizes),
+		'Min_Size': min(sizes),
+		'Max_Size': max(sizes),
+		'Avg_Mean_Size': statistics.mean(sizes),
+		'Median_Size': statistics.median(sizes),
+		'Mode_Size': statistics.mode(sizes),
+		# ref: https://www.geeksforgeeks.org/python-standard-deviation-of-list/
+		'Std_Dev': statistics.pstdev(sizes),
+		'Variance': statistics.pvariance(sizes),
+		'Singletons': "Y" if 1 in sizes else "N",
+		'Singleton_Num': sizes.count(1),
+	}
+
+
+def source_name(path):
+	"""Return the OG_Source name of a *_parsed.json file: its basename without "_parsed".
+
+	For a *_parsed.jsonl.idx index, the basename without "_parsed.jsonl.idx" is used.
+	"""
+	if path.endswith(jsonl.INDEX_SUFFIX):
+		return os.path.basename(path)[:-len(jsonl.INDEX_SUFFIX)]
+	out_base = os.path.splitext(os.path.basename(strip_extension(path)))[0]
+	return out_base.replace("_parsed", "")
+
+
+def stats_table(named_sizes, named_lengths=None):
+	"""Compile the cluster statistics of several sources into one dataframe.
+
+	`named_sizes` is a dictionary of OG_Source names & lists of cluster sizes. If
+		`named_lengths` (a dictionary of OG_Source names & cluster_lengths() tables) is
+		given, the LENGTH_STATS_COLUMNS summary columns are added to the table.
+	"""
+	import pandas as pd # allows manipulation of dataframes in Python
+	rows = []
+	for source, sizes in named_sizes.items():
+		row = cluster_stats(sizes)
+		row['OG_Source'] = source
+		if named_lengths is not None:
+			row.update(length_summary(named_lengths[source]))
+		rows.append(row)
+	columns = STATS_COLUMNS + (LENGTH_STATS_COLUMNS if named_lengths is not None else [])
+	return pd.DataFrame(rows, columns=columns)
+
+
+def sequence_lengths(path):
+	"""Load the length of each protein sequence from the *.fai index of a FASTA file.
+
+	`path` can be the FASTA file (the index is built in a single pass if it doesn't exist
+		yet) or the *.fai index itself. Returns a Pandas series of sequence lengths,
+		indexed by the sequence names (ie. the encoded protein IDs).
+	"""
+	import pandas as pd # allows manipulation of dataframes in Python
+	from . import faidx # samtools faidx-style indexing of FASTA files
+	if not path.endswith(".fai"):
+		if not os.path.isfile(faidx.index_path(path)):
+			faidx.build_index(path)
+		path = faidx.index_path(path)
+	# only the name & length columns of the index are needed
+	index_df = pd.read_csv(path, sep="\t", header=None, usecols=[0, 1], names=["Name", "Length"],
+						   dtype={"Name": str, "Length": "int64"})
+	return pd.Series(index_df["Length"].to_numpy(), index=pd.Index(index_df["Name"]))
+
+
+def _length_positions(index, members):
+	"""Return the positions of member IDs in the index of the sequence length table, or raise a KeyError."""
+	import numpy as np # allows vectorized calculations on arrays
+	positions = index.get_indexer(members)
+	if (positions < 0).any():
+		missing = np.asarray(members, dtype=object)[positions < 0]
+		raise KeyError(str(len(missing)) + " cluster members have no sequence length, ie. " + str(missing[0]))
+	return positions
+
+
+def _code_clusters(clusters, index, batch_size=LOOKUP_BATCH):
+	"""Code an iterable of (cluster ID, members) pairs as cluster IDs, cluster sizes & member positions.
+
+	The member IDs are looked up in `index` (the index of the sequence length table) in
+		batches of `batch_size`, so that only their integer positions are kept, & the
+		clusters can be streamed (ie. from jsonl.iter_jsonl()). A ValueError is raised
+		for clusters without members.
+	"""
+	import numpy as np # allows vectorized calculations on arrays
+	cluster_ids = []
+	sizes = []
+	positions = []
+	batch = []
+	for cluster_id, members in clusters:
+		if len(members) == 0:
+			raise ValueError("Cluster " + str(cluster_id) + " has no members")
+		cluster_ids.append(cluster_id)
+		sizes.append(len(members))
+		batch.extend(members)
+		if len(batch) >= batch_size:
+			positions.append(_length_positions(index, batch))
+			batch = []
+	positions.append(_length_positions(index, batch))
+	return np.array(cluster_ids, dtype=object), np.array(sizes, dtype=np.int64), np.concatenate(positions)
+
+
+def cluster_lengths(clusters, lengths, batch_size=LOOKUP_BATCH):
+	"""Compute the spread of the member sequence lengths of each cluster.
+
+	`clusters` is a pivot table, a cluster dictionary (ie. loaded with load_clusters()) or
+		an iterable of (cluster ID, list of members) pairs (ie. from iter_clusters(),
+		which streams the clusters of *_parsed.jsonl.idx shards without loading them
+		all), and `lengths` is a series of sequence lengths, as returned by
+		sequence_lengths(). The members are coded as integer cluster numbers, & the
+		statistics are computed with grouped reductions over the sorted codes, so no
+		Python-level loop over the clusters is needed. Returns a dataframe with the
+		columns of LENGTH_COLUMNS (except OG_Source), with 1 row per cluster; Length_CV is
+		the coefficient of variation (population standard deviation / mean) of the member
+		lengths. A KeyError is raised if members are missing from `lengths`, & a
+		ValueError for clusters without members.
+	"""
+	import numpy as np # allows vectorized calculations on arrays
+	import pandas as pd # allows manipulation of dataframes in Python
+	if isinstance(clusters, pd.DataFrame):
+		codes, cluster_ids = pd.factorize(clusters.iloc[:, 0], sort=False)
+		cluster_ids = np.asarray(cluster_ids, dtype=object)
+		positions = _length_positions(lengths.index, clusters.iloc[:, 1].to_numpy())
+		# group the members of each cluster together, keeping the codes sorted
+		order = np.argsort(codes, kind="stable")
+		codes = codes[order]
+		positions = positions[order]
+		sizes = np.bincount(codes, minlength=len(cluster_ids))
+	else:
+		if isinstance(clusters, dict):
+			clusters = clusters.items()
+		cluster_ids, sizes, positions = _code_clusters(clusters, lengths.index, batch_size)
+		# the members are already grouped by cluster
+		codes = np.repeat(np.arange(len(cluster_ids)), sizes)
+	# look up the member lengths by position in the length table
+	member_lengths = lengths.to_numpy()[positions].astype(np.int64)
+	n_clusters = len(cluster_ids)
+	starts = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int64)
+	# reduceat() would return the next cluster's first element for an empty cluster
+	# these can't occur here: each row of a dataframe adds a member to its cluster,
+	# & _code_clusters() raises a ValueError for clusters without members
+	# grouped reductions over the contiguous runs of each cluster
+	totals = np.add.reduceat(member_lengths, starts) if n_clusters else np.zeros(0, dtype=np.int64)
+	mins = np.minimum.reduceat(member_lengths, starts) if n_clusters else np.zeros(0, dtype=np.int64)
+	maxs = np.maximum.reduceat(member_lengths, starts) if n_clusters else np.zeros(0, dtype=np.int64)
+	means = totals / sizes
+	# population variance from the mean of the squared deviations
+	deviations = member_lengths - np.repeat(means, sizes)
+	variances = np.bincount(codes, weights=deviations * deviations, minlength=n_clusters) / sizes
+	with np.errstate(divide="ignore", invalid="ignore"):
+		# clusters of empty sequences have no defined coefficient of variation
+		length_cv = np.sqrt(variances) / means
+	return pd.DataFrame({
+		'Cluster_ID': cluster_ids,
+		'Size': sizes,
+		'Min_Length': mins,
+		'Max_Length': maxs,
+		'Mean_Length': means,
+		'Length_CV': length_cv,
+		'Total_Residues': totals,
+	})
+
+
+def length_summary(lengths_df):
+	"""Summarize a cluster_lengths() table into the LENGTH_STATS_COLUMNS statistics."""
+	return {
+		'Mean_Length_CV': lengths_df['Length_CV'].mean(),
+		'Median_Length_CV': lengths_df['Length_CV'].median(),
+		'Max_Length_CV': lengths_df['Length_CV'].max(),
+		'Mean_Total_Residues': lengths_df['Total_Residues'].mean(),
+		'Max_Total_Residues': lengths_df['Total_Residues'].max(),
+	}
+
+
+def lengths_table(named_lengths):
+	"""Compile the cluster_lengths() tables of several sources into one dataframe.
+
+	`named_lengths` is a dictionary of OG_Source names & cluster_lengths() tables.
+	"""
+	import pandas as pd # allows manipulation of dataframes in Python
+	frames = [lengths_df.assign(OG_Source=source) for source, lengths_df in named_lengths.items()]
+	if not frames:
+		return pd.DataFrame(columns=LENGTH_COLUMNS)
+	return pd.concat(frames, ignore_index=True)[LENGTH_COLUMNS]
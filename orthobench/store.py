@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: store.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module writes the orthology database into an embedded columnar store (a DuckDB
+		database file or a Parquet file), & runs a small set of canned benchmark queries
+		on it, so that exploratory questions don't require loading the whole
+		Orthology_Comparison_DB__*.txt file into Pandas.
+	The store contains a single table ("ortho_db") with the columns of the orthology
+		database, plus one integer column per cluster ID column with the size of the
+		cluster each protein was assigned to (ie. "MMseqs2_Pa_90_parsed_pivot__size";
+		0 for unassigned proteins). Filters on cluster sizes are thereby plain column
+		predicates, which DuckDB pushes down into the scan (skipping row groups using
+		their min/max statistics), & the scans are run on multiple threads.
+	The queries are:
+		- column_summary(): the number of proteins, clusters & singletons, & the largest
+			cluster size of each cluster ID column, in a single scan
+		- size_filter(): the proteins whose clusters fall within size limits in several
+			columns (ie. singletons in CD-HIT_Pa_90 but in clusters of more than 10
+			proteins in MMseqs2_Pa_90)
+		- co_membership(): the numbers of protein pairs that are clustered together by
+			two columns, by each of them & by both, with the precision, recall & Jaccard
+			index of the first column relative to the second
+		- protein() & cluster(): the assignments of a protein, or of all of the members
+			of a cluster, in every column
+	The orthology database itself can be read back with database(), ie. by the scripts
+		that take the orthology database as input.
+	Columns can be named in full or without the "_parsed_pivot" suffix.
+
+List of functions:
+	has_duckdb(): Return True if the duckdb library is installed.
+	store_format(path): Return the store format of a path ("duckdb" or "parquet").
+	size_columns(ortho_df): Add the cluster size column of each cluster ID column.
+	write_store(ortho_df, path): Write an orthology database into a DuckDB or Parquet store.
+
+List of classes:
+	OrthoStore: The canned queries over a DuckDB or Parquet store.
+
+List of standard and non-standard modules used:
+	os
+	duckdb (optional; imported lazily)
+	numpy (imported lazily)
+	pandas (imported lazily)
+	orthobench.compression
+	orthobench.database
+	orthobench.checkpoint
+
+Known bugs and limitations:
+	- Both writing & querying the store require the duckdb library; the Parquet files
+		can also be read by any other Parquet reader.
+
+Usage:
+	write_store(ortho_df, "Orthology_Comparison_DB__26-10-2023--174514.duckdb")
+	with OrthoStore("Orthology_Comparison_DB__26-10-2023--174514.duckdb") as store:
+		count_df = store.size_filter(max_sizes={"CD-HIT_Pa_90": 1}, min_sizes={"MMseqs2_Pa_90": 11})
+
+"""
+
+
+import os # allow access to computer files
+from .compression import thread_count # number of cores available
+from .database import QUERY_COL, MISSING # orthology database layout
+from .checkpoint import atomic_path # atomic output files
+
+
+# store file extensions & the corresponding formats
+STORE_FORMATS = {".duckdb": "duckdb", ".parquet": "parquet"}
+# name of the table in the store
+TABLE_NAME = "ortho_db"
+# suffix of the cluster size columns
+SIZE_SUFFIX = "__size"
+# suffix of the columns of parsed pivot tables, which can be left out in queries
+PIVOT_SUFFIX = "_parsed_pivot"
+# column names of the query results
+SUMMARY_COLUMNS = ["Column", "Proteins", "Clusters", "Singletons", "Max_Size"]
+CO_MEMBERSHIP_COLUMNS = ["Column_A", "Column_B", "Proteins", "Pairs_A", "Pairs_B", "Pairs_Both",
+						 "Precision", "Recall", "Jaccard"]
+
+
+def has_duckdb():
+	"""Return True if duckdb can be imported."""
+	try:
+		import duckdb # noqa: F401
+	except ImportError:
+		return False
+	return True
+
+
+def _import_duckdb():
+	"""Import duckdb, with an explanatory error if it is not installed."""
+	try:
+		import duckdb # embedded analytical database engine
+	except ImportError:
+		raise RuntimeError("Writing & querying the orthology database store requires the duckdb Python module") from None
+	return duckdb
+
+
+def store_format(path):
+	"""Return the format of a store ("duckdb" or "parquet"), determined from its file extension."""
+	extension = os.path.splitext(path)[1].lower()
+	if extension not in STORE_FORMATS:
+		raise ValueError("Unknown store file extension '" + extension + "'; expected one of: " + ", ".join(STORE_FORMATS))
+	return STORE_FORMATS[extension]
+
+
+def _quote(name):
+	"""Quote a column or table name for SQL (the column names contain dashes, ie. "CD-HIT_Pa_90")."""
+	return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(text):
+	"""Quote a string (ie. a file path) as an SQL string literal."""
+	return "'" + str(text).replace("'", "''") + "'"
+
+
+def size_columns(ortho_df):
+	"""Return a copy of an orthology database with the cluster size column of each cluster ID column added.
+
+	The size of each cluster is counted with a bincount over the integer codes of the
+		cluster IDs; unassigned proteins ("-") get a size of 0.
+	"""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	sized_df = ortho_df.copy()
+	for column in ortho_df.columns:
+		if column == QUERY_COL:
+			continue
+		values = ortho_df[column].to_numpy()
+		codes, cluster_ids = pd.factorize(values)
+		assigned = (codes >= 0) & (values != MISSING)
+		sizes = np.bincount(codes[assigned], minlength=len(cluster_ids))
+		column_sizes = np.zeros(len(codes), dtype=np.int64)
+		column_sizes[assigned] = sizes[codes[assigned]]
+		sized_df[column + SIZE_SUFFIX] = column_sizes
+	return sized_df
+
+
+def write_store(ortho_df, path):
+	"""Write an orthology database into a DuckDB database file (*.duckdb) or a Parquet file (*.parquet).
+
+	The cluster size columns are added first (see size_columns()). An existing store at
+		`path` is replaced once the new one is complete. Returns the path.
+	"""
+	duckdb = _import_duckdb()
+	fmt = store_format(path)
+	sized_df = size_columns(ortho_df)
+	# the store is written under a temporary name & renamed once it is complete
+	with atomic_path(path) as tmp_path:
+		con = duckdb.connect(tmp_path if fmt == "duckdb" else ":memory:")
+		try:
+			con.execute("SET threads = " + str(thread_count()))
+			con.register("sized_df", sized_df)
+			if fmt == "duckdb":
+				con.execute("CREATE TABLE " + _quote(TABLE_NAME) + " AS SELECT * FROM sized_df")
+			else:
+				con.execute("COPY (SELECT * FROM sized_df) TO " + _literal(tmp_path) + " (FORMAT PARQUET, COMPRESSION ZSTD)")
+			con.unregister("sized_df")
+		finally:
+			con.close()
+	return path
+
+
+class OrthoStore:
+	"""The canned benchmark queries over an orthology database store written by write_store().
+
+	Each query returns a Pandas dataframe.
+
+	Usage:
+		with OrthoStore("Orthology_Comparison_DB__26-10-2023--174514.duckdb") as store:
+			summary_df = store.column_summary()
+	"""
+
+	def __init__(self, path, threads=None):
+		duckdb = _import_duckdb()
+		fmt = store_format(path)
+		if not os.path.exists(path):
+			raise FileNotFoundError("No such store: " + path)
+		if fmt == "duckdb":
+			self._con = duckdb.connect(path, read_only=True)
+			self._source = _quote(TABLE_NAME)
+		else:
+			self._con = duckdb.connect(":memory:")
+			self._source = "read_parquet(" + _literal(path) + ")"
+		self._con.execute("SET threads = " + str(threads or thread_count()))
+		names = [row[0] for row in self._con.execute("DESCRIBE SELECT * FROM " + self._source).fetchall()]
+		# the cluster ID columns, in database order
+		self.columns = [name for name in names if name != QUERY_COL and not name.endswith(SIZE_SUFFIX)]
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def close(self):
+		"""Close the connection to the store."""
+		self._con.close()
+
+	def resolve(self, column):
+		"""Return the full name of a cluster ID column, which can be given without the "_parsed_pivot" suffix."""
+		for name in (column, column + PIVOT_SUFFIX):
+			if name in self.columns:
+				return name
+		raise KeyError("Unknown column '" + column + "'; the store contains: " + ", ".join(self.columns))
+
+	def query(self, sql, params=None):
+		"""Run an SQL query on the store & return the result as a dataframe.
+
+		The table is referred to as {source} in `sql`, ie. "SELECT COUNT(*) FROM {source}";
+			`params` are the values of the ? placeholders.
+		"""
+		return self._con.execute(sql.replace("{source}", self._source), params or []).df()
+
+	def column_summary(self):
+		"""Return the numbers of proteins, clusters & singletons, & the largest cluster size of each column."""
+		import pandas as pd # allows manipulation of dataframes in Python
+		selects = []
+		for column in self.columns:
+			# all of the columns are summarized in a single scan
+			cluster, size = _quote(column), _quote(column + SIZE_SUFFIX)
+			selects += [
+				"COUNT(*) FILTER (WHERE " + size + " > 0)",
+				"COUNT(DISTINCT " + cluster + ") FILTER (WHERE " + size + " > 0)",
+				"COUNT(*) FILTER (WHERE " + size + " = 1)",
+				"MAX(" + size + ")",
+			]
+		if not selects:
+			return pd.DataFrame(columns=SUMMARY_COLUMNS)
+		values = self._con.execute("SELECT " + ", ".join(selects) + " FROM " + self._source).fetchone()
+		rows = [[column] + [int(value or 0) for value in values[num * 4:num * 4 + 4]] for num, column in enumerate(self.columns)]
+		return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+	def size_filter(self, min_sizes=None, max_sizes=None, list_proteins=False):
+		"""Return the proteins (or their number) whose clusters are within size limits in several columns.
+
+		`min_sizes` & `max_sizes` are dictionaries of column names & the smallest or largest
+			cluster size allowed. Proteins that are not assigned in a filtered column are
+			left out. With `list_proteins=False`, a single-row dataframe with the count is
+			returned; otherwise the proteins are listed with their cluster IDs & sizes in
+			the filtered columns.
+		"""
+		min_sizes = {self.resolve(column): size for column, size in (min_sizes or {}).items()}
+		max_sizes = {self.resolve(column): size for column, size in (max_sizes or {}).items()}
+		columns = list(dict.fromkeys(list(min_sizes) + list(max_sizes)))
+		conditions = []
+		params = []
+		for column in columns:
+			size = _quote(column + SIZE_SUFFIX)
+			# unassigned proteins have a size of 0
+			conditions.append(size + " >= ?")
+			params.append(max(1, int(min_sizes.get(column, 1))))
+			if column in max_sizes:
+				conditions.append(size + " <= ?")
+				params.append(int(max_sizes[column]))
+		where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+		if not list_proteins:
+			return self.query("SELECT COUNT(*) AS Proteins FROM {source}" + where, params)
+		selected = [QUERY_COL] + [name for column in columns for name in (column, column + SIZE_SUFFIX)]
+		return self.query("SELECT " + ", ".join(_quote(name) for name in selected) + " FROM {source}" + where
+						  + " ORDER BY " + _quote(QUERY_COL), params)
+
+	def co_membership(self, column_a, column_b):
+		"""Count the protein pairs clustered together by two columns, by each of them & by both.
+
+		Only the proteins assigned in both columns are compared. The pairs are counted
+			from the sizes of the (cluster A, cluster B) groups, so no pairs are listed.
+			Precision is the fraction of the pairs of column A that are also together in
+			column B, & recall the fraction of the pairs of column B that are together in
+			column A. Returns a single-row dataframe (CO_MEMBERSHIP_COLUMNS).
+		"""
+		import pandas as pd # allows manipulation of dataframes in Python
+		column_a, column_b = self.resolve(column_a), self.resolve(column_b)
+		cluster_a, cluster_b = _quote(column_a), _quote(column_b)
+		sql = (
+			"WITH groups AS (SELECT " + cluster_a + " AS a, " + cluster_b + " AS b, COUNT(*) AS n FROM {source}"
+			" WHERE " + cluster_a + " <> ? AND " + cluster_b + " <> ? GROUP BY 1, 2),"
+			" a_sizes AS (SELECT SUM(n) AS n FROM groups GROUP BY a),"
+			" b_sizes AS (SELECT SUM(n) AS n FROM groups GROUP BY b)"
+			" SELECT (SELECT SUM(n) FROM groups),"
+			" (SELECT SUM(n * (n - 1) // 2) FROM a_sizes),"
+			" (SELECT SUM(n * (n - 1) // 2) FROM b_sizes),"
+			" (SELECT SUM(n * (n - 1) // 2) FROM groups)"
+		)
+		counts = self._con.execute(sql.replace("{source}", self._source), [MISSING, MISSING]).fetchone()
+		proteins, pairs_a, pairs_b, pairs_both = [int(value or 0) for value in counts]
+		union = pairs_a + pairs_b - pairs_both
+		return pd.DataFrame([[column_a, column_b, proteins, pairs_a, pairs_b, pairs_both,
+							  pairs_both / pairs_a if pairs_a else float("nan"),
+							  pairs_both / pairs_b if pairs_b else float("nan"),
+							  pairs_both / union if union else float("nan")]], columns=CO_MEMBERSHIP_COLUMNS)
+
+	def database(self):
+		"""Return the orthology database (without the cluster size columns) as a dataframe."""
+		return self.query("SELECT " + ", ".join(_quote(name) for name in [QUERY_COL] + self.columns) + " FROM {source}")
+
+	def protein(self, query_id):
+		"""Return the cluster IDs & cluster sizes of a protein in every column."""
+		return self.query("SELECT * FROM {source} WHERE " + _quote(QUERY_COL) + " = ?", [query_id])
+
+	def cluster(self, column, cluster_id):
+		"""Return the members of a cluster, with their cluster IDs & sizes in every column."""
+		return self.query("SELECT * FROM {source} WHERE " + _quote(self.resolve(column)) + " = ? ORDER BY "
+						  + _quote(QUERY_COL), [cluster_id])
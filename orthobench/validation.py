@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+
+Title: validation.py
+Date: 2026.10.19
+Author: Vi Varga
+
+Description:
+	This module checks the cluster assignments of the parsed clustering results: each
+		protein should be assigned to exactly one cluster. Proteins assigned to more
+		than one cluster (duplicates) are reported, and if a reference list of proteins
+		is given (the encoding reference file written by assignFASTAheaders_v3.py, a
+		FASTA file or its *.fai index), proteins that were not assigned to any cluster
+		(missing) and proteins that are not in the reference (unknown) are reported
+		as well.
+	The checks are done as the results are parsed, instead of afterwards with
+		`cut -f2 *_parsed_pivot.txt | sort | uniq -d`: the reference proteins are
+		numbered, and the assignments are recorded in a table indexed by these integer
+		codes, so no sorting of the members is needed.
+
+List of functions:
+	load_reference(path): Load the ordered list of reference protein IDs.
+	check_pivot(pivot_df, reference=None): Check the assignments of a pivot table.
+	check_database(ortho_df, reference=None): Check the assignments of each program column of
+		an orthology database.
+	summary(report, source): Return a one-line summary of a check report.
+	write_report(named_reports, path): Write out the issues found by one or more checks.
+
+List of classes:
+	MembershipCheck: Incremental check of (cluster ID, member ID) records, as they are parsed.
+
+List of standard and non-standard modules used:
+	os
+	itertools.chain
+	numpy (imported lazily)
+	pandas (imported lazily)
+	orthobench.compression
+	orthobench.faidx
+	orthobench.checkpoint
+	orthobench.database
+
+Usage:
+	check = MembershipCheck(load_reference("PA_EncodingSummary.txt"))
+	for cluster_id, member in records:
+		check.add(cluster_id, member)
+	report = check.report()
+	OR
+	report = check_pivot(read_pivot("MMseqs2_Pa_90_parsed_pivot.txt"), load_reference("PA_EncodingSummary.txt"))
+	OR
+	named_reports = check_database(read_pivot("Orthology_Comparison_DB__2026-10-19.txt"))
+
+	A report is a dictionary with the number of records checked ("proteins"), the number
+		of reference proteins ("reference"; None if no reference was given), a dictionary
+		of duplicated proteins & the clusters they were assigned to ("duplicates"), & the
+		lists of "missing" & "unknown" proteins.
+
+"""
+
+
+import os # allow access to computer files
+from itertools import chain # re-attaches the first line of a file to the rest
+from .compression import open_text # transparent (de)compression
+from .faidx import index_path # default *.fai file names
+from .checkpoint import atomic_path # atomic output files
+from .database import QUERY_COL, MISSING # orthology database layout
+
+
+def load_reference(path):
+	"""Load the ordered list of unique protein IDs that the clustering results should cover.
+
+	`path` can be an encoding reference file (the codes are in the first column), a *.fai
+		index, or a FASTA file (the *.fai index is used if it exists; otherwise the
+		headers are read, up to the first whitespace).
+	"""
+	if not path.endswith(".fai") and os.path.isfile(index_path(path)):
+		path = index_path(path)
+	names = {}
+	with open_text(path) as infile:
+		first_line = infile.readline()
+		if first_line.startswith(">"):
+			# FASTA file: collect the sequence names from the header lines
+			for line in chain([first_line], infile):
+				if not line.startswith(">"):
+					continue
+				fields = line[1:].split(None, 1)
+				names[fields[0] if fields else ""] = None
+		else:
+			# encoding reference or *.fai index: the IDs are in the first column
+			for line in chain([first_line], infile):
+				if line.strip():
+					names[line.split("\t", 1)[0].rstrip("\r\n")] = None
+	return list(names)
+
+
+class MembershipCheck:
+	"""Check that each protein is assigned to exactly one cluster, record by record.
+
+	The reference proteins are numbered in order, and the first cluster each protein was
+		assigned to is recorded in a list indexed by these codes (None while the protein
+		has not been seen), so that each record costs one dictionary lookup. Proteins
+		that are not in the reference are given new codes as they are encountered.
+	"""
+
+	def __init__(self, reference=None):
+		reference = [] if reference is None else list(reference)
+		self.has_reference = bool(reference)
+		self._reference_size = len(reference)
+		self._codes = {name: code for code, name in enumerate(reference)}
+		self._first_cluster = [None] * len(reference)
+		self.records = 0
+		self.duplicates = {}
+		self.unknown = []
+
+	def add(self, cluster_id, member):
+		"""Record the assignment of `member` to `cluster_id`."""
+		self.records += 1
+		code = self._codes.get(member)
+		if code is None:
+			# first time this protein is seen, & it isn't in the reference
+			self._codes[member] = len(self._first_cluster)
+			self._first_cluster.append(cluster_id)
+			if self.has_reference:
+				self.unknown.append(member)
+			return
+		first_cluster = self._first_cluster[code]
+		if first_cluster is None:
+			# first time this reference protein is seen
+			self._first_cluster[code] = cluster_id
+		else:
+			# the protein was already assigned to a cluster
+			self.duplicates.setdefault(member, [first_cluster]).append(cluster_id)
+
+	def missing(self):
+		"""Return the reference proteins that have not been assigned to any cluster."""
+		return [name for name, code in self._codes.items()
+				if code < self._reference_size and self._first_cluster[code] is None]
+
+	def report(self):
+		"""Return the report of the check (see the module docstring)."""
+		return {
+			"proteins": self.records,
+			"reference": self._reference_size if self.has_reference else None,
+			"duplicates": self.duplicates,
+			"missing": self.missing(),
+			"unknown": self.unknown,
+		}
+
+
+def check_pivot(pivot_df, reference=None):
+	"""Check the cluster assignments of a pivot table, vectorized.
+
+	The members are in the second column & the cluster IDs in the first. Returns a report
+		in the same format as MembershipCheck.report(). Orthology databases (first
+		column "Query") have one column per program, & are checked with
+		check_database() instead; a ValueError is raised for them here.
+	"""
+	import numpy as np # allows vectorized array operations
+	import pandas as pd # allows manipulation of dataframes in Python
+	if pivot_df.columns[0] == QUERY_COL:
+		raise ValueError("Orthology databases have one column per program; check them with check_database()")
+	cluster_col, member_col = pivot_df.columns[:2]
+	members = pivot_df[member_col].astype(str)
+	# proteins that occur in more than one row, with all of the clusters they were assigned to
+	repeated = members.duplicated(keep=False).to_numpy()
+	duplicates = {}
+	if repeated.any():
+		repeats_df = pd.DataFrame({"member": members.to_numpy()[repeated],
+								   "cluster": pivot_df[cluster_col].to_numpy()[repeated]})
+		duplicates = {member: list(clusters) for member, clusters in repeats_df.groupby("member", sort=False)["cluster"]}
+	missing = []
+	unknown = []
+	reference = [] if reference is None else reference
+	if len(reference):
+		# look up the integer code of each member in the reference & mark the codes seen
+		reference_index = pd.Index(reference)
+		codes = reference_index.get_indexer(members)
+		seen = np.zeros(len(reference_index), dtype=bool)
+		seen[codes[codes >= 0]] = True
+		missing = reference_index[~seen].tolist()
+		unknown = members[codes < 0].drop_duplicates().tolist()
+	return {
+		"proteins": len(members),
+		"reference": len(reference) if len(reference) else None,
+		"duplicates": duplicates,
+		"missing": missing,
+		"unknown": unknown,
+	}
+
+
+def check_database(ortho_df, reference=None):
+	"""Check the cluster assignments of each program column of an orthology database.
+
+	Each column is checked as a pivot table of the proteins that were assigned to a
+		cluster by that program (ie. not "-"), so that proteins the program didn't
+		assign are reported as missing. A protein assigned to several clusters by one
+		program has one row per combination of clusters in the database, so repeated
+		(protein, cluster) pairs are counted once. Returns a dictionary of column names
+		& reports.
+	"""
+	named_reports = {}
+	for column in ortho_df.columns:
+		if column == QUERY_COL:
+			continue
+		assigned_df = ortho_df.loc[ortho_df[column] != MISSING, [column, QUERY_COL]].drop_duplicates()
+		named_reports[column] = check_pivot(assigned_df, reference)
+	return named_reports
+
+
+def summary(report, source):
+	"""Return a one-line summary of a check report, ie. for printing to the terminal."""
+	text = source + ": " + str(report["proteins"]) + " proteins, " + str(len(report["duplicates"])) + " assigned to multiple clusters"
+	if report["reference"] is not None:
+		text += ", " + str(len(report["missing"])) + " of " + str(report["reference"]) + " reference proteins missing, " + \
+			str(len(report["unknown"])) + " not in the reference"
+	return text
+
+
+def write_report(named_reports, path):
+	"""Write out the issues found by one or more checks to a tab-separated text file.
+
+	`named_reports` is a dictionary of source names (ie. database column names) & reports.
+		Each issue is written as one line: Source, Issue ("duplicate", "missing" or
+		"unknown"), Protein & Clusters (comma-separated, for duplicates). The report is
+		written to a temporary file that is renamed once it is complete.
+	"""
+	with atomic_path(path) as tmp_path:
+		with open_text(tmp_path, "w", newline="") as outfile:
+			outfile.write("Source\tIssue\tProtein\tClusters\n")
+			for source, report in named_reports.items():
+				for member, clusters in report["duplicates"].items():
+					outfile.write(source + "\tduplicate\t" + member + "\t" + ",".join(map(str, clusters)) + "\n")
+				for member in report["missing"]:
+					outfile.write(source + "\tmissing\t" + member + "\t-\n")
+				for member in report["unknown"]:
+					outfile.write(source + "\tunknown\t" + member + "\t-\n")
+	return path